@@ -0,0 +1,21 @@
+import os
+import asyncio
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# Dedicated pool for CPU-heavy agent work (catalog matching, PDF rendering) so
+# it never runs on the event loop and never starves the default executor
+_cpu_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_CPU_WORKERS", str(min(8, (os.cpu_count() or 1) + 2)))),
+    thread_name_prefix="agent-cpu",
+)
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking/CPU-heavy callable on the agent executor and await its result."""
+    loop = asyncio.get_running_loop()
+    # Carry context vars (e.g. the request's trace id) into the worker thread
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_cpu_executor, partial(ctx.run, fn, *args, **kwargs))
@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult, LLMResult
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_key(messages: List[BaseMessage]) -> str:
+    """Stable hash of a prompt: message types and contents, in order."""
+    payload = json.dumps([(m.type, m.content) for m in messages], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_recordings(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read a JSONL recording file into {prompt_key: {"content", "latency_ms"}}."""
+    recordings = {}
+    if not path or not os.path.exists(path):
+        return recordings
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recordings[entry["key"]] = entry
+    return recordings
+
+
+def canned_response(messages: List[BaseMessage]) -> str:
+    """Deterministic stand-in text, shaped like what each agent prompt asks for."""
+    prompt = str(messages[-1].content) if messages else ""
+    key = prompt_key(messages)[:8]
+    markers = re.findall(r"^=== [A-Z ]+ ===$", prompt, flags=re.MULTILINE)
+    if markers:
+        # Multi-section request: answer each section in turn
+        return "\n\n".join(
+            f"{marker}\n{canned_response([HumanMessage(content=marker.strip('= ').lower())])}" for marker in markers
+        )
+    if "executive summary" in prompt.lower():
+        return (f"Executive summary ({key}): the RFP is technically covered by catalog products "
+                "and the quoted total is within the expected range. Recommendation: proceed.")
+    if "pricing" in prompt.lower() or "grand total" in prompt.lower():
+        return (f"## Pricing Summary ({key})\n\n- Material, testing, overhead and contingency are "
+                "itemised above.\n- Assumes catalog list prices and standard test durations.\n\n"
+                "**Next steps:** confirm quantities and submit the commercial bid.")
+    return f"Acknowledged ({key})."
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for benchmarks and local development.
+
+    Replays responses recorded from a real provider when the prompt matches
+    (see ``LLMRecorder``), otherwise returns deterministic canned text. Latency is
+    ``latency_ms`` plus up to ``jitter_ms`` of jitter derived from the prompt hash
+    and ``seed``, so repeated runs see the same delays.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    seed: int = 0
+    use_recorded_latency: bool = False
+    recordings: Dict[str, Dict[str, Any]] = {}
+    model_name: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms}
+
+    def _respond(self, messages: List[BaseMessage]) -> tuple:
+        key = prompt_key(messages)
+        recorded = self.recordings.get(key)
+        content = recorded["content"] if recorded else canned_response(messages)
+        if recorded and self.use_recorded_latency:
+            delay_ms = recorded.get("latency_ms", 0.0)
+        else:
+            jitter = random.Random(f"{self.seed}:{key}").uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            delay_ms = self.latency_ms + jitter
+        return content, delay_ms / 1000
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, delay = self._respond(messages)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        content, delay = self._respond(messages)
+        time.sleep(delay)
+        for token in content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        content, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        for token in content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class LLMRecorder(BaseCallbackHandler):
+    """Callback that appends every real prompt/response pair to a JSONL file for later replay."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def on_chat_model_start(self, serialized, messages: List[List[BaseMessage]], *, run_id: UUID, **kwargs) -> None:
+        self._pending[run_id] = (prompt_key(messages[0]), time.perf_counter())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        key, start = pending
+        entry = {
+            "key": key,
+            "content": response.generations[0][0].text,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._pending.pop(run_id, None)
+
+
+def create_fake_llm(cache=None, rate_limiter=None) -> FakeChatModel:
+    replay_path = os.getenv("LLM_REPLAY_PATH", "")
+    recordings = load_recordings(replay_path)
+    if replay_path:
+        logger.info(f"🎞️ Loaded {len(recordings)} recorded LLM responses from {replay_path}")
+    return FakeChatModel(
+        latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("LLM_FAKE_JITTER_MS", "0")),
+        seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+        use_recorded_latency=os.getenv("LLM_REPLAY_RECORDED_LATENCY", "0") == "1",
+        recordings=recordings,
+        cache=cache,
+        rate_limiter=rate_limiter,
+    )
@@ -1,20 +1,39 @@
-from typing import Literal
+from typing import List, Literal, Union
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from langgraph.checkpoint.memory import MemorySaver
 
-from agents.state import AgentState, NodeName
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Import state the same way the node modules do, so custom reducers resolve to
+# a single AgentState definition
+from state import AgentState, NodeName
+from agents.timing import timed_node
+from agents.tracing import traced
+from agents.checkpoint import SQLiteCheckpointSaver
 from agents.main_agent.node import main_agent_node
+from agents.main_agent.multi_rfp import rfp_analysis_node, compare_rfps_node
 from agents.sales_agent.node import sales_agent_node
 from agents.technical_agent.node import technical_agent_node
-from agents.pricing_agent.node import pricing_agent_node
+from agents.pricing_agent.node import pricing_agent_node, test_pricing_node
 
 
-def route_from_main(state: AgentState) -> str:
+def route_from_main(state: AgentState) -> Union[str, List[Union[str, Send]]]:
     next_node = state.get("next_node", NodeName.END)
     if next_node == NodeName.SALES_AGENT:
         return "sales_agent"
+    elif next_node == NodeName.RFP_ANALYSIS:
+        # Map: one concurrent analysis per selected RFP, reduced by compare_rfps
+        return [
+            Send("rfp_analysis", {"selected_rfp": rfp, "session_id": state.get("session_id", "default")})
+            for rfp in state.get("selected_rfps", [])
+        ]
     elif next_node == NodeName.TECHNICAL_AGENT:
-        return "technical_agent"
+        # Test pricing only needs the RFP's testing requirements, so it runs
+        # alongside technical matching instead of after it
+        return ["technical_agent", "test_pricing_agent"]
     return END
 
 
@@ -22,13 +41,6 @@ def route_from_sales(state: AgentState) -> str:
     return END
 
 
-def route_from_technical(state: AgentState) -> str:
-    next_node = state.get("next_node", NodeName.END)
-    if next_node == NodeName.PRICING_AGENT:
-        return "pricing_agent"
-    return END
-
-
 def route_from_pricing(state: AgentState) -> str:
     next_node = state.get("next_node", NodeName.END)
     if next_node == NodeName.MAIN_AGENT:
@@ -36,13 +48,23 @@ def route_from_pricing(state: AgentState) -> str:
     return END
 
 
+def create_checkpointer():
+    """Durable SQLite checkpoints by default; CHECKPOINTER=memory keeps the old in-process saver."""
+    if os.getenv("CHECKPOINTER", "sqlite").lower() == "memory":
+        return MemorySaver()
+    return SQLiteCheckpointSaver()
+
+
 def create_workflow() -> StateGraph:
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("main_agent", main_agent_node)
-    workflow.add_node("sales_agent", sales_agent_node)
-    workflow.add_node("technical_agent", technical_agent_node)
-    workflow.add_node("pricing_agent", pricing_agent_node)
+    workflow.add_node("main_agent", timed_node(NodeName.MAIN_AGENT, main_agent_node))
+    workflow.add_node("sales_agent", timed_node(NodeName.SALES_AGENT, sales_agent_node))
+    workflow.add_node("technical_agent", timed_node(NodeName.TECHNICAL_AGENT, technical_agent_node))
+    workflow.add_node("test_pricing_agent", timed_node(NodeName.TEST_PRICING_AGENT, test_pricing_node))
+    workflow.add_node("pricing_agent", timed_node(NodeName.PRICING_AGENT, pricing_agent_node))
+    workflow.add_node("rfp_analysis", traced("node", NodeName.RFP_ANALYSIS)(rfp_analysis_node))
+    workflow.add_node("compare_rfps", timed_node(NodeName.COMPARE_RFPS, compare_rfps_node))
 
     workflow.set_entry_point("main_agent")
 
@@ -52,6 +74,8 @@ def create_workflow() -> StateGraph:
         {
             "sales_agent": "sales_agent",
             "technical_agent": "technical_agent",
+            "test_pricing_agent": "test_pricing_agent",
+            "rfp_analysis": "rfp_analysis",
             END: END
         }
     )
@@ -62,14 +86,11 @@ def create_workflow() -> StateGraph:
         {END: END}
     )
 
-    workflow.add_conditional_edges(
-        "technical_agent",
-        route_from_technical,
-        {
-            "pricing_agent": "pricing_agent",
-            END: END
-        }
-    )
+    # Join: pricing waits for both parallel branches to finish
+    workflow.add_edge(["technical_agent", "test_pricing_agent"], "pricing_agent")
+
+    workflow.add_edge("rfp_analysis", "compare_rfps")
+    workflow.add_edge("compare_rfps", END)
 
     workflow.add_conditional_edges(
         "pricing_agent",
@@ -80,8 +101,7 @@ def create_workflow() -> StateGraph:
         }
     )
 
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory)
+    app = workflow.compile(checkpointer=create_checkpointer())
 
     return app
 
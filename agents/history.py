@@ -0,0 +1,65 @@
+import os
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langgraph.graph.message import add_messages
+
+# Marks the synthetic message that stands in for turns dropped from the window
+SUMMARY_MESSAGE_ID = "history-summary"
+
+
+def _history_window() -> int:
+    """Number of recent messages kept verbatim; 0 keeps the whole history."""
+    return int(os.getenv("CHAT_HISTORY_WINDOW", "20"))
+
+
+def _summary_chars() -> int:
+    """Characters kept per folded message in the running summary."""
+    return int(os.getenv("CHAT_HISTORY_SUMMARY_CHARS", "160"))
+
+
+def _summary_max_lines() -> int:
+    return int(os.getenv("CHAT_HISTORY_SUMMARY_MAX_LINES", "40"))
+
+
+def summarize_messages(messages: List[BaseMessage], previous: Optional[str] = None) -> str:
+    """
+    Fold older turns into a compact, extractive summary.
+
+    Each message contributes one truncated line; the result is capped so the
+    summary itself stays bounded however long the conversation runs.
+    """
+    lines = previous.splitlines()[1:] if previous else []
+    limit = _summary_chars()
+    for message in messages:
+        text = " ".join(str(message.content).split())
+        if len(text) > limit:
+            text = text[:limit].rstrip() + "…"
+        lines.append(f"- {message.type}: {text}")
+    lines = lines[-_summary_max_lines():]
+    return "Summary of earlier conversation:\n" + "\n".join(lines)
+
+
+def merge_messages(existing: Optional[List[BaseMessage]], new: Optional[List[BaseMessage]]) -> List[BaseMessage]:
+    """
+    Message reducer: append by ID like ``add_messages``, then keep a bounded window.
+
+    Messages pushed out of the window are folded into a single summary message at
+    the head of the list, so checkpoint size stays flat across long sessions.
+    """
+    merged = add_messages(existing or [], new or [])
+    window = _history_window()
+
+    previous_summary = None
+    if merged and merged[0].id == SUMMARY_MESSAGE_ID:
+        previous_summary = merged[0].content
+        merged = merged[1:]
+
+    if window <= 0 or len(merged) <= window:
+        if previous_summary is None:
+            return merged
+        return [SystemMessage(content=previous_summary, id=SUMMARY_MESSAGE_ID)] + merged
+
+    folded, kept = merged[:-window], merged[-window:]
+    summary = SystemMessage(content=summarize_messages(folded, previous_summary), id=SUMMARY_MESSAGE_ID)
+    return [summary] + kept
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "llm_cache.sqlite")
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+def _dump_generations(generations: Sequence[Generation]) -> str:
+    return json.dumps([
+        {"message": message_to_dict(g.message)} if isinstance(g, ChatGeneration) else {"text": g.text}
+        for g in generations
+    ], ensure_ascii=False)
+
+
+def _load_generations(value: str) -> list:
+    return [
+        ChatGeneration(message=messages_from_dict([g["message"]])[0]) if "message" in g else Generation(text=g["text"])
+        for g in json.loads(value)
+    ]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_hit_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_hit ON llm_cache (last_hit_at);
+CREATE TABLE IF NOT EXISTS llm_cache_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+@contextmanager
+def bypass_llm_cache(bypass: bool = True) -> Iterator[None]:
+    """Skip cache lookups for LLM calls made inside this block; fresh answers still refresh the cache."""
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain LLM cache in a local SQLite file, shared by every worker process.
+
+    Keys hash the model parameters LangChain reports for the call (model name,
+    temperature, ...) together with the serialized messages. Entries expire after
+    ``ttl_seconds``; once the stored responses exceed ``max_bytes`` the least
+    recently hit ones are evicted. Hit/miss counts and the upstream latency that
+    hits avoided are kept in the same file, so stats cover all processes.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_DB_PATH)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # key -> perf_counter at the miss, to measure the upstream call that follows
+        self._pending: Dict[str, float] = {}
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _bump(self, **deltas: float) -> None:
+        self._conn.executemany(
+            "INSERT INTO llm_cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(deltas.items()),
+        )
+
+    # ------------------------------------------------------------ BaseCache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        if _bypass.get():
+            self._pending[key] = time.perf_counter()
+            with self._lock:
+                self._bump(bypassed=1)
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, latency_ms, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[2] <= self.ttl_seconds:
+                self._conn.execute(
+                    "UPDATE llm_cache SET hits = hits + 1, last_hit_at = ? WHERE key = ?", (now, key)
+                )
+                self._bump(hits=1, saved_ms=row[1])
+                try:
+                    return _load_generations(row[0])
+                except Exception:
+                    logger.warning("⚠️ Dropping unreadable LLM cache entry")
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    return None
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._bump(misses=1)
+
+        self._pending[key] = time.perf_counter()
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        started = self._pending.pop(key, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        value = _dump_generations(return_val)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, latency_ms, created_at, last_hit_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, value, len(value), round(latency_ms, 2), now, now),
+            )
+            self._evict()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.execute("DELETE FROM llm_cache_stats")
+
+    # Run off the event loop; asyncio.to_thread keeps the bypass context var
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await asyncio.to_thread(self.clear, **kwargs)
+
+    # ------------------------------------------------------------ housekeeping
+
+    def _evict(self) -> None:
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently hit entries until back under budget
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_hit_at ASC"):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self._bump(evicted=len(victims))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM llm_cache_stats").fetchall())
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": int(hits),
+            "misses": int(misses),
+            "bypassed": int(counters.get("bypassed", 0)),
+            "evicted": int(counters.get("evicted", 0)),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "latency_saved_ms": round(counters.get("saved_ms", 0.0), 2),
+        }
+
+
+_cache_instance: Optional[SQLiteLLMCache] = None
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """Process-wide cache instance, or None when LLM_CACHE=0."""
+    global _cache_instance
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    if _cache_instance is None:
+        _cache_instance = SQLiteLLMCache()
+    return _cache_instance
@@ -1,15 +1,48 @@
 import os
+from typing import Union
+
 from dotenv import load_dotenv
+from langchain_core.language_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
+from agents.llm_cache import get_llm_cache
+from agents.llm_scheduler import ScheduledLLM, get_scheduler
+
 load_dotenv()
 
 _llm_instance = None
+_scheduled_llm = None
+
 
+def _recording_callbacks():
+    """Record real responses to LLM_RECORD_PATH so benchmarks can replay them offline."""
+    record_path = os.getenv('LLM_RECORD_PATH')
+    if not record_path:
+        return None
+    from fake_llm import LLMRecorder
+    return [LLMRecorder(record_path)]
 
-def get_shared_llm() -> ChatOpenAI:
-    global _llm_instance
+
+def get_shared_llm() -> Union[BaseChatModel, ScheduledLLM]:
+    global _llm_instance, _scheduled_llm
     
+    scheduler = get_scheduler()
+
+    if _llm_instance is None and os.getenv('LLM_PROVIDER', 'cerebras').lower() in ('fake', 'replay'):
+        # Offline canned/recorded responses for benchmarks; never calls the provider
+        from fake_llm import create_fake_llm
+        _llm_instance = create_fake_llm(cache=get_llm_cache(), rate_limiter=scheduler.rate_limiter)
+
+    if _llm_instance is None and os.getenv('LLM_ENDPOINTS'):
+        # Several OpenAI-compatible endpoints with latency-aware routing and hedging
+        from agents.llm_pool import create_pooled_llm, load_endpoint_config
+        _llm_instance = create_pooled_llm(
+            load_endpoint_config(),
+            cache=get_llm_cache(),
+            rate_limiter=scheduler.rate_limiter,
+            callbacks=_recording_callbacks()
+        )
+
     if _llm_instance is None:
         api_key = os.getenv('CEREBRAS_API_KEY')
         if not api_key:
@@ -21,7 +54,17 @@ def get_shared_llm() -> ChatOpenAI:
             model=os.getenv('CEREBRAS_MODEL', 'gpt-oss-120b'),
             temperature=float(os.getenv('LLM_TEMPERATURE', '0.7')),
             timeout=120,
-            max_retries=2
+            # Retries are left to the scheduler, which backs off every caller together
+            # on a rate limit instead of letting each client retry into the burst;
+            # without it, keep the client's own retries
+            max_retries=2 if os.getenv('LLM_SCHEDULER', '1') == '0' else 0,
+            cache=get_llm_cache(),
+            rate_limiter=scheduler.rate_limiter,
+            callbacks=_recording_callbacks()
         )
-    
-    return _llm_instance
+
+    if os.getenv('LLM_SCHEDULER', '1') == '0':
+        return _llm_instance
+    if _scheduled_llm is None or _scheduled_llm.llm is not _llm_instance:
+        _scheduled_llm = ScheduledLLM(_llm_instance, scheduler)
+    return _scheduled_llm
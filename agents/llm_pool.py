@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """One OpenAI-compatible upstream plus the latency statistics used to route to it."""
+
+    def __init__(self, name: str, llm: BaseChatModel, alpha: float = 0.2, window: int = 200):
+        self.name = name
+        self.llm = llm
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self.recent: deque = deque(maxlen=window)
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.hedges_won = 0
+        self.cooldown_until = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.recent.append(ms)
+        self.ewma_ms = ms if self.ewma_ms is None else self.alpha * ms + (1 - self.alpha) * self.ewma_ms
+
+    def observe_lower_bound(self, ms: float) -> None:
+        """A cancelled hedge loser took at least ``ms``; only let that make it look slower."""
+        if self.ewma_ms is None or ms > self.ewma_ms:
+            self.observe(ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.recent) < 10:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def score(self, now: float) -> float:
+        """Lower is better. Untried endpoints go first so every endpoint gets measured."""
+        if now < self.cooldown_until:
+            return float("inf")
+        if self.ewma_ms is None:
+            return -1.0
+        return self.ewma_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "model": getattr(self.llm, "model_name", None),
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "p95_ms": round(self.quantile(0.95), 2) if self.quantile(0.95) is not None else None,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "hedges_won": self.hedges_won,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+        }
+
+
+class PooledChatModel(BaseChatModel):
+    """
+    Chat model that spreads calls over a pool of OpenAI-compatible endpoints.
+
+    Each call goes to the endpoint with the lowest recent EWMA latency, except for
+    an ``explore`` share of calls that probe another endpoint. With hedging on, if the answer hasn't arrived after
+    the endpoint's recent ``hedge_quantile`` latency, the same request is sent to
+    the next-best endpoint and whichever answers first wins; the other is
+    cancelled. Failed endpoints are skipped for ``cooldown_seconds`` and the call
+    fails over to the next one.
+
+    Cache and rate limiter are applied here, once per logical call, so the cache
+    key doesn't depend on which endpoint answered.
+    """
+
+    endpoints: List[Any]
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    hedge_delay_ms: float = 2000.0
+    hedge_min_delay_ms: float = 50.0
+    hedge_budget: float = 0.2
+    cooldown_seconds: float = 30.0
+    explore: float = 0.05
+    _hedges_sent: int = PrivateAttr(0)
+    _calls: int = PrivateAttr(0)
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+
+    @property
+    def _llm_type(self) -> str:
+        return "openai-pool"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        models = sorted({str(getattr(e.llm, "model_name", "")) for e in self.endpoints})
+        temperature = getattr(self.endpoints[0].llm, "temperature", None) if self.endpoints else None
+        return {"models": models, "temperature": temperature}
+
+    # ------------------------------------------------------------ routing
+
+    def _ranked(self) -> List[Endpoint]:
+        now = time.monotonic()
+        # Endpoints cooling down sort last but remain a last resort
+        ranked = sorted(self.endpoints, key=lambda e: e.score(now))
+        if len(ranked) > 1 and self._rng.random() < self.explore:
+            # Occasionally lead with another endpoint so one bad spike on the
+            # best endpoint doesn't leave its EWMA stale forever
+            i = self._rng.randrange(1, len(ranked))
+            ranked[0], ranked[i] = ranked[i], ranked[0]
+        return ranked
+
+    def _hedge_delay(self, endpoint: Endpoint) -> float:
+        q = endpoint.quantile(self.hedge_quantile)
+        delay_ms = q if q is not None else self.hedge_delay_ms
+        return max(delay_ms, self.hedge_min_delay_ms) / 1000
+
+    def _may_hedge(self) -> bool:
+        # Cap duplicate load at hedge_budget of all calls
+        return self.hedge and len(self.endpoints) > 1 and self._hedges_sent < self.hedge_budget * max(self._calls, 10)
+
+    def _failed(self, endpoint: Endpoint, error: BaseException) -> None:
+        endpoint.errors += 1
+        endpoint.cooldown_until = time.monotonic() + self.cooldown_seconds
+        logger.warning(f"⚠️ LLM endpoint {endpoint.name} failed ({type(error).__name__}); cooling down {self.cooldown_seconds:.0f}s")
+
+    async def _attempt(self, endpoint: Endpoint, messages, stop, kwargs) -> ChatResult:
+        endpoint.in_flight += 1
+        endpoint.calls += 1
+        start = time.perf_counter()
+        try:
+            result = await endpoint.llm._agenerate(messages, stop=stop, **kwargs)
+        except asyncio.CancelledError:
+            endpoint.observe_lower_bound((time.perf_counter() - start) * 1000)
+            raise
+        except Exception as e:
+            self._failed(endpoint, e)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.observe((time.perf_counter() - start) * 1000)
+        return result
+
+    # ------------------------------------------------------------ BaseChatModel
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        ranked = self._ranked()
+        tasks: Dict[asyncio.Task, Endpoint] = {}
+        tried: List[Endpoint] = []
+        last_error: Optional[BaseException] = None
+
+        def launch(endpoint: Endpoint) -> None:
+            tried.append(endpoint)
+            tasks[asyncio.create_task(self._attempt(endpoint, messages, stop, kwargs))] = endpoint
+
+        launch(ranked[0])
+        try:
+            while tasks:
+                hedge_ready = self._may_hedge() and len(tried) < len(ranked)
+                timeout = self._hedge_delay(tried[-1]) if hedge_ready and len(tasks) == 1 else None
+                done, _ = await asyncio.wait(set(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than its usual tail: race a duplicate
+                    self._hedges_sent += 1
+                    launch(ranked[len(tried)])
+                    continue
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    if task.exception() is None:
+                        if len(tried) > 1 and endpoint is not tried[0]:
+                            endpoint.hedges_won += 1
+                        return task.result()
+                    last_error = task.exception()
+                if not tasks and len(tried) < len(ranked):
+                    # Fail over to the next endpoint
+                    launch(ranked[len(tried)])
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # Sync path: best endpoint with failover, no hedging
+        last_error: Optional[BaseException] = None
+        for endpoint in self._ranked():
+            start = time.perf_counter()
+            try:
+                result = endpoint.llm._generate(messages, stop=stop, **kwargs)
+            except Exception as e:
+                self._failed(endpoint, e)
+                last_error = e
+                continue
+            endpoint.observe((time.perf_counter() - start) * 1000)
+            return result
+        raise last_error
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        # Streams are routed but not hedged; fail over only before the first chunk
+        last_error: Optional[BaseException] = None
+        for endpoint in self._ranked():
+            endpoint.in_flight += 1
+            endpoint.calls += 1
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in endpoint.llm._astream(messages, stop=stop, **kwargs):
+                    started = True
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+            except Exception as e:
+                self._failed(endpoint, e)
+                if started:
+                    raise
+                last_error = e
+                continue
+            finally:
+                endpoint.in_flight -= 1
+            endpoint.observe((time.perf_counter() - start) * 1000)
+            return
+        raise last_error
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        endpoint = self._ranked()[0]
+        for chunk in endpoint.llm._stream(messages, stop=stop, **kwargs):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedge": self.hedge,
+            "hedge_quantile": self.hedge_quantile,
+            "calls": self._calls,
+            "hedges_sent": self._hedges_sent,
+            "endpoints": [e.stats() for e in self.endpoints],
+        }
+
+
+_active_pool: Optional[PooledChatModel] = None
+
+
+def load_endpoint_config() -> List[Dict[str, Any]]:
+    """
+    LLM_ENDPOINTS: JSON list of {"name", "base_url", "model", "api_key" or "api_key_env"},
+    inline or as a path to a JSON file. Empty when unset.
+    """
+    raw = os.getenv("LLM_ENDPOINTS", "").strip()
+    if not raw:
+        return []
+    if not raw.startswith("["):
+        with open(raw, "r", encoding="utf-8") as f:
+            raw = f.read()
+    endpoints = json.loads(raw)
+    if not isinstance(endpoints, list) or not endpoints:
+        raise ValueError("LLM_ENDPOINTS must be a non-empty JSON list")
+    return endpoints
+
+
+def create_pooled_llm(endpoint_configs: List[Dict[str, Any]], cache=None, rate_limiter=None,
+                      callbacks=None) -> PooledChatModel:
+    global _active_pool
+    from langchain_openai import ChatOpenAI
+
+    endpoints = []
+    for i, cfg in enumerate(endpoint_configs):
+        api_key = cfg.get("api_key") or os.getenv(cfg.get("api_key_env", "CEREBRAS_API_KEY"), "")
+        llm = ChatOpenAI(
+            api_key=api_key or "not-needed",
+            base_url=cfg["base_url"],
+            model=cfg.get("model") or os.getenv("CEREBRAS_MODEL", "gpt-oss-120b"),
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.7")),
+            timeout=float(cfg.get("timeout", 120)),
+            max_retries=0,
+        )
+        endpoints.append(Endpoint(cfg.get("name") or f"endpoint-{i}", llm))
+
+    logger.info(f"🔀 LLM pool with {len(endpoints)} endpoints: {', '.join(e.name for e in endpoints)}")
+    _active_pool = PooledChatModel(
+        endpoints=endpoints,
+        hedge=os.getenv("LLM_HEDGE", "1") != "0",
+        hedge_quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95")),
+        hedge_delay_ms=float(os.getenv("LLM_HEDGE_DELAY_MS", "2000")),
+        hedge_min_delay_ms=float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "50")),
+        hedge_budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.2")),
+        cooldown_seconds=float(os.getenv("LLM_ENDPOINT_COOLDOWN_SECONDS", "30")),
+        explore=float(os.getenv("LLM_POOL_EXPLORE", "0.05")),
+        cache=cache,
+        rate_limiter=rate_limiter,
+        callbacks=callbacks,
+    )
+    return _active_pool
+
+
+def get_active_pool() -> Optional[PooledChatModel]:
+    """The pool behind the shared LLM, or None when LLM_ENDPOINTS isn't set."""
+    return _active_pool
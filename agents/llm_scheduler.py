@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import hashlib
+import logging
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from agents.tracing import current_trace_id, registry
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+LANES = {"interactive": 0, "batch": 1}
+
+_lane: ContextVar[str] = ContextVar("llm_lane", default="interactive")
+# Per-call accumulator for time spent waiting on the rate limiter inside the model call
+_rate_wait: ContextVar[Optional[List[float]]] = ContextVar("llm_rate_wait", default=None)
+
+
+@contextmanager
+def llm_lane(lane: str) -> Iterator[None]:
+    """Run LLM calls made inside this block in the given priority lane."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown LLM lane: {lane}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def _is_rate_limit(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+# Same failures the OpenAI client retries by itself (its own retries are turned off)
+_TRANSIENT_ERRORS = {"APITimeoutError", "APIConnectionError", "InternalServerError", "ReadTimeout", "ConnectTimeout"}
+
+
+def _is_transient(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409) or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in _TRANSIENT_ERRORS
+
+
+class PrioritySemaphore:
+    """Counting semaphore whose waiters are woken lowest-priority-value first, FIFO within a lane."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    def waiting(self) -> Dict[str, int]:
+        counts = {lane: 0 for lane in LANES}
+        names = {v: k for k, v in LANES.items()}
+        for priority, _, fut in self._waiters:
+            if not fut.done():
+                counts[names[priority]] += 1
+        return counts
+
+    async def acquire(self, priority: int) -> None:
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), fut)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(entry)
+                except ValueError:
+                    # release() already popped it and skipped it as cancelled
+                    pass
+                else:
+                    heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                # Hand the slot straight to the next waiter; in_use is unchanged
+                fut.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class TokenBucket:
+    """Async token bucket (``rate`` requests/second, ``burst`` capacity) with priority-ordered waiters."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._timer = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int) -> float:
+        """Wait for a token; returns seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        start = time.perf_counter()
+        self._refill()
+        if self.tokens >= 1 and not self._waiters:
+            self.tokens -= 1
+            return 0.0
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._schedule(0)
+        await fut
+        return time.perf_counter() - start
+
+    def penalize(self, seconds: float) -> None:
+        """Back off everyone after the provider reports a rate limit."""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._drain)
+
+    def _drain(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self.tokens -= 1
+            fut.set_result(None)
+        self._waiters = [w for w in self._waiters if not w[2].done()]
+        heapq.heapify(self._waiters)
+        if self._waiters:
+            self._schedule((1 - self.tokens) / self.rate)
+
+
+class SchedulerRateLimiter(BaseRateLimiter):
+    """
+    Adapter that lets LangChain apply the scheduler's token bucket. Chat models
+    call the rate limiter after their cache lookup, so cache hits never spend
+    rate-limit tokens.
+    """
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        # Sync calls bypass the scheduler entirely
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        waited = await self.bucket.acquire(LANES[_lane.get()])
+        acc = _rate_wait.get()
+        if acc is not None:
+            acc.append(waited)
+        return True
+
+
+class LLMScheduler:
+    """
+    Admission control in front of the shared LLM.
+
+    - at most ``max_concurrency`` upstream calls in flight (priority semaphore)
+    - at most ``rate`` calls/second with ``burst`` headroom (token bucket)
+    - identical in-flight requests share one upstream call (``coalesce``); if
+      the caller making it is cancelled, one of the others takes over
+    - ``interactive`` calls are admitted before ``batch`` ones
+    - rate-limit errors back off the whole bucket and retry with jitter;
+      timeouts, connection errors and 5xx responses retry with backoff for
+      that call only
+
+    Queue wait and upstream latency are recorded as separate tracing spans.
+    """
+
+    def __init__(self, max_concurrency: int = 8, rate: float = 0, burst: float = 1, max_retries: int = 2,
+                 coalesce: bool = True):
+        self.semaphore = PrioritySemaphore(max_concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.rate_limiter = SchedulerRateLimiter(self.bucket)
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {"calls": 0, "coalesced": 0, "takeovers": 0, "rate_limited": 0,
+                          "transient_errors": 0, "retries": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            rate=float(os.getenv("LLM_RATE_PER_SEC", "0")),
+            burst=float(os.getenv("LLM_RATE_BURST", "4")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            coalesce=os.getenv("LLM_COALESCE", "1") != "0",
+        )
+
+    @staticmethod
+    def request_key(llm: Any, messages: Any, kwargs: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(messages, list):
+            return None
+        try:
+            payload = json.dumps(
+                [id(llm), [(m.type, m.content) for m in messages], sorted(kwargs.items())],
+                default=str, separators=(",", ":"),
+            )
+        except AttributeError:
+            return None
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def run(self, llm: Any, messages: Any, config: Any = None, **kwargs) -> Any:
+        key = self.request_key(llm, messages, kwargs) if self.coalesce else None
+        if key is not None and key in self._inflight:
+            self._counters["coalesced"] += 1
+            while key in self._inflight:
+                shared = self._inflight[key]
+                try:
+                    # shield: a cancelled follower must not cancel the shared call
+                    return await asyncio.shield(shared)
+                except asyncio.CancelledError:
+                    if not shared.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    # The caller making the shared call was cancelled, not us: the first
+                    # follower to wake makes the call itself and the rest wait on it
+            self._counters["takeovers"] += 1
+
+        fut = asyncio.get_running_loop().create_future() if key is not None else None
+        if fut is not None:
+            self._inflight[key] = fut
+        try:
+            result = await self._call(llm, messages, config, **kwargs)
+        except asyncio.CancelledError:
+            if fut is not None:
+                fut.cancel()
+            raise
+        except Exception as e:
+            if fut is not None:
+                fut.set_exception(e)
+                # Followers re-raise it; keep the loop from warning when there are none
+                fut.exception()
+            raise
+        else:
+            if fut is not None:
+                fut.set_result(result)
+            return result
+        finally:
+            if key is not None:
+                self._inflight.pop(key, None)
+
+    async def _call(self, llm: Any, messages: Any, config: Any, **kwargs) -> Any:
+        lane = _lane.get()
+        priority = LANES[lane]
+        attempt = 0
+        while True:
+            queued = time.perf_counter()
+            await self.semaphore.acquire(priority)
+            admitted = time.perf_counter()
+            rate_waits: List[float] = []
+            token = _rate_wait.set(rate_waits)
+            outcome = "ok"
+            try:
+                self._counters["calls"] += 1
+                return await llm.ainvoke(messages, config, **kwargs)
+            except Exception as e:
+                outcome = "error"
+                rate_limited = _is_rate_limit(e)
+                if not (rate_limited or _is_transient(e)) or attempt >= self.max_retries:
+                    self._counters["errors"] += 1
+                    raise
+                backoff = min(30.0, 2 ** attempt) * (0.5 + random.random())
+                if rate_limited:
+                    self._counters["rate_limited"] += 1
+                    self.bucket.penalize(backoff)
+                    logger.warning(f"⚠️ LLM rate limited; retry {attempt + 1}/{self.max_retries} in {backoff:.1f}s")
+                else:
+                    # Only this call backs off; a timeout or 5xx says nothing about the rate
+                    self._counters["transient_errors"] += 1
+                    logger.warning(f"⚠️ LLM call failed ({type(e).__name__}); "
+                                   f"retry {attempt + 1}/{self.max_retries} in {backoff:.1f}s")
+            finally:
+                _rate_wait.reset(token)
+                self.semaphore.release()
+                done = time.perf_counter()
+                rate_wait = sum(rate_waits)
+                trace_id = current_trace_id()
+                registry.observe("llm_queue", lane, "ok", (admitted - queued) + rate_wait, trace_id)
+                registry.observe("llm_upstream", lane, outcome, done - admitted - rate_wait, trace_id)
+            attempt += 1
+            self._counters["retries"] += 1
+            await asyncio.sleep(backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.semaphore.capacity,
+            "in_flight": self.semaphore.in_use,
+            "waiting": self.semaphore.waiting(),
+            "rate_per_sec": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "coalesce": self.coalesce,
+            "coalescing_keys": len(self._inflight),
+            **self._counters,
+        }
+
+
+class ScheduledLLM:
+    """
+    Drop-in wrapper for the shared chat model: ``ainvoke`` goes through the
+    scheduler, everything else is delegated to the wrapped model.
+    """
+
+    def __init__(self, llm: Any, scheduler: LLMScheduler):
+        self.llm = llm
+        self.scheduler = scheduler
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        return await self.scheduler.run(self.llm, input, config, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler.from_env()
+    return _scheduler
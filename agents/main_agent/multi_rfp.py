@@ -0,0 +1,130 @@
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage
+
+from state import AgentState, WorkflowStep, NodeName
+from agents.timing import timed_node
+from technical_agent.node import technical_agent_node
+from pricing_agent.node import pricing_agent_node, test_pricing_node
+from main_agent.node import build_rfp_report, get_rfp_id
+
+logger = logging.getLogger(__name__)
+
+
+async def rfp_analysis_node(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map step: run technical, pricing and report generation for one RFP.
+
+    Receives a ``Send`` payload rather than the full graph state, so several
+    copies run concurrently and only their ``rfp_reports`` entries are merged.
+    """
+    selected_rfp = payload["selected_rfp"]
+    rfp_id = get_rfp_id(selected_rfp)
+    start = time.perf_counter()
+    sub_state = {
+        "selected_rfp": selected_rfp,
+        "session_id": payload.get("session_id", "default"),
+        "node_timings": [],
+    }
+
+    report = {
+        "rfp_id": rfp_id,
+        "title": selected_rfp.get("title"),
+        "client": selected_rfp.get("client"),
+        "estimated_value": selected_rfp.get("estimated_value") or selected_rfp.get("value"),
+    }
+
+    def absorb(name: str, result: Dict[str, Any]) -> None:
+        sub_state["node_timings"] = sub_state["node_timings"] + result.pop("node_timings", [])
+        result.pop("messages", None)
+        sub_state.update(result)
+        if result.get("current_step") == WorkflowStep.ERROR:
+            raise RuntimeError(f"{name} failed for {rfp_id}")
+
+    try:
+        # Same shape as the single-RFP graph: technical and test pricing side by side, then the join
+        technical, test_pricing = await asyncio.gather(
+            timed_node(NodeName.TECHNICAL_AGENT, technical_agent_node)(sub_state),
+            timed_node(NodeName.TEST_PRICING_AGENT, test_pricing_node)(sub_state),
+        )
+        absorb(NodeName.TECHNICAL_AGENT, technical)
+        absorb(NodeName.TEST_PRICING_AGENT, test_pricing)
+        absorb(NodeName.PRICING_AGENT, await timed_node(NodeName.PRICING_AGENT, pricing_agent_node)(sub_state))
+
+        technical_analysis = sub_state["technical_analysis"]
+        pricing_analysis = sub_state["pricing_analysis"]
+        built = await build_rfp_report(selected_rfp, technical_analysis, pricing_analysis, sub_state["session_id"])
+        report.update({
+            "status": WorkflowStep.COMPLETE,
+            "summary": built["summary"],
+            "report_url": built["report_url"],
+            "report_path": built["report_path"],
+            "products_recommended": len(technical_analysis.get("recommended_products", [])),
+            "grand_total": pricing_analysis.get("inputs", {}).get("grand_total"),
+        })
+    except Exception as e:
+        logger.error(f"❌ Analysis failed for {rfp_id}: {e}")
+        report.update({"status": WorkflowStep.ERROR, "error": str(e)})
+
+    report["node_timings"] = sub_state["node_timings"]
+    report["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return {"rfp_reports": [report]}
+
+
+def _format_total(value) -> str:
+    return f"₹{value:,.0f}" if isinstance(value, (int, float)) else "N/A"
+
+
+async def compare_rfps_node(state: AgentState) -> Dict[str, Any]:
+    """Reduce step: combine per-RFP reports into a single comparison response."""
+    logger.info("📑 RFP COMPARISON STARTED")
+
+    order = [get_rfp_id(r) for r in state.get("selected_rfps", [])]
+    reports: List[Dict[str, Any]] = sorted(
+        state.get("rfp_reports", []) or [],
+        key=lambda r: order.index(r["rfp_id"]) if r["rfp_id"] in order else len(order),
+    )
+
+    lines = [
+        f"## Comparison of {len(reports)} RFPs\n",
+        "| # | RFP ID | Title | Products | Grand Total | Report |",
+        "|---|--------|-------|----------|-------------|--------|",
+    ]
+    for i, r in enumerate(reports, 1):
+        link = f"[PDF]({r['report_url']})" if r.get("report_url") else "—"
+        lines.append(
+            f"| {i} | {r['rfp_id']} | {r.get('title', 'N/A')} | {r.get('products_recommended', '—')} "
+            f"| {_format_total(r.get('grand_total'))} | {link} |"
+        )
+
+    for r in reports:
+        lines.append(f"\n### {r['rfp_id']} - {r.get('title', 'N/A')}\n")
+        if r.get("status") == WorkflowStep.ERROR:
+            lines.append(f"❌ Analysis failed: {r.get('error')}")
+            continue
+        lines.append(r.get("summary", ""))
+        lines.append(f"\n📄 **[Download PDF Report]({r['report_url']})**")
+
+    durations = [r.get("duration_ms", 0.0) for r in reports]
+    if durations:
+        logger.info(f"⏱️ Slowest RFP {max(durations):.0f}ms vs {sum(durations):.0f}ms if run one after another")
+
+    response = "\n".join(lines)
+    failed = all(r.get("status") == WorkflowStep.ERROR for r in reports)
+
+    logger.info(f"✅ Combined {len(reports)} RFP reports")
+    logger.info(f"🔄 Routing to: {NodeName.END}")
+
+    return {
+        "messages": [AIMessage(content=response)],
+        "final_response": response,
+        "current_step": WorkflowStep.ERROR if failed else WorkflowStep.COMPLETE,
+        "next_node": NodeName.END
+    }
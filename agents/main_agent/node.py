@@ -1,6 +1,7 @@
 import json
+import logging
 from typing import Dict, Any
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage
 
 import sys
 import os
@@ -8,8 +9,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
 from llm_config import get_shared_llm
-from backend.utils import generate_pdf_report
-from main_agent.tools import extract_rfp_selection, is_scan_request, is_selection_request
+from executors import run_blocking
+from agents.tracing import span
+from agents.prompts import EXECUTIVE_SUMMARY_INSTRUCTIONS, PromptBuilder
+from backend.core.report_store import get_report_store
+from main_agent.tools import extract_rfp_selection, extract_rfp_selections, is_scan_request, is_selection_request
+
+logger = logging.getLogger(__name__)
 
 
 ORCHESTRATOR_PROMPT = """You are the Orchestrator Agent that coordinates the RFP response workflow.
@@ -50,11 +56,64 @@ def get_rfp_id(rfp: dict) -> str:
     return rfp.get("id") or rfp.get("rfp_id", "")
 
 
-def main_agent_node(state: AgentState) -> Dict[str, Any]:
+async def build_rfp_report(
+    selected_rfp: Dict[str, Any],
+    technical_analysis: Dict[str, Any],
+    pricing_analysis: Dict[str, Any],
+    session_id: str,
+) -> Dict[str, str]:
+    """Write the executive summary and store the report sections for one analysed RFP."""
+    llm = get_shared_llm()
+    rfp_id = get_rfp_id(selected_rfp) or "rfp"
+
+    report_url = f"/api/reports/{session_id}/{rfp_id}"
+
+    summary = (pricing_analysis or {}).get("executive_summary")
+    if summary:
+        logger.info(f"📝 Executive summary for {rfp_id} came with the pricing analysis")
+    else:
+        # Simplified prompt - don't include massive JSONs
+        prompt = PromptBuilder("executive_summary").add(f"""
+You are the Main Orchestrator. Create a brief executive summary for this RFP response.
+
+RFP: {get_rfp_id(selected_rfp)} - {selected_rfp.get('title')}
+Value: ₹{selected_rfp.get('estimated_value') or selected_rfp.get('value', 'N/A')}
+
+Key Points:
+- Technical analysis: {len((technical_analysis or {}).get('recommended_products', []))} products recommended
+- Total cost: ₹{(pricing_analysis or {}).get('inputs', {}).get('grand_total', 'N/A')}
+
+{EXECUTIVE_SUMMARY_INSTRUCTIONS}
+""")
+
+        logger.info(f"🤖 Generating executive summary for {rfp_id}...")
+        with span("llm", "executive_summary"):
+            response = await llm.ainvoke(prompt.messages())
+        summary = response.content
+        logger.info(f"📥 Executive summary received ({len(summary)} chars)")
+
+    sections = [
+        ("Executive Summary", summary),
+        ("Technical Analysis", (technical_analysis or {}).get("analysis", "")),
+        ("Pricing Summary", (pricing_analysis or {}).get("analysis", "")),
+    ]
+
+    # Only the sections are stored here; the PDF is rendered on first download
+    saved = await run_blocking(
+        get_report_store().save, session_id, rfp_id, f"RFP Response Report - {rfp_id}", sections
+    )
+    logger.info(f"📄 Report sections saved at {saved['manifest_path']}")
+
+    return {
+        "summary": summary,
+        "report_path": saved["manifest_path"],
+        "report_url": report_url,
+    }
+
+
+async def main_agent_node(state: AgentState) -> Dict[str, Any]:
     """Routes user requests to appropriate agent."""
-    print("\n" + "="*60)
-    print("🎯 MAIN AGENT (ORCHESTRATOR) STARTED")
-    print("="*60)
+    logger.info("🎯 MAIN AGENT (ORCHESTRATOR) STARTED")
     
     user_message = state["messages"][-1].content if state["messages"] else ""
     rfps_identified = state.get("rfps_identified", [])
@@ -62,96 +121,81 @@ def main_agent_node(state: AgentState) -> Dict[str, Any]:
     technical_analysis = state.get("technical_analysis")
     selected_rfp = state.get("selected_rfp")
     
-    print(f"User message: {user_message[:100]}...")
-    print(f"RFPs identified: {len(rfps_identified)}")
-    print(f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'}")
-    print(f"Technical analysis: {'✓' if technical_analysis else '✗'}")
-    print(f"Pricing analysis: {'✓' if pricing_analysis else '✗'}")
+    logger.debug(
+        f"User message: {user_message[:100]}... | RFPs identified: {len(rfps_identified)} | "
+        f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'} | "
+        f"Technical analysis: {'✓' if technical_analysis else '✗'} | "
+        f"Pricing analysis: {'✓' if pricing_analysis else '✗'}"
+    )
 
     if pricing_analysis and technical_analysis and selected_rfp and not state.get("final_response"):
-        print("📊 All analyses complete - generating final PDF report...")
+        logger.info("📊 All analyses complete - preparing final report...")
         try:
-            llm = get_shared_llm()
-            session_id = state.get("session_id", "default")
-            rfp_id = get_rfp_id(selected_rfp) or "rfp"
-
-            report_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "reports")
-            report_filename = f"{session_id}_{rfp_id}.pdf".replace("/", "_")
-            report_path = os.path.join(report_dir, report_filename)
-            report_url = f"/api/reports/{session_id}/{rfp_id}"
-
-            # Simplified prompt - don't include massive JSONs
-            prompt = f"""
-You are the Main Orchestrator. Create a brief executive summary for this RFP response.
-
-RFP: {get_rfp_id(selected_rfp)} - {selected_rfp.get('title')}
-Value: ₹{selected_rfp.get('estimated_value') or selected_rfp.get('value', 'N/A')}
-
-Key Points:
-- Technical analysis: {len((technical_analysis or {}).get('recommended_products', []))} products recommended
-- Total cost: ₹{(pricing_analysis or {}).get('inputs', {}).get('grand_total', 'N/A')}
-
-Provide a 2-3 sentence executive summary with a recommendation (proceed/review/decline).
-"""
-
-            print("🤖 Generating executive summary...")
-            response = llm.invoke([HumanMessage(content=prompt)])
-            print(f"📥 Executive summary received ({len(response.content)} chars)")
-
-            sections = [
-                ("Executive Summary", response.content),
-                ("Technical Analysis", (technical_analysis or {}).get("analysis", "")),
-                ("Pricing Summary", (pricing_analysis or {}).get("analysis", "")),
-            ]
-            
-            print(f"📄 Generating PDF at {report_path}...")
-            generate_pdf_report(report_path, f"RFP Response Report - {rfp_id}", sections)
-            print(f"✅ PDF successfully generated!")
-            
-        except Exception as pdf_error:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"❌ PDF Generation Error:\n{error_details}")
+            report = await build_rfp_report(
+                selected_rfp,
+                technical_analysis,
+                pricing_analysis,
+                state.get("session_id", "default"),
+            )
+        except Exception as report_error:
+            logger.exception("❌ Report Generation Error")
             return {
-                "messages": [AIMessage(content=f"❌ Error generating PDF: {str(pdf_error)}")],
+                "messages": [AIMessage(content=f"❌ Error generating report: {str(report_error)}")],
                 "next_node": NodeName.END,
                 "current_step": WorkflowStep.ERROR
             }
 
         final_message = (
-            f"{response.content}\n\n"
+            f"{report['summary']}\n\n"
             f"---\n\n"
-            f"📄 **[Download PDF Report]({report_url})**"
+            f"📄 **[Download PDF Report]({report['report_url']})**"
         )
         
-        print(f"✅ PDF generated at: {report_path}")
-        print(f"🔄 Routing to: {NodeName.END}")
-        print("="*60 + "\n")
+        logger.info(f"✅ Report ready at: {report['report_url']}")
+        logger.info(f"🔄 Routing to: {NodeName.END}")
 
         return {
             "messages": [AIMessage(content=final_message)],
-            "final_response": response.content,
-            "report_path": report_path,
-            "report_url": report_url,
+            "final_response": report["summary"],
+            "report_path": report["report_path"],
+            "report_url": report["report_url"],
             "current_step": WorkflowStep.COMPLETE,
             "next_node": NodeName.END
         }
 
     if rfps_identified and is_selection_request(user_message):
-        print("🔍 Detected RFP selection request")
-        selected_id = extract_rfp_selection(user_message, rfps_identified)
-        print(f"Selected ID: {selected_id}")
+        logger.info("🔍 Detected RFP selection request")
+        selected_ids = extract_rfp_selections(user_message, rfps_identified)
+        logger.info(f"Selected IDs: {selected_ids}")
+
+        if len(selected_ids) > 1:
+            selected_rfps = [r for sid in selected_ids for r in rfps_identified if get_rfp_id(r) == sid]
+            logger.info(f"🔄 Fanning out analysis for {len(selected_rfps)} RFPs")
+            return {
+                "selected_rfps": selected_rfps,
+                "rfp_reports": None,
+                "selected_rfp": None,
+                "final_response": None,
+                "waiting_for_user": False,
+                "current_step": WorkflowStep.ANALYZING,
+                "next_node": NodeName.RFP_ANALYSIS
+            }
 
+        selected_id = selected_ids[0] if selected_ids else extract_rfp_selection(user_message, rfps_identified)
         if selected_id:
             selected_rfp = next((r for r in rfps_identified if (r.get("id") == selected_id or r.get("rfp_id") == selected_id)), None)
 
             if selected_rfp:
-                print(f"✅ RFP found: {get_rfp_id(selected_rfp)}")
-                print(f"🔄 Routing to: {NodeName.TECHNICAL_AGENT}")
-                print("="*60 + "\n")
+                logger.info(f"✅ RFP found: {get_rfp_id(selected_rfp)}")
+                logger.info(f"🔄 Routing to: {NodeName.TECHNICAL_AGENT}")
                 return {
                     "selected_rfp": selected_rfp,
                     "user_selected_rfp_id": selected_id,
+                    # Clear the previous RFP's results so the join and report run fresh
+                    "technical_analysis": None,
+                    "test_pricing": None,
+                    "pricing_analysis": None,
+                    "final_response": None,
                     "waiting_for_user": False,
                     "current_step": WorkflowStep.ANALYZING,
                     "next_node": NodeName.TECHNICAL_AGENT
@@ -164,16 +208,14 @@ Provide a 2-3 sentence executive summary with a recommendation (proceed/review/d
         }
 
     if is_scan_request(user_message) or not rfps_identified:
-        print(f"🔍 Detected scan request")
-        print(f"🔄 Routing to: {NodeName.SALES_AGENT}")
-        print("="*60 + "\n")
+        logger.info(f"🔍 Detected scan request")
+        logger.info(f"🔄 Routing to: {NodeName.SALES_AGENT}")
         return {
             "current_step": WorkflowStep.SCANNING,
             "next_node": NodeName.SALES_AGENT
         }
 
-    print("❓ No clear action - ending workflow")
-    print("="*60 + "\n")
+    logger.info("❓ No clear action - ending workflow")
     return {
         "messages": [AIMessage(content="I can help you scan for RFPs or analyze a selected one. What would you like to do?")],
         "next_node": NodeName.END
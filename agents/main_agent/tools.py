@@ -38,6 +38,36 @@ def extract_rfp_selection(message: str, rfps_identified: list) -> str:
     return ""
 
 
+def extract_rfp_selections(message: str, rfps_identified: list) -> list:
+    """Extract every RFP ID selected in a message (e.g. "analyze 1, 3 and 4", "top 3")."""
+    message_lower = message.lower()
+
+    def get_rfp_id(rfp):
+        return rfp.get("id") or rfp.get("rfp_id", "")
+
+    selected = []
+    for rfp in rfps_identified:
+        rfp_id = get_rfp_id(rfp)
+        if rfp_id and rfp_id.lower() in message_lower:
+            selected.append(rfp_id)
+            # Keep the digits inside an ID from being read as list positions
+            message_lower = message_lower.replace(rfp_id.lower(), " ")
+
+    top_match = re.search(r"\b(?:top|first)\s+(\d+)\b", message_lower)
+    if top_match:
+        count = min(int(top_match.group(1)), len(rfps_identified))
+        selected.extend(get_rfp_id(r) for r in rfps_identified[:count])
+        message_lower = message_lower.replace(top_match.group(0), " ")
+
+    for num in re.findall(r"\b(\d+)\b", message_lower):
+        idx = int(num) - 1
+        if 0 <= idx < len(rfps_identified):
+            selected.append(get_rfp_id(rfps_identified[idx]))
+
+    # Preserve the order the user asked for, without repeats
+    return list(dict.fromkeys(s for s in selected if s))
+
+
 def is_scan_request(message: str) -> bool:
     """Check if user wants to scan for RFPs."""
     keywords = ["scan", "find", "search", "show", "list", "rfp", "tender", "cable", "wire"]
@@ -47,7 +77,7 @@ def is_scan_request(message: str) -> bool:
 
 def is_selection_request(message: str) -> bool:
     """Check if user is selecting an RFP."""
-    keywords = ["select", "choose", "pick", "option", "number", "go with", "analyze", "#"]
+    keywords = ["select", "choose", "pick", "option", "number", "go with", "analyze", "compare", "#"]
     message_lower = message.lower()
     if any(kw in message_lower for kw in keywords):
         return True
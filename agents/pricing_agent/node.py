@@ -1,6 +1,6 @@
-import json
+import logging
 from typing import Dict, Any, List
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import AIMessage
 
 import sys
 import os
@@ -8,14 +8,31 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
 from llm_config import get_shared_llm
+from executors import run_blocking
+from agents.timing import branch_timings
+from agents.tracing import span
+from agents.prompts import (
+    EXECUTIVE_SUMMARY_INSTRUCTIONS,
+    PromptBuilder,
+    sections_instructions,
+    split_sections,
+    truncate,
+)
 from pricing_agent.tools import (
-    load_test_pricing,
     recommend_tests,
     calculate_testing_cost,
     calculate_material_cost,
     calculate_pricing_breakdown,
 )
 
+logger = logging.getLogger(__name__)
+
+# "single": one LLM call writes the pricing narrative and the executive summary;
+# "split": the report step makes its own executive summary call
+REPORT_SYNTHESIS = os.getenv("REPORT_SYNTHESIS", "single").lower()
+
+PRICING_SUMMARY_INSTRUCTIONS = "Provide a concise pricing summary with key assumptions and next steps."
+
 
 def get_rfp_id(rfp: dict) -> str:
     """Helper to get RFP ID (supports both 'id' and 'rfp_id' fields)"""
@@ -64,42 +81,119 @@ Present a structured quote containing:
 """
 
 
-def pricing_agent_node(state: AgentState) -> Dict[str, Any]:
-    """Generate pricing summary for selected RFP."""
-    print("\n" + "="*60)
-    print("💰 PRICING AGENT STARTED")
-    print("="*60)
+def aggregate_line_items(line_items: List[Dict[str, Any]]) -> List[list]:
+    """One table row per SKU (qty, line count, average and extended price), most expensive first."""
+    by_sku: Dict[str, Dict[str, Any]] = {}
+    for item in line_items:
+        row = by_sku.setdefault(item["sku"], {"quantity": 0, "lines": 0, "cost": 0.0, "requirements": []})
+        row["quantity"] += item["quantity"]
+        row["lines"] += 1
+        row["cost"] += item["cost"]
+        row["requirements"].append(item.get("requirement", ""))
+
+    rows = []
+    for sku, row in sorted(by_sku.items(), key=lambda kv: kv[1]["cost"], reverse=True):
+        requirement = truncate(row["requirements"][0], 60)
+        if row["lines"] > 1:
+            requirement += f" (+{row['lines'] - 1} similar)"
+        avg_price = row["cost"] / row["quantity"] if row["quantity"] else 0.0
+        rows.append([sku, row["quantity"], row["lines"], avg_price, row["cost"], requirement])
+    return rows
+
+
+def summarize_line_items(rows: List[list]) -> str:
+    """Single line standing in for the SKUs that didn't fit the prompt budget."""
+    quantity = sum(r[1] for r in rows)
+    lines = sum(r[2] for r in rows)
+    cost = sum(r[4] for r in rows)
+    return (f"… plus {len(rows)} smaller SKUs ({lines} line items, {quantity:,} m) "
+            f"totalling ₹{cost:,.2f}, included in the material cost below")
+
+
+def price_testing_requirements(selected_rfp: Dict[str, Any]) -> Dict[str, Any]:
+    """Price the RFP's testing requirements (independent of the technical match)."""
+    rfp_testing_reqs = selected_rfp.get("testing_requirements", [])
+    recommended_tests = recommend_tests(rfp_testing_reqs)
+    return {
+        "rfp_id": get_rfp_id(selected_rfp),
+        "recommended_tests": recommended_tests,
+        "testing_cost": calculate_testing_cost(recommended_tests),
+    }
+
+
+def price_materials(recommended_products: List[Any]) -> tuple:
+    """Cost each matched SKU at its quantity; returns (material_cost, line_items)."""
+    material_cost = 0
+    line_items = []
+    for product in recommended_products:
+        if isinstance(product, dict):
+            sku = product.get("sku", "")
+            qty = product.get("quantity", 1000)
+            if sku:
+                line_cost = calculate_material_cost(sku, qty)
+                material_cost += line_cost
+                line_items.append({**product, "quantity": qty, "cost": line_cost})
+    return material_cost, line_items
+
+
+async def test_pricing_node(state: AgentState) -> Dict[str, Any]:
+    """Price testing requirements in parallel with technical matching."""
+    logger.info("🧪 TEST PRICING STARTED")
+
+    selected_rfp = state.get("selected_rfp")
+    if not selected_rfp:
+        logger.error("❌ No RFP selected!")
+        return {"test_pricing": None}
+
+    # Only write keys the technical branch does not touch; both run in the same step
+    # Catalog and test-pricing lookups can hit SQLite, so keep them off the event loop
+    test_pricing = await run_blocking(price_testing_requirements, selected_rfp)
+    logger.info(f"✅ Testing cost: ₹{test_pricing['testing_cost']:,.2f} ({len(test_pricing['recommended_tests'])} tests)")
+    return {"test_pricing": test_pricing}
+
+
+async def pricing_agent_node(state: AgentState) -> Dict[str, Any]:
+    """Join node: price matched materials, add test costs and write the pricing summary."""
+    logger.info("💰 PRICING AGENT STARTED")
     
     llm = get_shared_llm()
     selected_rfp = state.get("selected_rfp")
     
-    print(f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'}")
+    logger.info(f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'}")
 
     if not selected_rfp:
-        print("❌ No RFP selected!")
+        logger.error("❌ No RFP selected!")
         return {
             "messages": [AIMessage(content="No RFP selected. Please select an RFP first.")],
             "next_node": NodeName.END,
             "current_step": WorkflowStep.ERROR
         }
 
+    technical_analysis = state.get("technical_analysis")
+    if not technical_analysis or get_rfp_id(technical_analysis) != get_rfp_id(selected_rfp):
+        # Technical branch failed and already reported the error
+        logger.error("❌ No technical analysis for selected RFP - skipping pricing")
+        return {
+            "next_node": NodeName.END,
+            "current_step": WorkflowStep.ERROR
+        }
+
     try:
-        print("💵 Loading pricing data...")
-        pricing_db = load_test_pricing()
-        rfp_testing_reqs = selected_rfp.get("testing_requirements", [])
-        recommended_tests = recommend_tests(rfp_testing_reqs)
-        testing_cost = calculate_testing_cost(recommended_tests)
+        test_pricing = state.get("test_pricing")
+        if not test_pricing or get_rfp_id(test_pricing) != get_rfp_id(selected_rfp):
+            test_pricing = await run_blocking(price_testing_requirements, selected_rfp)
+        recommended_tests = test_pricing["recommended_tests"]
+        testing_cost = test_pricing["testing_cost"]
+        timings = branch_timings(
+            state.get("node_timings", []),
+            [NodeName.TECHNICAL_AGENT, NodeName.TEST_PRICING_AGENT],
+        )
+        logger.info(f"⏱️ Branches: {timings['branches_ms']} → critical path {timings['critical_path_ms']}ms "
+                    f"(saved {timings['saved_ms']}ms vs sequential)")
 
-        technical_analysis = state.get("technical_analysis") or {}
         recommended_products = technical_analysis.get("recommended_products", [])
         
-        material_cost = 0
-        for product in recommended_products:
-            if isinstance(product, dict):
-                sku = product.get("sku", "")
-                qty = product.get("quantity", 1000)
-                if sku:
-                    material_cost += calculate_material_cost(sku, qty)
+        material_cost, line_items = await run_blocking(price_materials, recommended_products)
         overhead, contingency, subtotal, grand_total = calculate_pricing_breakdown(material_cost, testing_cost)
 
         pricing_summary = {
@@ -113,51 +207,77 @@ def pricing_agent_node(state: AgentState) -> Dict[str, Any]:
             "contingency_cost": contingency,
             "subtotal": subtotal,
             "grand_total": grand_total,
+            "timings": timings,
         }
 
-        # Only include essential technical data - not the full analysis text
-        prompt = f"""
+        # Line items go in as an aggregated per-SKU table trimmed to the node's token budget
+        prompt = PromptBuilder(NodeName.PRICING_AGENT)
+        prompt.add(f"""
 Selected RFP: {get_rfp_id(selected_rfp)} - {selected_rfp.get('title')}
 Value: ₹{selected_rfp.get('estimated_value') or selected_rfp.get('value', 'N/A')}
-
-Recommended Products (from Technical Agent):
-{json.dumps(recommended_products, indent=2, default=str)}
-
+""")
+        prompt.add_table(
+            f"Recommended Products (from Technical Agent; {len(line_items)} line items, largest first):",
+            ["SKU", "Qty (m)", "Lines", "Avg ₹/m", "Extended ₹", "Requirement"],
+            aggregate_line_items(line_items),
+            summarize_tail=summarize_line_items,
+        )
+        prompt.add(f"""
 Pricing Breakdown:
 - Material Cost: ₹{material_cost:,.2f}
 - Testing Cost: ₹{testing_cost:,.2f}
 - Overhead (5%): ₹{overhead:,.2f}
 - Contingency (3%): ₹{contingency:,.2f}
 - **Grand Total: ₹{grand_total:,.2f}**
+""")
+        single_call = REPORT_SYNTHESIS == "single"
+        if single_call:
+            # The executive summary only needs these totals; write it in the same call
+            prompt.add(sections_instructions([
+                ("pricing summary", PRICING_SUMMARY_INSTRUCTIONS),
+                ("executive summary", f"{EXECUTIVE_SUMMARY_INSTRUCTIONS} The technical analysis "
+                                      f"recommended {len(recommended_products)} products."),
+            ]))
+        else:
+            prompt.add(PRICING_SUMMARY_INSTRUCTIONS)
+        messages = prompt.messages(PRICING_AGENT_PROMPT)
 
-Provide a concise pricing summary with key assumptions and next steps.
-"""
-
-        messages = [
-            SystemMessage(content=PRICING_AGENT_PROMPT),
-            HumanMessage(content=prompt)
-        ]
-
-        print(f"🤖 Calling LLM for pricing analysis... (prompt size: {len(prompt)} chars)")
+        logger.info(f"🤖 Calling LLM for pricing analysis... (~{prompt.tokens} prompt tokens)")
         try:
-            response = llm.invoke(messages)
-            print(f"📥 LLM response received ({len(response.content)} chars)")
+            with span("llm", "report_synthesis" if single_call else "pricing_summary"):
+                response = await llm.ainvoke(messages)
+            logger.info(f"📥 LLM response received ({len(response.content)} chars)")
         except Exception as llm_error:
-            print(f"❌ LLM call failed: {str(llm_error)}")
+            logger.error(f"❌ LLM call failed: {str(llm_error)}")
             raise
+
+        analysis, executive_summary = response.content, None
+        if single_call:
+            sections = split_sections(response.content, ["pricing summary", "executive summary"])
+            if sections:
+                analysis, executive_summary = sections["pricing summary"], sections["executive summary"]
+            else:
+                # The report step will ask for the executive summary separately
+                logger.warning("⚠️ Combined pricing/executive summary response not in the expected sections; "
+                               "falling back to a separate summary call")
         
-        print(f"✅ Pricing analysis complete. Grand total: ₹{pricing_summary['grand_total']}")
-        print(f"🔄 Routing to: {NodeName.MAIN_AGENT}")
-        print("="*60 + "\n")
+        logger.info(f"✅ Pricing analysis complete. Grand total: ₹{pricing_summary['grand_total']}")
+        logger.info(f"🔄 Routing to: {NodeName.MAIN_AGENT}")
 
         return {
-            "messages": [AIMessage(content=response.content)],
-            "pricing_analysis": {"rfp_id": get_rfp_id(selected_rfp), "analysis": response.content, "inputs": pricing_summary},
+            "messages": [AIMessage(content=analysis)],
+            "pricing_analysis": {
+                "rfp_id": get_rfp_id(selected_rfp),
+                "analysis": analysis,
+                "executive_summary": executive_summary,
+                "inputs": pricing_summary,
+            },
             "current_step": WorkflowStep.COMPLETE,
             "next_node": NodeName.MAIN_AGENT
         }
 
     except Exception as e:
+        logger.exception("❌ Pricing Agent Error")
         return {
             "messages": [AIMessage(content=f"Error generating pricing: {str(e)}")],
             "next_node": NodeName.END,
@@ -1,27 +1,9 @@
 from langchain.tools import tool
 from typing import List, Dict
-import os
 import json
 
-
-def load_test_pricing():
-    pricing_path = os.path.join(os.path.dirname(__file__), '../../data/test_pricing.json')
-    if os.path.exists(pricing_path):
-        with open(pricing_path, 'r') as f:
-            return json.load(f)
-    return {}
-
-
-def load_oem_catalog():
-    catalog_path = os.path.join(os.path.dirname(__file__), '../../data/catalog.json')
-    if os.path.exists(catalog_path):
-        with open(catalog_path, 'r') as f:
-            return json.load(f)
-    return []
-
-
-TEST_PRICING = load_test_pricing()
-OEM_PRODUCT_CATALOG = load_oem_catalog()
+# Catalog and test prices come from the configured storage backend (JSON or SQLite)
+from backend.core.storage import get_storage
 
 # Volume Discount Tiers
 VOLUME_DISCOUNTS = [
@@ -38,7 +20,7 @@ def get_product_price(sku: str, quantity: str) -> str:
     Get the price for a product SKU with quantity-based discounts.
     Input: sku - Product SKU, quantity - Quantity in meters (e.g., '5000')
     """
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+    product = get_storage().catalog.get(sku)
     
     if not product:
         return f"Product with SKU '{sku}' not found."
@@ -77,17 +59,18 @@ def get_test_pricing_tool(test_name: str) -> str:
     Get pricing for a specific test or acceptance requirement.
     Input: Test name (e.g., 'Factory Acceptance Test (FAT)')
     """
-    if test_name in TEST_PRICING:
-        test = TEST_PRICING[test_name]
+    test_pricing = get_storage().test_pricing.all()
+    if test_name in test_pricing:
+        test = test_pricing[test_name]
         return f"**{test_name}**\n- Price: ₹{test['price']:,}\n- Duration: {test['duration_days']} days"
     
     # Fuzzy match
     test_lower = test_name.lower()
-    for name, details in TEST_PRICING.items():
+    for name, details in test_pricing.items():
         if test_lower in name.lower():
             return f"**{name}**\n- Price: ₹{details['price']:,}\n- Duration: {details['duration_days']} days"
     
-    return f"Test '{test_name}' not found in pricing database. Available tests: {', '.join(TEST_PRICING.keys())}"
+    return f"Test '{test_name}' not found in pricing database. Available tests: {', '.join(test_pricing.keys())}"
 
 
 @tool("calculate_total_quote")
@@ -111,12 +94,13 @@ def calculate_total_quote(products_json: str, tests_json: str) -> str:
     result += "| SKU | Product | Qty | Unit Price | Discount | Total |\n"
     result += "|-----|---------|-----|------------|----------|-------|\n"
     
+    catalog = get_storage().catalog
     total_material_cost = 0
     for item in products:
         sku = item.get("sku", "")
         qty = item.get("quantity", 0)
         
-        product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+        product = catalog.get(sku)
         if product:
             base_price = product["base_price_per_meter"]
             
@@ -140,11 +124,12 @@ def calculate_total_quote(products_json: str, tests_json: str) -> str:
     result += "| Test | Price | Duration |\n"
     result += "|------|-------|----------|\n"
     
+    test_pricing = get_storage().test_pricing.all()
     total_test_cost = 0
     for test in tests:
-        if test in TEST_PRICING:
-            price = TEST_PRICING[test]["price"]
-            duration = TEST_PRICING[test]["duration_days"]
+        if test in test_pricing:
+            price = test_pricing[test]["price"]
+            duration = test_pricing[test]["duration_days"]
             total_test_cost += price
             result += f"| {test} | ₹{price:,} | {duration} days |\n"
     
@@ -178,7 +163,7 @@ def list_all_tests() -> str:
     result += "| Test Name | Price | Duration |\n"
     result += "|-----------|-------|----------|\n"
     
-    for test, details in TEST_PRICING.items():
+    for test, details in get_storage().test_pricing.all().items():
         result += f"| {test} | ₹{details['price']:,} | {details['duration_days']} days |\n"
     
     return result
@@ -186,10 +171,11 @@ def list_all_tests() -> str:
 
 def recommend_tests(rfp_testing_requirements: List[str]) -> List[str]:
     """Helper to match RFP testing requirements to available tests"""
+    test_names = list(get_storage().test_pricing.all())
     recommended = []
     for req in rfp_testing_requirements:
         req_lower = req.lower()
-        for test_name in TEST_PRICING.keys():
+        for test_name in test_names:
             if req_lower in test_name.lower() or test_name.lower() in req_lower:
                 if test_name not in recommended:
                     recommended.append(test_name)
@@ -198,7 +184,7 @@ def recommend_tests(rfp_testing_requirements: List[str]) -> List[str]:
 
 def calculate_material_cost(product_sku: str, quantity: int) -> float:
     """Helper to calculate material cost for a product"""
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == product_sku), None)
+    product = get_storage().catalog.get(product_sku)
     if not product:
         return 0
     
@@ -217,10 +203,11 @@ def calculate_material_cost(product_sku: str, quantity: int) -> float:
 
 def calculate_testing_cost(test_names: List[str]) -> float:
     """Helper to calculate total testing cost"""
+    test_pricing = get_storage().test_pricing.all()
     total = 0
     for test in test_names:
-        if test in TEST_PRICING:
-            total += TEST_PRICING[test]["price"]
+        if test in test_pricing:
+            total += test_pricing[test]["price"]
     return total
 
 
@@ -0,0 +1,170 @@
+import os
+import math
+import logging
+from typing import Any, Callable, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 2000
+# Never trim a table below this many rows, even when the fixed sections eat the budget
+MIN_TABLE_ROWS = 5
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Prompt token count. Uses tiktoken when PROMPT_TOKENIZER=tiktoken (its
+    encoding files must be available locally); otherwise a conservative
+    ~3.5 characters-per-token estimate, which is close enough for budgeting.
+    """
+    global _encoding
+    if _encoding is None and os.getenv("PROMPT_TOKENIZER", "estimate") == "tiktoken":
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(os.getenv("PROMPT_TOKENIZER_ENCODING", "o200k_base"))
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken unavailable ({type(e).__name__}); estimating prompt tokens")
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 3.5)
+
+
+def token_budget(node: str) -> int:
+    """PROMPT_TOKEN_BUDGET_<NODE> (e.g. PROMPT_TOKEN_BUDGET_PRICING_AGENT), else PROMPT_TOKEN_BUDGET."""
+    value = os.getenv(f"PROMPT_TOKEN_BUDGET_{node.upper()}") or os.getenv("PROMPT_TOKEN_BUDGET")
+    return int(value) if value else DEFAULT_TOKEN_BUDGET
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def markdown_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Compact pipe table: one line per row, no padding."""
+    lines = ["|" + "|".join(headers) + "|", "|" + "|".join("-" for _ in headers) + "|"]
+    lines += ["|" + "|".join(_cell(v) for v in row) + "|" for row in rows]
+    return "\n".join(lines)
+
+
+def truncate(text: str, max_chars: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+class PromptBuilder:
+    """
+    Assembles a user prompt under a per-node token budget (the node's fixed
+    system prompt is counted and logged, but not trimmed).
+
+    Fixed sections (``add``) are always kept. Tables (``add_table``) get what is
+    left of the budget: rows are assumed to be ordered most important first, and
+    rows that don't fit are replaced by a one-line summary from ``summarize_tail``.
+    """
+
+    def __init__(self, node: str, budget: Optional[int] = None):
+        self.node = node
+        self.budget = budget if budget is not None else token_budget(node)
+        self._parts: List[Any] = []
+        self.rows_total = 0
+        self.rows_kept = 0
+        self.tokens = 0
+
+    def add(self, text: str) -> "PromptBuilder":
+        self._parts.append(text.strip("\n"))
+        return self
+
+    def add_table(self, title: str, headers: Sequence[str], rows: Sequence[Sequence[Any]],
+                  summarize_tail: Optional[Callable[[Sequence[Sequence[Any]]], str]] = None) -> "PromptBuilder":
+        self._parts.append((title, list(headers), list(rows), summarize_tail))
+        return self
+
+    def _fit_table(self, title: str, headers: list, rows: list, summarize_tail, budget: int) -> str:
+        # Keep whole rows until the next one would overflow, leaving room for the tail line
+        kept = []
+        used = count_tokens(title) + count_tokens(markdown_table(headers, [])) + 40
+        for row in rows:
+            cost = count_tokens(markdown_table(headers, [row]).rsplit("\n", 1)[-1]) + 1
+            if used + cost > budget and len(kept) >= MIN_TABLE_ROWS:
+                break
+            kept.append(row)
+            used += cost
+        self.rows_total += len(rows)
+        self.rows_kept += len(kept)
+        text = f"{title}\n{markdown_table(headers, kept)}"
+        tail = rows[len(kept):]
+        if tail:
+            text += "\n" + (summarize_tail(tail) if summarize_tail else f"… {len(tail)} more rows omitted")
+        return text
+
+    def build(self) -> str:
+        self.rows_total = self.rows_kept = 0
+        fixed = sum(count_tokens(p) for p in self._parts if isinstance(p, str))
+        tables = [p for p in self._parts if not isinstance(p, str)]
+        # Split what's left of the budget between tables in proportion to their size
+        remaining = max(self.budget - fixed, 0)
+        sizes = [max(len(t[2]), 1) for t in tables]
+        out = []
+        for part in self._parts:
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                share = remaining * max(len(part[2]), 1) // sum(sizes)
+                out.append(self._fit_table(*part, share))
+        return "\n\n".join(out)
+
+    def messages(self, system: Optional[str] = None) -> List[BaseMessage]:
+        """Build the prompt, log its size and return [SystemMessage, HumanMessage]."""
+        prompt = self.build()
+        system_tokens = count_tokens(system) if system else 0
+        prompt_tokens = count_tokens(prompt)
+        self.tokens = system_tokens + prompt_tokens
+        trimmed = f", {self.rows_kept}/{self.rows_total} table rows kept" if self.rows_total else ""
+        logger.info(f"🧮 Prompt for {self.node}: ~{self.tokens} tokens "
+                    f"(system {system_tokens} + user {prompt_tokens}, budget {self.budget}){trimmed}")
+        messages = [SystemMessage(content=system)] if system else []
+        return messages + [HumanMessage(content=prompt)]
+
+
+EXECUTIVE_SUMMARY_INSTRUCTIONS = "Provide a 2-3 sentence executive summary with a recommendation (proceed/review/decline)."
+
+
+def section_marker(name: str) -> str:
+    return f"=== {name.upper()} ==="
+
+
+def sections_instructions(sections: Sequence[tuple]) -> str:
+    """Ask for several outputs in one response, each under its own marker line."""
+    lines = ["Answer with exactly these sections, each starting with its marker line on its own:"]
+    for name, instructions in sections:
+        lines.append(f"{section_marker(name)}\n{instructions}")
+    return "\n\n".join(lines)
+
+
+def split_sections(text: str, names: Sequence[str]) -> Optional[dict]:
+    """
+    Split a response written per ``sections_instructions`` into {name: text}.
+    Returns None unless every section is present and non-empty.
+    """
+    positions = []
+    for name in names:
+        index = text.find(section_marker(name))
+        if index < 0:
+            return None
+        positions.append((index, name))
+    positions.sort()
+    result = {}
+    for i, (index, name) in enumerate(positions):
+        end = positions[i + 1][0] if i + 1 < len(positions) else len(text)
+        body = text[index + len(section_marker(name)):end].strip()
+        if not body:
+            return None
+        result[name] = body
+    return result
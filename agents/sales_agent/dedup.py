@@ -0,0 +1,188 @@
+import os
+import re
+import random
+import hashlib
+from array import array
+from typing import List, Dict, Any, Iterable, Tuple, Union
+
+# MinHash over 32-bit shingle hashes with the universal family (a*x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+DEFAULT_THRESHOLD = float(os.getenv("RFP_DEDUP_THRESHOLD", "0.8"))
+DEFAULT_NUM_PERM = int(os.getenv("RFP_DEDUP_NUM_PERM", "32"))
+
+
+def get_rfp_id(rfp: dict) -> str:
+    """Helper to get RFP ID (supports both 'id' and 'rfp_id' fields)"""
+    return rfp.get("id") or rfp.get("rfp_id", "")
+
+
+def rfp_shingles(rfp: dict) -> set:
+    """Word unigrams and bigrams over title, client and scope of supply items."""
+    parts = [rfp.get("title", ""), rfp.get("client", "")]
+    for item in rfp.get("scope_of_supply", []) or []:
+        if isinstance(item, dict):
+            parts.append(item.get("item", ""))
+        else:
+            parts.append(str(item))
+
+    shingles = set()
+    for part in parts:
+        tokens = _TOKEN_RE.findall(str(part).lower())
+        shingles.update(tokens)
+        shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+
+def _hash_shingle(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) so the LSH S-curve (1/b)^(1/r) sits just below the threshold."""
+    best = (1, num_perm)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        curve = (1 / bands) ** (1 / rows)
+        # Prefer curves at or below the threshold so true duplicates are not missed
+        gap = threshold - curve if curve <= threshold else 2 * (curve - threshold)
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class MinHasher:
+    """Computes fixed-size MinHash signatures for shingle sets."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: Iterable[str]) -> array:
+        hashes = [_hash_shingle(s) for s in shingles]
+        if not hashes:
+            return array("I", [_MAX_HASH] * self.num_perm)
+        return array("I", [
+            min([(a * x + b) % _MERSENNE_PRIME for x in hashes]) & _MAX_HASH
+            for a, b in self.perms
+        ])
+
+
+class RFPDeduplicator:
+    """
+    Streaming near-duplicate detector backed by banded LSH.
+
+    Only canonical RFPs are indexed: each incoming RFP is compared against
+    every canonical sharing at least one band bucket, never against the whole
+    set. Signatures live in one flat ``array``; a bucket holds a plain int
+    until a second canonical lands in it and only then becomes an ``array``,
+    which keeps 1M tenders within a few hundred MB.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets: Dict[int, Union[int, array]] = {}
+        self.signatures = array("I")
+        self.canonicals: List[Dict[str, Any]] = []
+
+    def _band_keys(self, sig: array) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            start = band * self.rows
+            band_hash = hash(tuple(sig[start:start + self.rows])) & 0xFFFFFFFFFFFF
+            keys.append((band_hash << 8) | band)
+        return keys
+
+    def _similarity(self, sig: array, idx: int) -> float:
+        n = self.hasher.num_perm
+        other = self.signatures[idx * n:(idx + 1) * n]
+        return sum(1 for x, y in zip(sig, other) if x == y) / n
+
+    def add(self, rfp: Dict[str, Any]) -> Dict[str, Any]:
+        """Add an RFP; returns the canonical RFP it was merged into (or itself)."""
+        sig = self.hasher.signature(rfp_shingles(rfp))
+        keys = self._band_keys(sig)
+
+        checked = set()
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            for idx in ((bucket,) if isinstance(bucket, int) else bucket):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                if self._similarity(sig, idx) >= self.threshold:
+                    canonical = self.canonicals[idx]
+                    merge_duplicate(canonical, rfp)
+                    return canonical
+
+        idx = len(self.canonicals)
+        canonical = make_canonical(rfp)
+        self.canonicals.append(canonical)
+        self.signatures.extend(sig)
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = idx
+            elif isinstance(bucket, int):
+                self.buckets[key] = array("I", [bucket, idx])
+            else:
+                bucket.append(idx)
+        return canonical
+
+
+def _source_entry(rfp: dict) -> Dict[str, Any]:
+    return {
+        "id": get_rfp_id(rfp),
+        "url": rfp.get("url", "N/A"),
+        "title": rfp.get("title", ""),
+    }
+
+
+def make_canonical(rfp: Dict[str, Any]) -> Dict[str, Any]:
+    canonical = dict(rfp)
+    canonical["sources"] = [_source_entry(rfp)]
+    canonical["duplicate_ids"] = []
+    return canonical
+
+
+def merge_duplicate(canonical: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+    """Fold a duplicate listing into its canonical RFP, keeping a link to the source."""
+    canonical["sources"].append(_source_entry(duplicate))
+    dup_id = get_rfp_id(duplicate)
+    if dup_id and dup_id != get_rfp_id(canonical):
+        canonical["duplicate_ids"].append(dup_id)
+
+    # Fill gaps in the canonical record from the other portal's copy
+    for key, value in duplicate.items():
+        if key in ("sources", "duplicate_ids"):
+            continue
+        if value and not canonical.get(key):
+            canonical[key] = value
+
+
+def deduplicate_rfps(
+    rfps: Iterable[Dict[str, Any]],
+    threshold: float = None,
+    num_perm: int = None,
+) -> List[Dict[str, Any]]:
+    """Merge near-duplicate tenders into canonical RFPs (first listing wins)."""
+    dedup = RFPDeduplicator(
+        threshold=DEFAULT_THRESHOLD if threshold is None else threshold,
+        num_perm=num_perm or DEFAULT_NUM_PERM,
+    )
+    for rfp in rfps:
+        dedup.add(rfp)
+    return dedup.canonicals
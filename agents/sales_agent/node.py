@@ -1,5 +1,6 @@
 import os
 import json
+import logging
 from typing import Dict, Any
 from datetime import datetime
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
@@ -8,8 +9,12 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
-from sales_agent.tools import scan_rfp_websites, get_rfp_details, qualify_rfp_tool, prioritize_rfps_tool, SAMPLE_RFPS
+from sales_agent.tools import scan_rfp_websites, get_rfp_details, qualify_rfp_tool, prioritize_rfps_tool, canonical_rfps
 from llm_config import get_shared_llm
+from executors import run_blocking
+from agents.tracing import span
+
+logger = logging.getLogger(__name__)
 
 SALES_AGENT_SYSTEM_PROMPT = """You are a Sales Agent specialized in RFP (Request for Proposal) analysis for electrical cable manufacturing.
 
@@ -47,25 +52,34 @@ Present a structured summary containing:
 """
 
 
-def sales_agent_node(state: AgentState) -> Dict[str, Any]:
-    print("\n" + "="*60)
-    print("📊 SALES AGENT STARTED")
-    print("="*60)
+def _scan_and_prioritize() -> tuple:
+    """Scan, qualify and rank the RFP pool (CPU-bound on large tender sets)."""
+    with span("tool", "scan_rfp_websites"):
+        scan_rfp_websites.invoke({"urls": "all"})
+    pool = canonical_rfps()
+    logger.info(f"Scan complete: {len(pool)} RFPs in database")
+
+    with span("tool", "qualify_rfp"):
+        qualified_rfps = [rfp for rfp in pool if qualify_rfp_tool(rfp)]
+    logger.info(f"✅ Qualified: {len(qualified_rfps)} RFPs")
+    if not qualified_rfps:
+        return len(pool), qualified_rfps, []
+
+    # Prioritize top 5
+    with span("tool", "prioritize_rfps"):
+        top_rfps = prioritize_rfps_tool(qualified_rfps)
+    logger.info(f"📊 Prioritized top {len(top_rfps)} RFPs")
+    return len(pool), qualified_rfps, top_rfps
+
+
+async def sales_agent_node(state: AgentState) -> Dict[str, Any]:
+    logger.info("📊 SALES AGENT STARTED")
     
     llm = get_shared_llm()
 
     try:
-        print("🔍 Scanning RFPs...")
-        scan_result = scan_rfp_websites.invoke({"urls": "all"})
-        print(f"Scan complete: {len(SAMPLE_RFPS)} RFPs in database")
-
-        # Filter and qualify RFPs
-        qualified_rfps = []
-        for rfp in SAMPLE_RFPS:
-            if qualify_rfp_tool(rfp):
-                qualified_rfps.append(rfp)
-        
-        print(f"✅ Qualified: {len(qualified_rfps)} RFPs")
+        logger.info("🔍 Scanning RFPs...")
+        scanned, qualified_rfps, top_rfps = await run_blocking(_scan_and_prioritize)
 
         if not qualified_rfps:
             return {
@@ -74,15 +88,11 @@ def sales_agent_node(state: AgentState) -> Dict[str, Any]:
                 "current_step": WorkflowStep.COMPLETE
             }
 
-        # Prioritize top 5
-        top_rfps = prioritize_rfps_tool(qualified_rfps)
-        print(f"📊 Prioritized top {len(top_rfps)} RFPs")
-
         # Format results using LLM
         rfp_summary = f"""
 ## RFP Scan Results
 
-**Scanned:** {len(SAMPLE_RFPS)} RFPs
+**Scanned:** {scanned} RFPs
 **Qualified:** {len(qualified_rfps)} RFPs  
 **Top Opportunities:** {len(top_rfps)} RFPs
 
@@ -100,9 +110,8 @@ def sales_agent_node(state: AgentState) -> Dict[str, Any]:
         rfp_summary += "\n\n**Next Step:** Please reply with the RFP number (1-{}) you'd like to analyze in detail.\n".format(len(top_rfps))
         rfp_summary += "_Example: '1' or 'Analyze RFP 1'_"
 
-        print(f"✅ Sales agent complete. Top {len(top_rfps)} RFPs identified")
-        print(f"🔄 Routing to: {NodeName.END} (waiting for user selection)")
-        print("="*60 + "\n")
+        logger.info(f"✅ Sales agent complete. Top {len(top_rfps)} RFPs identified")
+        logger.info(f"🔄 Routing to: {NodeName.END} (waiting for user selection)")
 
         return {
             "messages": [AIMessage(content=rfp_summary)],
@@ -113,6 +122,7 @@ def sales_agent_node(state: AgentState) -> Dict[str, Any]:
         }
 
     except Exception as e:
+        logger.exception("❌ Sales Agent Error")
         return {
             "messages": [AIMessage(content=f"Error: {str(e)}")],
             "next_node": NodeName.END,
@@ -2,17 +2,57 @@ from langchain.tools import tool
 from typing import List, Dict
 from datetime import datetime, timedelta
 import os
-import json
 
-# Load sample RFPs from data folder
-def load_sample_rfps():
-    data_path = os.path.join(os.path.dirname(__file__), '../../data/rfps.json')
-    if os.path.exists(data_path):
-        with open(data_path, 'r') as f:
-            return json.load(f)
-    return []
+from sales_agent.dedup import RFPDeduplicator, get_rfp_id
+from backend.core.storage import get_storage, rfp_deadline
 
-SAMPLE_RFPS = load_sample_rfps()
+# Canonical RFPs for one RFP store: rebuilt from scratch only when an RFP it has
+# already seen is changed or deleted; new RFPs are added to the existing index.
+# by_id maps every listing ID, merged duplicates included, to its canonical RFP
+_canonical = {"store": None, "version": None, "dedup": None, "seen": {}, "by_id": {}}
+
+
+def canonical_rfps() -> List[dict]:
+    """
+    The RFP pool from the storage backend with cross-portal duplicates merged
+    (the same tender is often listed on several portals).
+    """
+    rfps = get_storage().rfps
+    cache = _canonical
+    if cache["store"] == id(rfps) and cache["version"] == rfps.version:
+        return cache["dedup"].canonicals
+
+    current = {get_rfp_id(r): r for r in rfps.all()}
+    seen = cache["seen"]
+    # Merges depend on listing order, so an edited or removed RFP means starting over
+    stale = cache["store"] != id(rfps) or any(
+        rfp_id not in current or current[rfp_id] != rfp for rfp_id, rfp in seen.items()
+    )
+    if stale:
+        cache.update(store=id(rfps), dedup=RFPDeduplicator(), seen={}, by_id={})
+        seen = cache["seen"]
+    dedup, by_id = cache["dedup"], cache["by_id"]
+    for rfp_id, rfp in current.items():
+        if rfp_id in seen:
+            continue
+        seen[rfp_id] = rfp
+        canonical = dedup.add(rfp)
+        by_id.setdefault(get_rfp_id(canonical), canonical)
+        by_id.setdefault(rfp_id, canonical)
+    cache["version"] = rfps.version
+    return dedup.canonicals
+
+
+def find_rfp(rfp_id: str) -> dict:
+    """Canonical RFP by its own ID or the ID of any listing merged into it, or None."""
+    canonical_rfps()
+    return _canonical["by_id"].get(rfp_id)
+
+
+def reference_now() -> datetime:
+    """'Today' for deadline checks; RFP_REFERENCE_DATE (YYYY-MM-DD) pins it for reproducible runs."""
+    pinned = os.getenv("RFP_REFERENCE_DATE")
+    return datetime.strptime(pinned, "%Y-%m-%d") if pinned else datetime.now()
 
 
 @tool("scan_rfp_websites")
@@ -22,19 +62,23 @@ def scan_rfp_websites(urls: str = "all") -> str:
     Returns a list of RFPs found with basic details.
     Input: 'all' to scan all sources, or comma-separated URLs.
     """
-    today = datetime.now()
+    today = reference_now()
     three_months_later = today + timedelta(days=90)
     
+    # Filter the cached canonical pool rather than deduplicating the window again,
+    # so a tender keeps the same canonical ID here as in get_rfp_details
     upcoming_rfps = []
-    for rfp in SAMPLE_RFPS:
-        deadline = datetime.strptime(rfp["submission_deadline"], "%Y-%m-%d")
+    for rfp in canonical_rfps():
+        if not rfp_deadline(rfp):
+            continue
+        deadline = datetime.strptime(rfp_deadline(rfp)[:10], "%Y-%m-%d")
         if today <= deadline <= three_months_later:
             upcoming_rfps.append({
                 "id": rfp["id"],
                 "title": rfp["title"],
                 "client": rfp["client"],
-                "submission_deadline": rfp["submission_deadline"],
-                "estimated_value": rfp["estimated_value"],
+                "submission_deadline": rfp_deadline(rfp),
+                "estimated_value": rfp.get("estimated_value") or rfp.get("value", "N/A"),
                 "url": rfp.get("url", "N/A"),
                 "days_remaining": (deadline - today).days,
             })
@@ -59,7 +103,7 @@ def get_rfp_details(rfp_id: str) -> str:
     technical specifications, and testing requirements.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = find_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -98,7 +142,7 @@ def extract_rfp_summary_for_technical(rfp_id: str) -> str:
     Focuses on scope of supply and technical specifications.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = find_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -132,7 +176,7 @@ def extract_rfp_summary_for_pricing(rfp_id: str) -> str:
     Focuses on testing and acceptance test requirements.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = find_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -141,12 +185,7 @@ def extract_rfp_summary_for_pricing(rfp_id: str) -> str:
     result += f"**Project:** {rfp['title']}\n"
     result += f"**Client:** {rfp['client']}\n\n"
     
-    # Load test pricing
-    test_pricing_path = os.path.join(os.path.dirname(__file__), '../../data/test_pricing.json')
-    test_pricing = {}
-    if os.path.exists(test_pricing_path):
-        with open(test_pricing_path, 'r') as f:
-            test_pricing = json.load(f)
+    test_pricing = get_storage().test_pricing.all()
     
     if "testing_requirements" in rfp:
         result += "## Testing & Acceptance Requirements\n"
@@ -184,7 +223,7 @@ def qualify_rfp_tool(rfp_data: dict) -> bool:
         deadline_str = rfp_data.get("submission_deadline", "")
         if deadline_str:
             deadline = datetime.strptime(deadline_str, "%Y-%m-%d")
-            days_remaining = (deadline - datetime.now()).days
+            days_remaining = (deadline - reference_now()).days
             if days_remaining < 7:
                 return False
         
@@ -230,7 +269,7 @@ def prioritize_rfps_tool(rfps: List[dict]) -> List[dict]:
         if deadline_str:
             try:
                 deadline = datetime.strptime(deadline_str, "%Y-%m-%d")
-                days_remaining = (deadline - datetime.now()).days
+                days_remaining = (deadline - reference_now()).days
                 if 30 <= days_remaining <= 60:
                     score += 50  # Optimal window
                 elif 15 <= days_remaining < 30:
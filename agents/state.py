@@ -1,16 +1,38 @@
 from typing import TypedDict, List, Dict, Optional, Any, Annotated
 from langchain_core.messages import BaseMessage
-import operator
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from history import merge_messages
+
+
+def merge_rfp_reports(existing: Optional[List[Dict[str, Any]]], new: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Collect per-RFP reports from parallel analyses; writing None starts a fresh batch."""
+    if new is None:
+        return []
+    return (existing or []) + new
+
+
+def merge_node_timings(existing: Optional[List[Dict[str, Any]]], new: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Append node timings within a turn; each turn writes None first so the checkpoint doesn't grow with the session."""
+    if new is None:
+        return []
+    return (existing or []) + new
 
 
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], operator.add]
+    messages: Annotated[List[BaseMessage], merge_messages]
     current_step: str
     next_node: str
     rfps_identified: List[Dict[str, Any]]
     selected_rfp: Optional[Dict[str, Any]]
+    selected_rfps: List[Dict[str, Any]]
+    rfp_reports: Annotated[List[Dict[str, Any]], merge_rfp_reports]
     user_selected_rfp_id: Optional[str]
     technical_analysis: Optional[Dict[str, Any]]
+    test_pricing: Optional[Dict[str, Any]]
     pricing_analysis: Optional[Dict[str, Any]]
     final_response: Optional[str]
     report_path: Optional[str]
@@ -21,6 +43,7 @@ class AgentState(TypedDict):
     user_prompt: Optional[str]
     agent_reasoning: List[Dict[str, Any]]
     tool_calls_made: List[Dict[str, Any]]
+    node_timings: Annotated[List[Dict[str, Any]], merge_node_timings]
     session_id: str
     error: Optional[str]
 
@@ -41,6 +64,9 @@ class NodeName:
     SALES_AGENT = "sales_agent"
     TECHNICAL_AGENT = "technical_agent"
     PRICING_AGENT = "pricing_agent"
+    TEST_PRICING_AGENT = "test_pricing_agent"
+    RFP_ANALYSIS = "rfp_analysis"
+    COMPARE_RFPS = "compare_rfps"
     WAIT_FOR_USER = "wait_for_user"
     END = "END"
 
@@ -54,8 +80,11 @@ def create_initial_state(session_id: str, user_message: str) -> AgentState:
         "next_node": NodeName.MAIN_AGENT,
         "rfps_identified": [],
         "selected_rfp": None,
+        "selected_rfps": [],
+        "rfp_reports": [],
         "user_selected_rfp_id": None,
         "technical_analysis": None,
+        "test_pricing": None,
         "pricing_analysis": None,
         "final_response": None,
         "report_path": None,
@@ -66,6 +95,7 @@ def create_initial_state(session_id: str, user_message: str) -> AgentState:
         "user_prompt": None,
         "agent_reasoning": [],
         "tool_calls_made": [],
+        "node_timings": [],
         "session_id": session_id,
         "error": None
     }
@@ -1,5 +1,7 @@
+import re
 import json
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 import sys
@@ -8,11 +10,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
 from llm_config import get_shared_llm
-from technical_agent.tools import (
-    match_rfp_requirement_to_products,
-    load_oem_catalog,
-    OEM_PRODUCT_CATALOG,
-)
+from technical_agent.tools import match_rfp_requirement_to_products
+from backend.core.storage import get_storage
+from executors import run_blocking
+from agents.tracing import span
+
+logger = logging.getLogger(__name__)
 
 
 def get_rfp_id(rfp: dict) -> str:
@@ -62,19 +65,55 @@ Present a structured matching report containing:
 """
 
 
-def technical_agent_node(state: AgentState) -> Dict[str, Any]:
+def match_scope_of_supply(scope_of_supply: List[Dict[str, Any]]) -> tuple:
+    """Match each scope item to catalog products; returns (matches, products for pricing, report text)."""
+    all_matches = []
+    products_for_pricing = []
+    matching_results_text = "## Product Matching Results\n\n"
+
+    for item in scope_of_supply:
+        requirement = item.get("item", "")
+        quantity_str = item.get("quantity", "")
+
+        logger.info(f"🔍 Matching: {requirement}")
+
+        with span("tool", "match_rfp_requirement_to_products"):
+            match_result = match_rfp_requirement_to_products.invoke({"rfp_requirement": requirement})
+        matching_results_text += f"### Requirement: {requirement} (Qty: {quantity_str})\n\n"
+        matching_results_text += match_result + "\n\n"
+
+        all_matches.append({
+            "requirement": requirement,
+            "quantity": quantity_str,
+            "matches": match_result
+        })
+
+        qty_num = int(re.sub(r'[^\d]', '', quantity_str)) if quantity_str else 1000
+
+        sku_match = re.search(r'\|\s*1\s*\|\s*([A-Z0-9\-\.]+)', match_result)
+        if sku_match:
+            top_sku = sku_match.group(1)
+            products_for_pricing.append({
+                "sku": top_sku,
+                "quantity": qty_num,
+                "requirement": requirement
+            })
+            logger.info(f"   → Top match: {top_sku} (qty: {qty_num})")
+
+    return all_matches, products_for_pricing, matching_results_text
+
+
+async def technical_agent_node(state: AgentState) -> Dict[str, Any]:
     """Analyzes the selected RFP technically."""
-    print("\n" + "="*60)
-    print("🔧 TECHNICAL AGENT STARTED")
-    print("="*60)
+    logger.info("🔧 TECHNICAL AGENT STARTED")
     
     llm = get_shared_llm()
     selected_rfp = state.get("selected_rfp")
     
-    print(f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'}")
+    logger.info(f"Selected RFP: {get_rfp_id(selected_rfp) if selected_rfp else 'None'}")
 
     if not selected_rfp:
-        print("❌ No RFP selected!")
+        logger.error("❌ No RFP selected!")
         return {
             "messages": [AIMessage(content="No RFP selected. Please select an RFP first.")],
             "next_node": NodeName.END,
@@ -82,53 +121,25 @@ def technical_agent_node(state: AgentState) -> Dict[str, Any]:
         }
 
     try:
-        print("📋 Extracting requirements and matching products...")
+        logger.info("📋 Extracting requirements and matching products...")
         
         # Get scope of supply from RFP
         scope_of_supply = selected_rfp.get("scope_of_supply", [])
         
         if not scope_of_supply:
-            print("⚠️ No scope of supply found in RFP")
+            logger.warning("⚠️ No scope of supply found in RFP")
             return {
                 "messages": [AIMessage(content="No product requirements found in selected RFP.")],
                 "next_node": NodeName.END,
                 "current_step": WorkflowStep.ERROR
             }
         
-        # Match each requirement to products
-        all_matches = []
-        products_for_pricing = []
-        matching_results_text = "## Product Matching Results\n\n"
-        
-        for item in scope_of_supply:
-            requirement = item.get("item", "")
-            quantity_str = item.get("quantity", "")
-            
-            print(f"🔍 Matching: {requirement}")
-            
-            match_result = match_rfp_requirement_to_products.invoke({"rfp_requirement": requirement})
-            matching_results_text += f"### Requirement: {requirement} (Qty: {quantity_str})\n\n"
-            matching_results_text += match_result + "\n\n"
-            
-            all_matches.append({
-                "requirement": requirement,
-                "quantity": quantity_str,
-                "matches": match_result
-            })
-            
-            import re
-            qty_num = int(re.sub(r'[^\d]', '', quantity_str)) if quantity_str else 1000
-            
-            sku_match = re.search(r'\|\s*1\s*\|\s*([A-Z0-9\-\.]+)', match_result)
-            if sku_match:
-                top_sku = sku_match.group(1)
-                products_for_pricing.append({
-                    "sku": top_sku,
-                    "quantity": qty_num,
-                    "requirement": requirement
-                })
-                print(f"   → Top match: {top_sku} (qty: {qty_num})")
-        
+        # Scoring every requirement against the whole catalog is CPU-bound
+        all_matches, products_for_pricing, matching_results_text = await run_blocking(
+            match_scope_of_supply, scope_of_supply
+        )
+        catalog_size = await run_blocking(len, get_storage().catalog)
+
         # Build final analysis message
         analysis_message = f"""# Technical Analysis for RFP: {get_rfp_id(selected_rfp)}
 
@@ -139,14 +150,13 @@ def technical_agent_node(state: AgentState) -> Dict[str, Any]:
 
 ## Summary
 - Total requirements analyzed: {len(scope_of_supply)}
-- OEM products in catalog: {len(OEM_PRODUCT_CATALOG)}
+- OEM products in catalog: {catalog_size}
 
 **Next Step:** Proceeding to pricing analysis based on matched products.
 """
 
-        print(f"✅ Technical analysis complete. Matched {len(scope_of_supply)} requirements")
-        print(f"🔄 Routing to: {NodeName.PRICING_AGENT}")
-        print("="*60 + "\n")
+        logger.info(f"✅ Technical analysis complete. Matched {len(scope_of_supply)} requirements")
+        logger.info(f"🔄 Routing to: {NodeName.PRICING_AGENT}")
 
         return {
             "messages": [AIMessage(content=analysis_message)],
@@ -163,9 +173,7 @@ def technical_agent_node(state: AgentState) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"❌ Technical Agent Error:\n{error_details}")
+        logger.exception("❌ Technical Agent Error")
         return {
             "messages": [AIMessage(content=f"❌ Error analyzing RFP: {str(e)}\n\nPlease check backend logs for details.")],
             "next_node": NodeName.END,
@@ -1,22 +1,10 @@
 from langchain.tools import tool
 from typing import List, Dict
-import os
 import json
 import re
 
-
-def load_oem_catalog():
-    catalog_path = os.path.join(os.path.dirname(__file__), '../../data/catalog.json')
-    global OEM_PRODUCT_CATALOG
-    if os.path.exists(catalog_path):
-        with open(catalog_path, 'r') as f:
-            OEM_PRODUCT_CATALOG = json.load(f)
-            return OEM_PRODUCT_CATALOG
-    OEM_PRODUCT_CATALOG = []
-    return OEM_PRODUCT_CATALOG
-
-
-OEM_PRODUCT_CATALOG = load_oem_catalog()
+# The catalog comes from the configured storage backend (JSON or SQLite)
+from backend.core.storage import get_storage
 
 
 @tool("search_product_catalog")
@@ -25,24 +13,8 @@ def search_product_catalog(query: str) -> str:
     Search the OEM product catalog for matching products.
     Input: Search query (e.g., 'XLPE 3C 120 sqmm' or 'control cable 16 core')
     """
-    query_lower = query.lower()
-    matches = []
-    
-    for product in OEM_PRODUCT_CATALOG:
-        name_match = query_lower in product["name"].lower()
-        category_match = query_lower in product["category"].lower()
-        
-        specs_match = False
-        for key, value in product["specs"].items():
-            if isinstance(value, str) and query_lower in value.lower():
-                specs_match = True
-            elif isinstance(value, list):
-                for v in value:
-                    if query_lower in str(v).lower():
-                        specs_match = True
-        
-        if name_match or category_match or specs_match:
-            matches.append(product)
+    # Name, category and string spec values, case-insensitive
+    matches = get_storage().catalog.search(query)
     
     if not matches:
         return f"No products found matching '{query}'"
@@ -64,7 +36,7 @@ def get_product_details(sku: str) -> str:
     Get detailed specifications for a specific product SKU.
     Input: Product SKU (e.g., 'PWR-XLPE-3C120-1.1')
     """
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+    product = get_storage().catalog.get(sku)
     
     if not product:
         return f"Product with SKU '{sku}' not found."
@@ -162,7 +134,7 @@ def match_rfp_requirement_to_products(rfp_requirement: str) -> str:
         req_specs["application"] = "overhead"
     
     # Score each product (8 parameters, equal weight)
-    for product in OEM_PRODUCT_CATALOG:
+    for product in get_storage().catalog:
         score = 0
         total_criteria = 0
         match_details = []
@@ -287,7 +259,7 @@ def generate_product_comparison_table(rfp_requirement: str, sku_list: str) -> st
            sku_list - comma-separated list of SKUs to compare (e.g., 'SKU1,SKU2,SKU3')
     """
     skus = [s.strip() for s in sku_list.split(",")]
-    products = [p for p in OEM_PRODUCT_CATALOG if p["sku"] in skus]
+    products = get_storage().catalog.get_many(skus)
     
     if not products:
         return "No valid SKUs provided for comparison."
@@ -331,7 +303,7 @@ def list_all_products() -> str:
     result += "| SKU | Product Name | Category | Base Price |\n"
     result += "|-----|--------------|----------|------------|\n"
     
-    for p in OEM_PRODUCT_CATALOG:
+    for p in get_storage().catalog:
         result += f"| {p['sku']} | {p['name']} | {p['category']} | ₹{p['base_price_per_meter']}/m |\n"
     
     return result
@@ -0,0 +1,62 @@
+import time
+import inspect
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.tracing import span
+
+
+def timed_node(name: str, node_fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a graph node so every run appends its wall-clock duration to
+    ``node_timings`` and records a ``node`` tracing span.
+    """
+
+    def _with_timing(result, started_at, start, node_span):
+        duration_ms = (time.perf_counter() - start) * 1000
+        # Nodes report failures through current_step rather than raising
+        if (result or {}).get("current_step") == "ERROR":
+            node_span.outcome = "error"
+        return {
+            **(result or {}),
+            "node_timings": [{"node": name, "started_at": started_at, "duration_ms": round(duration_ms, 2)}],
+        }
+
+    if inspect.iscoroutinefunction(node_fn):
+        @wraps(node_fn)
+        async def async_wrapper(state, *args, **kwargs):
+            started_at, start = datetime.now().isoformat(), time.perf_counter()
+            with span("node", name) as node_span:
+                return _with_timing(await node_fn(state, *args, **kwargs), started_at, start, node_span)
+
+        return async_wrapper
+
+    @wraps(node_fn)
+    def wrapper(state, *args, **kwargs):
+        started_at, start = datetime.now().isoformat(), time.perf_counter()
+        with span("node", name) as node_span:
+            return _with_timing(node_fn(state, *args, **kwargs), started_at, start, node_span)
+
+    return wrapper
+
+
+def latest_timing(timings: List[Dict[str, Any]], node: str) -> Optional[float]:
+    """Duration of the most recent run of ``node`` in this thread's timing log."""
+    for entry in reversed(timings or []):
+        if entry.get("node") == node:
+            return entry.get("duration_ms")
+    return None
+
+
+def branch_timings(timings: List[Dict[str, Any]], branches: List[str]) -> Dict[str, Any]:
+    """Compare parallel branch durations against what running them back-to-back would cost."""
+    durations = {b: latest_timing(timings, b) or 0.0 for b in branches}
+    sequential_ms = sum(durations.values())
+    critical_path_ms = max(durations.values()) if durations else 0.0
+    return {
+        "branches_ms": durations,
+        "critical_path_ms": round(critical_path_ms, 2),
+        "sequential_ms": round(sequential_ms, 2),
+        "saved_ms": round(sequential_ms - critical_path_ms, 2),
+    }
@@ -0,0 +1,219 @@
+import os
+import time
+import uuid
+import inspect
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") != "0"
+
+# Upper bounds (seconds) shared by every span histogram; +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus semantics) with quantile estimates."""
+
+    __slots__ = ("buckets", "counts", "total", "count", "min", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                # Clamp bucket edges to what was actually observed
+                lower = max(self.buckets[i - 1] if i > 0 else 0.0, self.min)
+                upper = min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * ((rank - seen) / n)
+            seen += n
+        return self.max
+
+
+class MetricsRegistry:
+    """Span histograms keyed by (kind, name, outcome), plus callback gauges."""
+
+    def __init__(self, trace_buffer: int = 500):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[Tuple, float]]]] = {}
+        self._traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._trace_buffer = trace_buffer
+
+    def observe(self, kind: str, name: str, outcome: str, seconds: float, trace_id: Optional[str] = None) -> None:
+        key = (kind, name, outcome)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+            if trace_id:
+                spans = self._traces.get(trace_id)
+                if spans is None:
+                    spans = self._traces[trace_id] = []
+                    if len(self._traces) > self._trace_buffer:
+                        self._traces.popitem(last=False)
+                spans.append({
+                    "kind": kind, "name": name, "outcome": outcome,
+                    "duration_ms": round(seconds * 1000, 2), "ended_at": time.time(),
+                })
+
+    def reset(self) -> None:
+        """Drop all recorded spans and traces (gauges stay registered)."""
+        with self._lock:
+            self._histograms.clear()
+            self._traces.clear()
+
+    def register_gauge(self, name: str, help_text: str, collect: Callable[[], Dict[Tuple, float]]) -> None:
+        """``collect`` returns {((label, value), ...): number}; it runs on every scrape."""
+        self._gauges[name] = (help_text, collect)
+
+    def trace(self, trace_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return list(spans) if spans is not None else None
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """p50/p95/p99 per span, for humans; Prometheus computes its own from buckets."""
+        with self._lock:
+            items = [(k, h.count, h.total, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                     for k, h in self._histograms.items()]
+        return [
+            {
+                "kind": kind, "name": name, "outcome": outcome, "count": count,
+                "mean_ms": round(total / count * 1000, 2),
+                "p50_ms": round(p50 * 1000, 2), "p95_ms": round(p95 * 1000, 2), "p99_ms": round(p99 * 1000, 2),
+            }
+            for (kind, name, outcome), count, total, p50, p95, p99 in sorted(items)
+        ]
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP rfp_span_duration_seconds Duration of graph nodes, tool calls, LLM calls and PDF renders.",
+            "# TYPE rfp_span_duration_seconds histogram",
+        ]
+        counters = []
+        with self._lock:
+            snapshot = [(k, list(h.counts), h.total, h.count, h.buckets) for k, h in sorted(self._histograms.items())]
+        for (kind, name, outcome), counts, total, count, buckets in snapshot:
+            labels = f'kind="{kind}",name="{_escape(name)}",outcome="{outcome}"'
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f'rfp_span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'rfp_span_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"rfp_span_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"rfp_span_duration_seconds_count{{{labels}}} {count}")
+            counters.append(f"rfp_spans_total{{{labels}}} {count}")
+
+        lines += ["# HELP rfp_spans_total Completed spans by kind, name and outcome.",
+                  "# TYPE rfp_spans_total counter", *counters]
+
+        for gauge, (help_text, collect) in sorted(self._gauges.items()):
+            try:
+                values = collect()
+            except Exception:
+                logger.exception(f"❌ Gauge {gauge} failed")
+                continue
+            lines += [f"# HELP {gauge} {help_text}", f"# TYPE {gauge} gauge"]
+            for labels, value in values.items():
+                label_str = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                lines.append(f"{gauge}{{{label_str}}} {value}" if label_str else f"{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry(trace_buffer=int(os.getenv("TRACE_BUFFER_SIZE", "500")))
+
+
+def new_trace_id(trace_id: Optional[str] = None):
+    """Start a trace for the current request; returns (trace_id, token for reset_trace)."""
+    trace_id = trace_id or uuid.uuid4().hex
+    return trace_id, _trace_id.set(trace_id)
+
+
+def reset_trace(token) -> None:
+    _trace_id.reset(token)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+class Span:
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[Span]:
+    """
+    Time a block. The outcome is ``error`` if it raised; callers that report
+    failure without raising can set ``outcome`` on the yielded span.
+    """
+    handle = Span()
+    if not TRACING_ENABLED:
+        yield handle
+        return
+    start = time.perf_counter()
+    try:
+        yield handle
+    except BaseException:
+        handle.outcome = "error"
+        raise
+    finally:
+        registry.observe(kind, name, handle.outcome, time.perf_counter() - start, _trace_id.get())
+
+
+def traced(kind: str, name: str) -> Callable:
+    """Decorator form of :func:`span` for sync and async callables."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(kind, name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException
+
+from ..core.config import chat_sessions
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.get("/sessions")
+async def session_stats(top: int = 10):
+    """Session store usage: entry/byte counts, evictions, spill and the largest sessions."""
+    return chat_sessions.stats(top=top)
+
+@router.post("/sessions/expire")
+async def expire_sessions():
+    """Move sessions past their idle TTL out of memory now instead of at the next sweep."""
+    expired = chat_sessions.expire_idle()
+    return {"expired": expired, "entries": len(chat_sessions)}
+
+@router.get("/checkpoints")
+async def checkpoint_stats():
+    """Checkpointer usage, when the configured saver reports it."""
+    from agents.graph import rfp_workflow
+
+    checkpointer = rfp_workflow.checkpointer
+    if not hasattr(checkpointer, "stats"):
+        return {"backend": type(checkpointer).__name__}
+    return {"backend": type(checkpointer).__name__, **checkpointer.stats()}
+
+@router.get("/stores")
+async def store_stats():
+    """Storage backend and per-store counts; in JSON mode also write-behind pending changes, fsyncs and snapshot timings."""
+    from starlette.concurrency import run_in_threadpool
+    from ..core.storage import get_storage
+
+    return await run_in_threadpool(get_storage().stats)
+
+@router.get("/reports")
+async def report_stats(top: int = 10):
+    """Report storage: renders, cache hits, disk usage against the budget, evictions and the largest reports/sessions."""
+    from starlette.concurrency import run_in_threadpool
+    from ..core.report_store import get_report_store
+
+    return await run_in_threadpool(get_report_store().stats, top)
+
+@router.get("/latency")
+async def latency_summary():
+    """p50/p95/p99 per node, tool, LLM call and PDF render since startup."""
+    from agents.tracing import registry
+
+    return {"spans": registry.summary()}
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Spans recorded under a request's trace_id (recent requests only)."""
+    from agents.tracing import registry
+
+    spans = registry.trace(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"trace_id": trace_id, "spans": spans}
+
+@router.get("/llm-scheduler")
+async def llm_scheduler_stats():
+    """In-flight LLM calls, waiters per lane, coalesced requests and rate-limit retries."""
+    from agents.llm_scheduler import get_scheduler
+
+    return get_scheduler().stats()
+
+@router.get("/llm-cache")
+async def llm_cache_stats():
+    """LLM response cache size, hit rate and upstream latency saved (across all workers)."""
+    from agents.llm_cache import get_llm_cache
+
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    from agents.llm_cache import get_llm_cache
+
+    cache = get_llm_cache()
+    if cache is not None:
+        await cache.aclear()
+    return {"message": "LLM cache cleared"}
+
+@router.get("/llm-pool")
+async def llm_pool_stats():
+    """Per-endpoint EWMA/p95 latency, errors and hedges when LLM_ENDPOINTS configures a pool."""
+    from agents.llm_pool import get_active_pool
+
+    pool = get_active_pool()
+    if pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **pool.stats()}
@@ -1,107 +1,227 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import json
+import base64
+import shutil
+import hashlib
+import tempfile
 from datetime import datetime
 
 from ..models import OEMProduct
-from ..core.config import oem_catalog_db
-from ..utils import save_catalog
+from ..core.config import job_queue
+from ..core.jobs import QueueFullError
+from ..core.storage import get_storage
+from ..core.catalog_repository import normalize_filters
+from ..core.catalog_upload import UploadFormatError, import_catalog
 
 router = APIRouter(prefix="/api/catalog", tags=["catalog"])
 
+def _filter_fingerprint(filters: dict) -> str:
+    return hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _encode_cursor(seq: int, filters: dict) -> str:
+    payload = json.dumps({"after": seq, "filters": _filter_fingerprint(filters)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, filters: dict) -> int:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        after = int(payload["after"])
+        fingerprint = payload["filters"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if fingerprint != _filter_fingerprint(filters):
+        raise HTTPException(status_code=400, detail="Cursor was issued for different filters")
+    return after
+
+
 @router.get("")
-async def get_catalog(
-    page: int = Query(1, ge=1, description="Page number"),
+def get_catalog(
     size: int = Query(20, ge=1, le=200, description="Items per page"),
-    category: Optional[str] = Query(None, description="Filter by category")
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page: Optional[int] = Query(None, ge=1, description="Page number (offset pagination, category filter only)"),
+    category: Optional[List[str]] = Query(None, description="Filter by category"),
+    voltage_grade: Optional[List[str]] = Query(None, description="Filter by voltage grade, e.g. 1.1 kV"),
+    insulation: Optional[List[str]] = Query(None, description="Filter by insulation, e.g. XLPE"),
+    conductor_material: Optional[List[str]] = Query(None, description="Filter by conductor material"),
+    armour: Optional[List[str]] = Query(None, description="Filter by armour type"),
+    cores_min: Optional[float] = Query(None, ge=0),
+    cores_max: Optional[float] = Query(None, ge=0),
+    size_sqmm_min: Optional[float] = Query(None, ge=0, description="Minimum conductor size (sq mm)"),
+    size_sqmm_max: Optional[float] = Query(None, ge=0, description="Maximum conductor size (sq mm)"),
+    price_min: Optional[float] = Query(None, ge=0, description="Minimum price per meter"),
+    price_max: Optional[float] = Query(None, ge=0, description="Maximum price per meter"),
 ):
-    """Get paginated OEM products from catalog with optional category filter"""
-    filtered = oem_catalog_db
-    if category:
-        filtered = [p for p in oem_catalog_db if p.get("category", "").lower() == category.lower()]
+    """
+    Get OEM products from the catalog, filtered by category and spec fields
+    (text filters can be repeated to match any of several values; numeric
+    ranges are inclusive). Pages are cursor-based: pass ``next_cursor`` back as
+    ``cursor`` for the next page. ``total`` is only reported for unfiltered or
+    single-category listings, where it is known without evaluating the query.
+
+    Unfiltered and single-category requests without a cursor keep the original
+    page-shaped response (``page``/``size``/``total``/``pages``, with ``?page=N``
+    for later pages); the first page also carries ``next_cursor``/``has_more``
+    so a client can switch to cursors from there.
+    """
+    try:
+        filters = normalize_filters({
+            "category": category,
+            "voltage_grade": voltage_grade,
+            "insulation": insulation,
+            "conductor_material": conductor_material,
+            "armour": armour,
+            "cores": (cores_min, cores_max),
+            "conductor_size_sqmm": (size_sqmm_min, size_sqmm_max),
+            "price_per_meter": (price_min, price_max),
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    catalog = get_storage().catalog
+    simple = set(filters) <= {"category"} and len(filters.get("category", ())) <= 1
+    single_category = filters["category"][0] if filters.get("category") else None
 
-    total = len(filtered)
-    start = (page - 1) * size
-    end = start + size
-    items = filtered[start:end]
+    if page is not None and (not simple or cursor):
+        raise HTTPException(status_code=400, detail="page only supports a single category filter; use cursor")
 
+    if simple and not cursor and (page or 1) == 1:
+        # Original response shape for existing clients, plus the cursor to page on from
+        items, next_after = catalog.find(filters, after=0, limit=size)
+        total = catalog.count(single_category)
+        return {
+            "items": items,
+            "pagination": {
+                "page": 1,
+                "size": size,
+                "total": total,
+                "pages": (total + size - 1) // size,
+                "next_cursor": _encode_cursor(next_after, filters) if next_after is not None else None,
+                "has_more": next_after is not None,
+            },
+        }
+
+    if page is not None:
+        # Offset pagination, kept for existing clients
+        items, total = catalog.page((page - 1) * size, size, category=single_category)
+        return {
+            "items": items,
+            "pagination": {
+                "page": page,
+                "size": size,
+                "total": total,
+                "pages": (total + size - 1) // size,
+            },
+        }
+
+    after = _decode_cursor(cursor, filters) if cursor else 0
+    items, next_after = catalog.find(filters, after=after, limit=size)
     return {
         "items": items,
         "pagination": {
-            "page": page,
             "size": size,
-            "total": total,
-            "pages": (total + size - 1) // size,
+            "next_cursor": _encode_cursor(next_after, filters) if next_after is not None else None,
+            "has_more": next_after is not None,
+            "total": catalog.count(single_category) if simple else None,
         },
     }
 
 @router.post("", response_model=OEMProduct)
-async def add_product(product: OEMProduct):
+def add_product(product: OEMProduct):
     """Add new product to catalog"""
-    # Check if SKU already exists
-    if any(p['sku'] == product.sku for p in oem_catalog_db):
-        raise HTTPException(status_code=400, detail="SKU already exists")
-
     product_dict = product.dict()
     product_dict['created_at'] = datetime.now().isoformat()
     product_dict['updated_at'] = datetime.now().isoformat()
 
-    oem_catalog_db.append(product_dict)
-    save_catalog(oem_catalog_db)
+    if not get_storage().catalog.insert(product_dict):
+        raise HTTPException(status_code=400, detail="SKU already exists")
     return product_dict
 
 @router.put("/{sku}", response_model=OEMProduct)
-async def update_product(sku: str, product: OEMProduct):
+def update_product(sku: str, product: OEMProduct):
     """Update existing product"""
-    for i, p in enumerate(oem_catalog_db):
-        if p['sku'] == sku:
-            product_dict = product.dict()
-            product_dict['updated_at'] = datetime.now().isoformat()
-            product_dict['created_at'] = p.get('created_at', datetime.now().isoformat())
-            oem_catalog_db[i] = product_dict
-            save_catalog(oem_catalog_db)
-            return product_dict
+    catalog = get_storage().catalog
+    existing = catalog.get(sku)
+    if existing is None:
+        raise HTTPException(status_code=404, detail="Product not found")
 
-    raise HTTPException(status_code=404, detail="Product not found")
+    product_dict = product.dict()
+    product_dict['updated_at'] = datetime.now().isoformat()
+    product_dict['created_at'] = existing.get('created_at', datetime.now().isoformat())
+    try:
+        catalog.update(sku, product_dict)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    return product_dict
 
 @router.delete("/{sku}")
-async def delete_product(sku: str):
+def delete_product(sku: str):
     """Delete product from catalog"""
-    for i, p in enumerate(oem_catalog_db):
-        if p['sku'] == sku:
-            oem_catalog_db.pop(i)
-            save_catalog(oem_catalog_db)
-            return {"message": "Product deleted successfully"}
-
-    raise HTTPException(status_code=404, detail="Product not found")
+    if get_storage().catalog.delete(sku) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return {"message": "Product deleted successfully"}
 
 @router.post("/upload")
-async def upload_catalog(file: UploadFile = File(...)):
-    """Upload catalog from Excel/CSV file"""
-    try:
-        contents = await file.read()
-
-        # Parse based on file type
-        if file.filename.endswith('.json'):
-            new_products = json.loads(contents)
-        elif file.filename.endswith('.csv'):
-            # Parse CSV (implement CSV parsing)
-            raise HTTPException(status_code=400, detail="CSV parsing not implemented yet")
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-
-        # Add to catalog
-        for product in new_products:
-            if not any(p['sku'] == product['sku'] for p in oem_catalog_db):
-                product['created_at'] = datetime.now().isoformat()
-                product['updated_at'] = datetime.now().isoformat()
-                oem_catalog_db.append(product)
-
-        save_catalog(oem_catalog_db)
-
+async def upload_catalog(
+    file: UploadFile = File(...),
+    async_mode: bool = Query(False, description="Import in the background; poll /api/jobs/{job_id} for progress"),
+):
+    """
+    Upload products from a JSON array or CSV file. The file is parsed and
+    validated in batches as it is read; rows with errors are skipped and
+    reported, SKUs already in the catalog (or repeated in the file) are skipped.
+    """
+    if not file.filename or not file.filename.lower().endswith(('.json', '.csv')):
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    storage = get_storage()
+
+    async def run(f, progress):
+        try:
+            result = await run_in_threadpool(import_catalog, f, file.filename, storage.catalog, progress)
+        finally:
+            # One snapshot for the whole upload instead of a log entry per product
+            if progress.get("added"):
+                await storage.checkpoint("catalog")
         return {
-            "message": f"Successfully uploaded {len(new_products)} products",
-            "total_products": len(oem_catalog_db)
+            "message": f"Successfully uploaded {result['added']} products",
+            "total_products": await run_in_threadpool(len, storage.catalog),
+            **result,
         }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+    if not async_mode:
+        try:
+            return await run(file.file, {})
+        except UploadFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # The request closes its upload file when it returns, so the job reads its own copy
+    copy = await run_in_threadpool(_copy_upload, file.file)
+    progress = {}
+
+    async def run_job():
+        try:
+            return await run(copy, progress)
+        finally:
+            copy.close()
+
+    try:
+        job = await job_queue.submit("catalog_upload", run_job)
+    except QueueFullError as e:
+        copy.close()
+        raise HTTPException(status_code=503, detail=str(e))
+    job.progress = progress
+    return JSONResponse(status_code=202, content={
+        "message": "Upload queued. Poll the job status for progress.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+    })
+
+
+def _copy_upload(f):
+    f.seek(0)
+    copy = tempfile.TemporaryFile()
+    shutil.copyfileobj(f, copy, 1024 * 1024)
+    return copy
@@ -1,48 +1,143 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import json
+import asyncio
+import uuid
+from fastapi import APIRouter, HTTPException, Response
+from typing import Dict, Any, Optional
 
 from ..models import ChatMessage, ChatResponse
-from ..core.config import chat_sessions
-from ..core.config import REPORTS_DIR
+from ..core.config import chat_sessions, job_queue
+from ..core.jobs import QueueFullError, WebhookURLError
+from agents.tracing import new_trace_id, reset_trace, span
+from agents.llm_cache import bypass_llm_cache
+from agents.llm_scheduler import llm_lane
 from datetime import datetime
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-@router.post("", response_model=ChatResponse)
-async def chat(message: ChatMessage):
+# Graph nodes whose start/end are surfaced to streaming clients
+STREAMED_NODES = {
+    "main_agent", "sales_agent", "technical_agent", "test_pricing_agent",
+    "pricing_agent", "rfp_analysis", "compare_rfps",
+}
+
+
+async def _build_turn_input(session_id: str, user_message: str) -> Dict[str, Any]:
+    """
+    Input for one chat turn.
+
+    When the checkpointer already holds this thread, only the new message is sent:
+    reducers append it to the stored history, and every other key carries over
+    from the checkpoint. Re-sending the full history would append it again each
+    turn and make message lists grow quadratically.
+    """
     from agents.graph import rfp_workflow
-    from agents.state import create_initial_state, get_last_ai_message_content
+    from agents.state import create_initial_state, NodeName
     from langchain_core.messages import HumanMessage
 
-    session_id = message.session_id
+    config = {"configurable": {"thread_id": session_id}}
+    snapshot = await rfp_workflow.aget_state(config)
+    if snapshot.values:
+        return {
+            "messages": [HumanMessage(content=user_message)],
+            "next_node": NodeName.MAIN_AGENT,
+            "session_id": session_id,
+            # Timings are per turn; None resets the stored list
+            "node_timings": None,
+        }
+
+    prior_state = await chat_sessions.aget(session_id)
+    if prior_state:
+        # Checkpoint expired but the session summary survived: reseed the thread once
+        state = dict(prior_state)
+        state["messages"] = list(prior_state.get("messages", [])) + [HumanMessage(content=user_message)]
+        state["node_timings"] = None
+        return state
+    return create_initial_state(session_id, user_message)
+
+
+def _workflow_state(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "current_step": result.get("current_step", "COMPLETE"),
+        "rfps_identified": result.get("rfps_identified", []),
+        "report_url": result.get("report_url"),
+        "reports": [
+            {"rfp_id": r.get("rfp_id"), "status": r.get("status"), "report_url": r.get("report_url")}
+            for r in result.get("rfp_reports", []) or []
+        ],
+    }
+
 
+async def _run_turn(session_id: str, user_message: str, trace_id: Optional[str] = None,
+                    use_cache: bool = True, lane: str = "interactive") -> Dict[str, Any]:
+    """Run one chat turn through the graph and return the ``ChatResponse`` payload."""
+    from agents.graph import rfp_workflow
+    from agents.state import get_last_ai_message_content
+
+    trace_id, token = new_trace_id(trace_id)
     try:
-        prior_state = chat_sessions.get(session_id)
-        if prior_state:
-            state = dict(prior_state)
-            state["messages"] = list(prior_state.get("messages", [])) + [HumanMessage(content=message.message)]
-        else:
-            state = create_initial_state(session_id, message.message)
+        with span("request", "chat"), bypass_llm_cache(not use_cache), llm_lane(lane):
+            state = await _build_turn_input(session_id, user_message)
 
-        result = await rfp_workflow.ainvoke(
-            state,
-            config={"configurable": {"thread_id": session_id}}
-        )
+            result = await rfp_workflow.ainvoke(
+                state,
+                config={"configurable": {"thread_id": session_id}}
+            )
+    finally:
+        reset_trace(token)
 
-        response_text = get_last_ai_message_content(result)
-        chat_sessions[session_id] = result
+    chat_sessions[session_id] = result
 
+    return {
+        "response": get_last_ai_message_content(result),
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat(),
+        "workflow_state": _workflow_state(result),
+        "trace_id": trace_id,
+    }
+
+
+@router.post("", response_model=ChatResponse)
+async def chat(message: ChatMessage, response: Response):
+    session_id = message.session_id
+    trace_id = uuid.uuid4().hex
+
+    if message.async_mode:
+        # Long workflows run in the background; the client polls /api/jobs/{job_id}
+        # or receives a webhook instead of holding this request open
+        webhook_url = str(message.webhook_url) if message.webhook_url else None
+        if webhook_url:
+            try:
+                await job_queue.check_webhook(webhook_url)
+            except WebhookURLError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        try:
+            job = await job_queue.submit(
+                "chat",
+                # Background jobs yield the LLM to interactive chat turns
+                lambda: _run_turn(session_id, message.message, trace_id,
+                                  use_cache=not message.no_cache, lane="batch"),
+                session_id=session_id,
+                webhook_url=webhook_url,
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        response.status_code = 202
         return ChatResponse(
-            response=response_text,
+            response="Request queued. Poll the job status for the result.",
             session_id=session_id,
             timestamp=datetime.now().isoformat(),
-            workflow_state={
-                "current_step": result.get("current_step", "COMPLETE"),
-                "rfps_identified": result.get("rfps_identified", []),
-                "report_url": result.get("report_url")
-            }
+            workflow_state={"status": "QUEUED", "status_url": f"/api/jobs/{job.id}"},
+            job_id=job.id,
+            trace_id=trace_id,
         )
+
+    try:
+        # Same per-session lock as queued jobs, so this turn can't interleave with one on the same thread
+        async with job_queue.session(session_id):
+            payload = await _run_turn(session_id, message.message, trace_id, use_cache=not message.no_cache)
+        return ChatResponse(**payload)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -50,9 +145,92 @@ async def chat(message: ChatMessage):
             response=f"Error: {str(e)}",
             session_id=session_id,
             timestamp=datetime.now().isoformat(),
-            workflow_state={"status": "ERROR", "error": str(e)}
+            workflow_state={"status": "ERROR", "error": str(e)},
+            trace_id=trace_id,
         )
 
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _node_output(output: Any) -> Dict[str, Any]:
+    """Make a node's state update JSON-friendly; messages collapse to their text."""
+    if not isinstance(output, dict):
+        return {}
+    payload = {}
+    for key, value in output.items():
+        if key == "messages":
+            payload[key] = [getattr(m, "content", str(m)) for m in value or []]
+        else:
+            payload[key] = value
+    return payload
+
+
+@router.post("/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Server-Sent Events variant of ``POST /api/chat``.
+
+    Emits ``node_start``/``node_end`` as graph nodes run (``node_end`` carries the
+    node's state update, e.g. the technical analysis before pricing starts),
+    ``token`` for each LLM token, then ``final`` with the same payload as the
+    non-streaming endpoint.
+    """
+    from agents.graph import rfp_workflow
+    from agents.state import get_last_ai_message_content
+
+    session_id = message.session_id
+    config = {"configurable": {"thread_id": session_id}}
+
+    async def event_stream():
+        trace_id, token = new_trace_id()
+        yield _sse("start", {"session_id": session_id, "trace_id": trace_id, "timestamp": datetime.now().isoformat()})
+        try:
+            # Same session lock, lane and request span as a synchronous turn, so streamed
+            # turns don't overlap queued jobs, get interactive priority and show up in
+            # the request latency metrics
+            async with job_queue.session(session_id):
+                with span("request", "chat"), bypass_llm_cache(bool(message.no_cache)), llm_lane("interactive"):
+                    state = await _build_turn_input(session_id, message.message)
+                    async for event in rfp_workflow.astream_events(state, config=config, version="v2"):
+                        kind = event["event"]
+                        node = event.get("metadata", {}).get("langgraph_node")
+
+                        if kind == "on_chat_model_stream":
+                            content = getattr(event["data"].get("chunk"), "content", "")
+                            if content:
+                                yield _sse("token", {"node": node, "content": content})
+                        elif event.get("name") in STREAMED_NODES and event.get("name") == node:
+                            if kind == "on_chain_start":
+                                yield _sse("node_start", {"node": node})
+                            elif kind == "on_chain_end":
+                                yield _sse("node_end", {"node": node, "output": _node_output(event["data"].get("output"))})
+
+                    result = (await rfp_workflow.aget_state(config)).values
+                chat_sessions[session_id] = result
+            yield _sse("final", {
+                "response": get_last_ai_message_content(result),
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "workflow_state": _workflow_state(result),
+                "trace_id": trace_id,
+            })
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield _sse("error", {"session_id": session_id, "trace_id": trace_id, "error": str(e)})
+        finally:
+            reset_trace(token)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so events reach the browser as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/history/{session_id}")
 async def get_chat_history(session_id: str):
     """Get chat history for a session (LangGraph manages this internally)"""
@@ -61,7 +239,7 @@ async def get_chat_history(session_id: str):
 @router.get("/state/{session_id}")
 async def get_workflow_state(session_id: str):
     """Get current workflow state (managed by LangGraph)"""
-    state = chat_sessions.get(session_id)
+    state = await chat_sessions.aget(session_id)
     if not state:
         return {"session_id": session_id, "exists": False}
 
@@ -107,5 +285,8 @@ async def get_workflow_state(session_id: str):
 @router.delete("/{session_id}")
 async def clear_session(session_id: str):
     """Clear chat session"""
-    chat_sessions.pop(session_id, None)
+    from agents.graph import rfp_workflow
+
+    await asyncio.to_thread(chat_sessions.pop, session_id, None)
+    await rfp_workflow.checkpointer.adelete_thread(session_id)
     return {"message": "Session cleared", "session_id": session_id}
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException
+
+from ..core.config import job_queue
+from ..core.jobs import JobStatus
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+@router.get("/stats")
+async def job_stats():
+    """Queue depth, running jobs, outcome counts and queue-wait/run-time percentiles."""
+    return job_queue.stats()
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in JobStatus.FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.to_dict(include_result=True)
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.config import chat_sessions, job_queue
+from agents.tracing import registry
+from agents.llm_scheduler import get_scheduler
+from agents.llm_pool import get_active_pool
+
+router = APIRouter(tags=["metrics"])
+
+registry.register_gauge(
+    "rfp_job_queue_depth", "Background jobs waiting for a worker.",
+    lambda: {(): job_queue.stats()["queue_depth"]},
+)
+registry.register_gauge(
+    "rfp_jobs_running", "Background jobs currently running.",
+    lambda: {(): job_queue.stats()["running"]},
+)
+registry.register_gauge(
+    "rfp_sessions_in_memory", "Chat sessions held in memory.",
+    lambda: {(): len(chat_sessions)},
+)
+registry.register_gauge(
+    "rfp_sessions_bytes", "Estimated bytes of chat session state held in memory.",
+    lambda: {(): chat_sessions.stats(top=0)["bytes"]},
+)
+
+registry.register_gauge(
+    "rfp_llm_in_flight", "Upstream LLM calls currently running.",
+    lambda: {(): get_scheduler().stats()["in_flight"]},
+)
+registry.register_gauge(
+    "rfp_llm_waiting", "LLM calls waiting for a concurrency slot, by lane.",
+    lambda: {(("lane", lane),): n for lane, n in get_scheduler().stats()["waiting"].items()},
+)
+registry.register_gauge(
+    "rfp_llm_endpoint_ewma_seconds", "Recent (EWMA) latency of each pooled LLM endpoint.",
+    lambda: {
+        (("endpoint", e.name),): round(e.ewma_ms / 1000, 4)
+        for e in (get_active_pool().endpoints if get_active_pool() else []) if e.ewma_ms is not None
+    },
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of span histograms, counters and gauges."""
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
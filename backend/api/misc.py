@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from datetime import datetime
 
-from ..core.config import oem_catalog_db, test_pricing_db
+from ..core.storage import get_storage
 
 router = APIRouter(tags=["misc"])
 
@@ -15,17 +15,17 @@ async def root():
     }
 
 @router.get("/health")
-async def health_check():
+def health_check():
     return {
         "status": "healthy",
         "agents": "LangGraph workflow active",
-        "catalog_items": len(oem_catalog_db),
-        "test_types": len(test_pricing_db)
+        "catalog_items": len(get_storage().catalog),
+        "test_types": len(get_storage().test_pricing)
     }
 
 @router.get("/api/health")
-async def api_health_check():
-    return await health_check()
+def api_health_check():
+    return health_check()
 
 @router.post("/api/rfp/scan")
 async def scan_rfps():
@@ -44,11 +44,11 @@ async def analyze_rfp():
     }
 
 @router.get("/api/dashboard/stats")
-async def get_dashboard_stats():
+def get_dashboard_stats():
     """Get dashboard statistics"""
     return {
-        "total_products": len(oem_catalog_db),
-        "test_types": len(test_pricing_db),
+        "total_products": len(get_storage().catalog),
+        "test_types": len(get_storage().test_pricing),
         "system_status": "operational",
         "last_updated": datetime.now().isoformat()
     }
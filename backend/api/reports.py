@@ -1,15 +1,70 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 
 from ..core.config import REPORTS_DIR
+from ..core.report_store import get_report_store
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
+# Clients may keep the PDF but must revalidate; an unchanged report then costs a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _not_modified(request: Request, etag: str, mtime: Optional[float]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and mtime is not None:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @router.get("/{session_id}/{rfp_id}")
-async def get_report(session_id: str, rfp_id: str):
-    """Download generated RFP report PDF."""
+async def get_report(session_id: str, rfp_id: str, request: Request):
+    """
+    Download the RFP report PDF, rendering it on first request.
+
+    The content hash is a strong ETag: conditional requests get a 304 without
+    touching disk (or rendering), and Range/If-Range requests are served by
+    FileResponse from the cached stat.
+    """
     safe_rfp_id = rfp_id.replace("/", "_")
-    report_path = REPORTS_DIR / f"{session_id}_{safe_rfp_id}.pdf"
-    if not report_path.exists():
+    filename = f"{session_id}_{safe_rfp_id}.pdf"
+    store = get_report_store()
+    meta = await store.report_meta(session_id, rfp_id)
+    if meta is None:
+        # Reports rendered eagerly before sections were stored
+        legacy_path = REPORTS_DIR / filename
+        if legacy_path.exists():
+            return FileResponse(str(legacy_path), media_type="application/pdf", filename=filename)
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    etag = f'"{meta["content_hash"]}"'
+    headers = {"etag": etag, "cache-control": CACHE_CONTROL}
+    stat = meta["stat"]
+    if _not_modified(request, etag, stat.st_mtime if stat else None):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        meta = await store.rendered(session_id, rfp_id, meta)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Report not found")
-    return FileResponse(str(report_path), media_type="application/pdf", filename=report_path.name)
+    return FileResponse(
+        str(meta["path"]), media_type="application/pdf", filename=filename,
+        headers=headers, stat_result=meta["stat"],
+    )
@@ -1,71 +1,65 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 
 from ..models import RFPEntry
-from ..core.config import rfps_db
-from ..utils import save_rfps
+from ..core.storage import get_storage
 
 router = APIRouter(prefix="/api/rfps", tags=["rfps"])
 
 def _next_rfp_id() -> str:
     """Generate next RFP ID in format RFP-YYYY-NNNN"""
     from datetime import datetime
-    year = datetime.now().year
-    max_num = 0
-    for r in rfps_db:
-        if r.get("id", "").startswith(f"RFP-{year}-"):
-            try:
-                num = int(r["id"].split("-")[-1])
-                max_num = max(max_num, num)
-            except Exception:
-                continue
-    return f"RFP-{year}-{max_num + 1:04d}"
+    return get_storage().rfps.next_id(datetime.now().year)
 
 @router.get("", response_model=List[RFPEntry])
-async def get_rfps():
-    """Get all RFPs"""
-    return rfps_db
+def get_rfps(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    client: Optional[str] = Query(None, description="Filter by client"),
+    deadline_from: Optional[str] = Query(None, description="Earliest submission date (YYYY-MM-DD)"),
+    deadline_to: Optional[str] = Query(None, description="Latest submission date (YYYY-MM-DD)"),
+):
+    """Get all RFPs, or those matching the given filters ordered by submission date"""
+    rfps = get_storage().rfps
+    if status is None and client is None and deadline_from is None and deadline_to is None:
+        return rfps.all()
+    return rfps.query(status=status, client=client, deadline_from=deadline_from, deadline_to=deadline_to)
 
 @router.get("/{rfp_id}", response_model=RFPEntry)
-async def get_rfp(rfp_id: str):
+def get_rfp(rfp_id: str):
     """Get a specific RFP by ID"""
-    for r in rfps_db:
-        if r.get("id") == rfp_id:
-            return r
-    raise HTTPException(status_code=404, detail="RFP not found")
+    rfp = get_storage().rfps.get(rfp_id)
+    if rfp is None:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    return rfp
 
 @router.post("", response_model=RFPEntry)
-async def create_rfp(rfp: RFPEntry):
+def create_rfp(rfp: RFPEntry):
     """Create a new RFP"""
+    rfps = get_storage().rfps
     rfp_dict = rfp.dict()
     if not rfp_dict.get("id"):
         rfp_dict["id"] = _next_rfp_id()
     else:
         # Ensure no duplicate ID
-        if any(r.get("id") == rfp_dict["id"] for r in rfps_db):
+        if rfp_dict["id"] in rfps:
             raise HTTPException(status_code=400, detail="RFP ID already exists")
-    rfps_db.append(rfp_dict)
-    save_rfps(rfps_db)
+    rfps.put(rfp_dict)
     return rfp_dict
 
 @router.put("/{rfp_id}", response_model=RFPEntry)
-async def update_rfp(rfp_id: str, rfp: RFPEntry):
+def update_rfp(rfp_id: str, rfp: RFPEntry):
     """Update an existing RFP"""
-    for i, r in enumerate(rfps_db):
-        if r.get("id") == rfp_id:
-            rfp_dict = rfp.dict()
-            rfp_dict["id"] = rfp_id
-            rfps_db[i] = rfp_dict
-            save_rfps(rfps_db)
-            return rfp_dict
-    raise HTTPException(status_code=404, detail="RFP not found")
+    rfps = get_storage().rfps
+    if rfp_id not in rfps:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    rfp_dict = rfp.dict()
+    rfp_dict["id"] = rfp_id
+    rfps.put(rfp_dict)
+    return rfp_dict
 
 @router.delete("/{rfp_id}")
-async def delete_rfp(rfp_id: str):
+def delete_rfp(rfp_id: str):
     """Delete an RFP"""
-    for i, r in enumerate(rfps_db):
-        if r.get("id") == rfp_id:
-            rfps_db.pop(i)
-            save_rfps(rfps_db)
-            return {"message": "RFP deleted", "rfp_id": rfp_id}
-    raise HTTPException(status_code=404, detail="RFP not found")
+    if get_storage().rfps.delete(rfp_id) is None:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    return {"message": "RFP deleted", "rfp_id": rfp_id}
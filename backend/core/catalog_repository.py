@@ -0,0 +1,484 @@
+import os
+import heapq
+import bisect
+import logging
+import threading
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Slots per block in the live-count table used to skip to a page offset
+_BLOCK = 1024
+
+# Fields ``find`` filters on. Text fields match any of the given values
+# case-insensitively; numeric fields take an inclusive (min, max) range with
+# either end None. ``category`` is the product category, ``price_per_meter``
+# base_price_per_meter (or price_per_km / 1000), the rest are spec fields.
+TEXT_FILTERS = ("category", "voltage_grade", "insulation", "conductor_material", "armour")
+RANGE_FILTERS = ("cores", "conductor_size_sqmm", "price_per_meter")
+
+# Spec fields with an in-memory secondary index. Prices are nearly unique per
+# product, so a price range is checked row by row instead.
+_INDEXED_SPECS = ("voltage_grade", "insulation", "conductor_material", "armour", "cores", "conductor_size_sqmm")
+# A range filter only drives a query if it spans at most this many distinct values
+_MAX_RANGE_KEYS = 64
+
+
+def category_key(product: Dict[str, Any]) -> str:
+    return (product.get("category") or "").lower()
+
+
+def product_specs(product: Dict[str, Any]) -> Dict[str, Any]:
+    # Agent data uses name/specs, products added through the API product_name/specifications
+    return product.get("specs") or product.get("specifications") or {}
+
+
+def price_per_meter(product: Dict[str, Any]) -> Optional[float]:
+    if product.get("base_price_per_meter") is not None:
+        return product["base_price_per_meter"]
+    if product.get("price_per_km") is not None:
+        return product["price_per_km"] / 1000
+    return None
+
+
+def as_number(value: Any) -> Optional[float]:
+    """``value`` as an int/float if it is one or a numeric string, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def filter_value(product: Dict[str, Any], field: str) -> Any:
+    """The value of ``field`` that filters compare against (lowercased text or a number), or None."""
+    if field == "category":
+        return category_key(product)
+    if field == "price_per_meter":
+        try:
+            return as_number(price_per_meter(product))
+        except TypeError:
+            return None
+    value = product_specs(product).get(field)
+    if field in RANGE_FILTERS:
+        return as_number(value)
+    return value.lower() if isinstance(value, str) else None
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of ``find`` filters: text fields become a sorted tuple of
+    lowercased values, range fields a ``(min, max)`` tuple, and unset filters
+    are dropped. Raises ValueError for an unknown field or an empty range.
+    """
+    normalized: Dict[str, Any] = {}
+    for field, value in filters.items():
+        if field in TEXT_FILTERS:
+            values = [value] if isinstance(value, str) else list(value or ())
+            values = sorted({v.strip().lower() for v in values if v and v.strip()})
+            if values:
+                normalized[field] = tuple(values)
+        elif field in RANGE_FILTERS:
+            low, high = value if value is not None else (None, None)
+            if low is None and high is None:
+                continue
+            if low is not None and high is not None and low > high:
+                raise ValueError(f"{field}: minimum {low} is above maximum {high}")
+            normalized[field] = (low, high)
+        else:
+            raise ValueError(f"Unknown catalog filter {field!r}")
+    return normalized
+
+
+def matches_filters(product: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Whether ``product`` passes every (normalized) filter; a missing field never matches."""
+    for field, wanted in filters.items():
+        value = filter_value(product, field)
+        if value is None:
+            return False
+        if field in RANGE_FILTERS:
+            low, high = wanted
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        elif value not in wanted:
+            return False
+    return True
+
+
+def search_text(product: Dict[str, Any]) -> str:
+    """
+    Lowercased text a catalog search matches against: name, category and the
+    string (or list) spec values, one per line so a query can't span fields.
+    """
+    parts = [product.get("name") or product.get("product_name") or "", product.get("category") or ""]
+    for value in product_specs(product).values():
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(str(v) for v in value)
+    return "\n".join(parts).lower()
+
+
+def _from(slots: List[int], start: int) -> Iterator[int]:
+    """Entries of the sorted list ``slots`` from the first one >= ``start``."""
+    for i in range(bisect.bisect_left(slots, start), len(slots)):
+        yield slots[i]
+
+
+class CatalogRepository:
+    """
+    In-memory OEM product catalog with O(1) lookups and mutations.
+
+    Products sit in an append-only list of slots, each stamped with a
+    monotonically increasing ``seq``. ``_by_sku`` maps SKU -> slot and
+    ``_by_category`` maps lowercased category -> slots in catalog order;
+    ``_by_spec`` does the same for the main spec fields, which ``find`` uses to
+    answer filtered queries a page at a time from a ``seq`` cursor.
+    Deleting a product leaves a tombstone (``None``) in its slot instead of
+    shifting the list; index lists drop stale slots lazily, and a live count
+    per block of slots lets a page offset skip whole blocks. Once tombstones
+    and stale index entries pass ``compact_ratio`` of the slots (and at least
+    ``compact_min``), the slots are compacted and the indexes rebuilt, which
+    keeps the amortised cost of a delete O(1).
+
+    Iteration follows insertion order and an update keeps the product's slot,
+    so pages stay stable while the catalog is edited. ``version`` increases on
+    every mutation, and mutations are recorded to ``persistence`` when set.
+    """
+
+    def __init__(self, compact_ratio: float = 0.25, compact_min: int = 1024):
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+
+        self._slots: List[Optional[Dict[str, Any]]] = []
+        self._seqs: List[int] = []
+        self._by_sku: Dict[str, int] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._category_counts: Dict[str, int] = {}
+        self._by_spec: Dict[str, Dict[Any, List[int]]] = {field: {} for field in _INDEXED_SPECS}
+        # Sorted values of each spec index, rebuilt on demand after a new value shows up
+        self._spec_keys: Dict[str, List[Any]] = {}
+        self._block_live: List[int] = []
+        self._tombstones = 0
+        self._stale_refs = 0
+        self._next_seq = 1
+        self.version = 0
+        self._lock = threading.RLock()
+        self._counters = {"inserts": 0, "updates": 0, "deletes": 0, "compactions": 0}
+        self.persistence = None
+
+    @classmethod
+    def from_env(cls) -> "CatalogRepository":
+        return cls(
+            compact_ratio=float(os.getenv("CATALOG_COMPACT_RATIO", "0.25")),
+            compact_min=int(os.getenv("CATALOG_COMPACT_MIN", "1024")),
+        )
+
+    # ------------------------------------------------------------ reads
+
+    def __len__(self) -> int:
+        return len(self._by_sku)
+
+    def __contains__(self, sku: str) -> bool:
+        return sku in self._by_sku
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (p for p in list(self._slots) if p is not None)
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        slot = self._by_sku.get(sku)
+        return self._slots[slot] if slot is not None else None
+
+    def get_many(self, skus: Iterable[str]) -> List[Dict[str, Any]]:
+        """Products for ``skus`` that exist, in catalog order."""
+        slots = sorted({self._by_sku[sku] for sku in skus if sku in self._by_sku})
+        return [self._slots[slot] for slot in slots]
+
+    def existing_skus(self, skus: Iterable[str]) -> set:
+        """The subset of ``skus`` already in the catalog."""
+        return {sku for sku in skus if sku in self._by_sku}
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Products whose name, category or string spec values contain ``query`` (case-insensitive)."""
+        query = query.lower()
+        return [p for p in self if query in search_text(p)]
+
+    def count(self, category: Optional[str] = None) -> int:
+        if category is None:
+            return len(self._by_sku)
+        return self._category_counts.get(category.lower(), 0)
+
+    def categories(self) -> Dict[str, int]:
+        return {key: count for key, count in self._category_counts.items() if count}
+
+    def _live_slots(self, category: Optional[str]) -> Iterator[int]:
+        if category is None:
+            slots = self._slots
+            return (i for i in range(len(slots)) if slots[i] is not None)
+        key = category.lower()
+        slots = self._slots
+        # Category lists may still hold deleted or re-categorised slots until the next compaction
+        return (i for i in self._by_category.get(key, ()) if slots[i] is not None and category_key(slots[i]) == key)
+
+    def _slot_at(self, offset: int) -> int:
+        """Slot of the ``offset``-th live product (0-based), or len(slots) past the end."""
+        for block, live in enumerate(self._block_live):
+            if offset < live:
+                break
+            offset -= live
+        else:
+            return len(self._slots)
+        slot = block * _BLOCK
+        while self._slots[slot] is None or offset:
+            if self._slots[slot] is not None:
+                offset -= 1
+            slot += 1
+        return slot
+
+    def page(self, offset: int, limit: int, category: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """``limit`` products after skipping ``offset``, in catalog order, and the total matching."""
+        with self._lock:
+            if category is None:
+                if not self._tombstones:
+                    return self._slots[offset:offset + limit], len(self._by_sku)
+                items = []
+                slots = self._slots
+                for slot in range(self._slot_at(offset), len(slots)):
+                    if len(items) >= limit:
+                        break
+                    if slots[slot] is not None:
+                        items.append(slots[slot])
+                return items, len(self._by_sku)
+            items = []
+            for i, slot in enumerate(self._live_slots(category)):
+                if i >= offset + limit:
+                    break
+                if i >= offset:
+                    items.append(self._slots[slot])
+            return items, self.count(category)
+
+    def find(self, filters: Dict[str, Any], after: int = 0, limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Up to ``limit`` products matching ``filters`` (see ``normalize_filters``)
+        whose ``seq`` is above ``after``, in catalog order, and the ``after`` for
+        the next page (None on the last one). Candidates come from the most
+        selective indexed filter and start at the cursor, so a page costs the
+        same at any depth, and inserts or deletes never shift later pages.
+        """
+        filters = normalize_filters(filters)
+        with self._lock:
+            start = bisect.bisect_right(self._seqs, after)
+            items: List[Dict[str, Any]] = []
+            last = None
+            for slot in self._candidates(filters, start):
+                product = self._slots[slot]
+                if product is None or not matches_filters(product, filters):
+                    continue
+                if len(items) == limit:
+                    return items, last
+                items.append(product)
+                last = self._seqs[slot]
+            return items, None
+
+    def _candidates(self, filters: Dict[str, Any], start: int) -> Iterator[int]:
+        """Slots from ``start`` on that may match, in order; entries can be stale, so callers re-check."""
+        best = None
+        for field, wanted in filters.items():
+            if field == "category":
+                index, keys = self._by_category, wanted
+            elif field in self._by_spec:
+                index = self._by_spec[field]
+                keys = self._keys_in_range(field, *wanted) if field in RANGE_FILTERS else wanted
+                if keys is None:
+                    continue
+            else:
+                continue
+            lists = [index[key] for key in keys if key in index]
+            size = sum(len(slots) for slots in lists)
+            if best is None or size < best[0]:
+                best = (size, lists)
+        if best is None:
+            return iter(range(start, len(self._slots)))
+        runs = [_from(slots, start) for slots in best[1]]
+        if len(runs) == 1:
+            return runs[0]
+        # A slot re-indexed under a new value is still listed under its old one until compaction
+        return (slot for slot, _ in itertools.groupby(heapq.merge(*runs)))
+
+    def _keys_in_range(self, field: str, low: Optional[float], high: Optional[float]) -> Optional[List[Any]]:
+        keys = self._spec_keys.get(field)
+        if keys is None:
+            keys = self._spec_keys[field] = sorted(self._by_spec[field])
+        lo = 0 if low is None else bisect.bisect_left(keys, low)
+        hi = len(keys) if high is None else bisect.bisect_right(keys, high)
+        return keys[lo:hi] if hi - lo <= _MAX_RANGE_KEYS else None
+
+    def _index_specs(self, slot: int, product: Dict[str, Any], old: Optional[Dict[str, Any]] = None) -> None:
+        """Add ``slot`` to the spec indexes under ``product``'s values (those that differ from ``old``'s)."""
+        for field in _INDEXED_SPECS:
+            value = filter_value(product, field)
+            if value is None:
+                continue
+            if old is not None:
+                old_value = filter_value(old, field)
+                if value == old_value:
+                    continue
+                if old_value is not None:
+                    self._stale_refs += 1
+            index = self._by_spec[field]
+            if value not in index:
+                index[value] = []
+                self._spec_keys.pop(field, None)
+            slots = index[value]
+            i = bisect.bisect_left(slots, slot)
+            # New slots are the largest so far; an updated one may be listed already
+            if i == len(slots) or slots[i] != slot:
+                slots.insert(i, slot)
+
+    # ------------------------------------------------------------ writes
+
+    def insert(self, product: Dict[str, Any], record: bool = True) -> bool:
+        """Append ``product``; False (and nothing stored) if its SKU already exists."""
+        with self._lock:
+            sku = product["sku"]
+            if sku in self._by_sku:
+                return False
+            slot = len(self._slots)
+            self._slots.append(product)
+            self._seqs.append(self._next_seq)
+            self._next_seq += 1
+            self._by_sku[sku] = slot
+            if slot // _BLOCK == len(self._block_live):
+                self._block_live.append(0)
+            self._block_live[slot // _BLOCK] += 1
+            key = category_key(product)
+            # New slots are the largest so far, so appending keeps category lists sorted
+            self._by_category.setdefault(key, []).append(slot)
+            self._category_counts[key] = self._category_counts.get(key, 0) + 1
+            self._index_specs(slot, product)
+            self.version += 1
+            self._counters["inserts"] += 1
+            if record and self.persistence is not None:
+                self.persistence.record("put", sku, product)
+            return True
+
+    def extend(self, products: Iterable[Dict[str, Any]], record: bool = True) -> int:
+        """
+        Insert each product whose SKU is new; returns how many were added. Bulk
+        loads pass ``record=False`` and persist once afterwards (``Storage.checkpoint``)
+        instead of logging every product.
+        """
+        with self._lock:
+            return sum(1 for product in products if self.insert(product, record))
+
+    def update(self, sku: str, product: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Replace the product stored under ``sku`` in place; returns the previous
+        product, or None if there was none. Raises ValueError if ``product``
+        renames it to a SKU that already exists.
+        """
+        with self._lock:
+            slot = self._by_sku.get(sku)
+            if slot is None:
+                return None
+            new_sku = product["sku"]
+            if new_sku != sku and new_sku in self._by_sku:
+                raise ValueError(f"SKU {new_sku} already exists")
+            old = self._slots[slot]
+            self._slots[slot] = product
+            if new_sku != sku:
+                del self._by_sku[sku]
+                self._by_sku[new_sku] = slot
+            old_key, new_key = category_key(old), category_key(product)
+            if old_key != new_key:
+                self._category_counts[old_key] -= 1
+                self._category_counts[new_key] = self._category_counts.get(new_key, 0) + 1
+                slots = self._by_category.setdefault(new_key, [])
+                i = bisect.bisect_left(slots, slot)
+                # It may still be listed from an earlier stint in this category
+                if i == len(slots) or slots[i] != slot:
+                    slots.insert(i, slot)
+                self._stale_refs += 1
+            self._index_specs(slot, product, old)
+            self.version += 1
+            self._counters["updates"] += 1
+            self._maybe_compact()
+            if self.persistence is not None:
+                self.persistence.record("put", sku, product)
+            return old
+
+    def delete(self, sku: str) -> Optional[Dict[str, Any]]:
+        """Tombstone the product stored under ``sku``; returns it, or None if there was none."""
+        with self._lock:
+            slot = self._by_sku.pop(sku, None)
+            if slot is None:
+                return None
+            product = self._slots[slot]
+            self._slots[slot] = None
+            self._block_live[slot // _BLOCK] -= 1
+            self._category_counts[category_key(product)] -= 1
+            self._tombstones += 1
+            self.version += 1
+            self._counters["deletes"] += 1
+            self._maybe_compact()
+            if self.persistence is not None:
+                self.persistence.record("delete", sku)
+            return product
+
+    def apply_change(self, op: str, key: Any, value: Any) -> None:
+        """Replay one logged change (see ``StorePersistence.replay``)."""
+        if op == "put":
+            if key in self._by_sku:
+                self.update(key, value)
+            else:
+                self.insert(value)
+        elif op == "delete":
+            self.delete(key)
+
+    # ------------------------------------------------------------ compaction
+
+    def _maybe_compact(self) -> None:
+        garbage = self._tombstones + self._stale_refs
+        if garbage >= self.compact_min and garbage > self.compact_ratio * len(self._slots):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop tombstones and rebuild the indexes; O(n), run when enough garbage has built up."""
+        with self._lock:
+            live = [(seq, p) for seq, p in zip(self._seqs, self._slots) if p is not None]
+            self._slots = [p for _, p in live]
+            self._seqs = [seq for seq, _ in live]
+            self._by_sku = {}
+            self._by_category = {}
+            self._by_spec = {field: {} for field in _INDEXED_SPECS}
+            self._spec_keys = {}
+            for slot, product in enumerate(self._slots):
+                self._by_sku[product["sku"]] = slot
+                self._by_category.setdefault(category_key(product), []).append(slot)
+                self._index_specs(slot, product)
+            self._category_counts = {key: len(slots) for key, slots in self._by_category.items()}
+            self._block_live = [min(_BLOCK, len(self._slots) - start) for start in range(0, len(self._slots), _BLOCK)]
+            dropped = self._tombstones
+            self._tombstones = self._stale_refs = 0
+            self._counters["compactions"] += 1
+            logger.debug(f"🗜️ Catalog compacted: {dropped} tombstones dropped, {len(self._slots)} products")
+
+    # ------------------------------------------------------------ stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "products": len(self._by_sku),
+                "slots": len(self._slots),
+                "tombstones": self._tombstones,
+                "stale_index_refs": self._stale_refs,
+                "categories": len(self.categories()),
+                "version": self.version,
+                **self._counters,
+            }
@@ -0,0 +1,297 @@
+"""
+Streaming catalog import for ``POST /api/catalog/upload``.
+
+The upload is parsed straight from the spooled request file in chunks, so
+memory stays flat for multi-hundred-MB catalogs:
+
+- JSON: a top-level array of product objects, decoded one element at a time
+- CSV: one product per row; ``sku``, ``name``/``product_name``, ``category``,
+  ``manufacturer``, ``status``, ``base_price_per_meter`` and ``price_per_km``
+  are product fields, every other column (optionally prefixed ``specs.``)
+  goes into ``specs``
+
+Rows are validated and de-duplicated a batch at a time: SKUs repeated within
+the file are caught with a set, SKUs already in the catalog with one batched
+lookup against its SKU index, and the new products are inserted with one
+``extend`` per batch without logging each one. The caller persists the
+catalog once at the end (``Storage.checkpoint``).
+"""
+import os
+import io
+import csv
+import json
+import math
+import time
+import codecs
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "2000"))
+# Row errors kept in the response; the total is always counted
+UPLOAD_MAX_ERRORS = int(os.getenv("UPLOAD_MAX_ERRORS", "1000"))
+# Longest single JSON element accepted before the upload is rejected as malformed
+UPLOAD_MAX_ITEM_BYTES = int(os.getenv("UPLOAD_MAX_ITEM_BYTES", str(16 * 1024 * 1024)))
+_CHUNK = 1024 * 1024
+
+PRODUCT_FIELDS = {"sku", "name", "product_name", "category", "manufacturer", "status",
+                  "base_price_per_meter", "price_per_km"}
+PRICE_FIELDS = ("base_price_per_meter", "price_per_km")
+
+
+class UploadFormatError(ValueError):
+    """The file can't be parsed any further (as opposed to a bad row, which is skipped)."""
+
+
+class _CountingReader(io.RawIOBase):
+    """Wraps the upload file to count the bytes consumed, for progress. Closing it leaves the upload open."""
+
+    def __init__(self, f: BinaryIO):
+        super().__init__()
+        self._f = f
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self._f.read(len(b))
+        b[:len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def iter_json_array(f, chunk_size: int = _CHUNK) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(index, element)`` from a JSON array read ``chunk_size`` bytes at a time."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    buf, pos, eof = "", 0, False
+    state = "start"  # start -> first -> (value -> sep)* -> done
+    index = 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n":
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise UploadFormatError("Unexpected end of file: the JSON array is not closed")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = text.decode(chunk, final=eof), 0
+            continue
+
+        char = buf[pos]
+        if state == "start":
+            if char != "[":
+                raise UploadFormatError("A JSON catalog must be an array of products")
+            pos += 1
+            state = "first"
+        elif char == "]" and state in ("first", "sep"):
+            return
+        elif state == "sep":
+            if char != ",":
+                raise UploadFormatError(f"Expected ',' or ']' after item {index - 1}")
+            pos += 1
+            state = "value"
+        else:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Most likely the element continues in the next chunk
+                if eof or len(buf) - pos > UPLOAD_MAX_ITEM_BYTES:
+                    raise UploadFormatError(f"Invalid JSON in item {index}: {e.msg}")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + text.decode(chunk, final=eof), 0
+                continue
+            yield index, value
+            index += 1
+            pos = end
+            state = "sep"
+
+
+def _coerce(value: str) -> Any:
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # "nan"/"inf" stay text: they parse as floats but can't be written back as JSON
+    return number if math.isfinite(number) else value
+
+
+def csv_row_to_product(row: Dict[Optional[str], Any]) -> Dict[str, Any]:
+    if None in row:
+        raise ValueError("more values than header columns")
+    product: Dict[str, Any] = {}
+    specs: Dict[str, Any] = {}
+    for key, value in row.items():
+        key = key.strip()
+        value = (value or "").strip()
+        if not value:
+            continue
+        if key.startswith("specs."):
+            specs[key[len("specs."):]] = _coerce(value)
+        elif key in PRODUCT_FIELDS:
+            product[key] = value
+        else:
+            specs[key] = _coerce(value)
+    if specs:
+        product["specs"] = specs
+    return product
+
+
+def iter_csv_rows(f) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line number, product or ValueError)`` for each CSV row."""
+    reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+    try:
+        for row in reader:
+            try:
+                yield reader.line_num, csv_row_to_product(row)
+            except ValueError as e:
+                yield reader.line_num, e
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise UploadFormatError(f"Invalid CSV near line {reader.line_num}: {e}")
+
+
+def _json_safe(value: Any) -> bool:
+    try:
+        json.dumps(value, allow_nan=False)
+    except ValueError:
+        return False
+    return True
+
+
+def validate_batch(rows: List[Tuple[int, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split a batch into valid products and ``{row, sku, error}`` entries. Valid
+    products have CSV price strings parsed and always carry the ``name``,
+    ``category``, ``specs`` and ``base_price_per_meter`` keys the agent tools
+    read (filled from ``product_name``, ``specifications`` and
+    ``price_per_km`` when only those are given).
+    """
+    valid, errors = [], []
+    for row, product in rows:
+        if isinstance(product, Exception):
+            errors.append({"row": row, "sku": None, "error": str(product)})
+            continue
+        if not isinstance(product, dict):
+            errors.append({"row": row, "sku": None, "error": "expected an object"})
+            continue
+        sku = product.get("sku")
+        specs = product.get("specs", product.get("specifications"))
+        problem = None
+        if not isinstance(sku, str) or not sku.strip():
+            problem = "missing sku"
+        elif not (product.get("name") or product.get("product_name")):
+            problem = "missing name"
+        elif specs is None:
+            problem = "missing specs"
+        elif not isinstance(specs, dict):
+            problem = "specs must be an object"
+        elif not _json_safe(specs):
+            problem = "specs contain NaN or Infinity"
+        elif not isinstance(product.get("category"), str) or not product["category"].strip():
+            problem = "missing category"
+        else:
+            for field in PRICE_FIELDS:
+                price = product.get(field)
+                if price is None:
+                    continue
+                if isinstance(price, str):
+                    price = product[field] = _coerce(price)
+                if isinstance(price, bool) or not isinstance(price, (int, float)):
+                    problem = f"{field} is not a number"
+                    break
+                # NaN and inf pass the comparisons below but can't be written as JSON
+                if not math.isfinite(price):
+                    problem = f"{field} is not a finite number"
+                    break
+                if price < 0:
+                    problem = f"{field} is negative"
+                    break
+            else:
+                if product.get("base_price_per_meter") is None and product.get("price_per_km") is None:
+                    problem = "missing base_price_per_meter"
+        if problem:
+            errors.append({"row": row, "sku": sku if isinstance(sku, str) else None, "error": problem})
+            continue
+        product.setdefault("name", product.get("product_name"))
+        product.setdefault("specs", specs)
+        if product.get("base_price_per_meter") is None:
+            product["base_price_per_meter"] = product["price_per_km"] / 1000
+        valid.append(product)
+    return valid, errors
+
+
+def import_catalog(f: BinaryIO, filename: str, catalog, progress: Optional[Dict[str, Any]] = None,
+                   batch_size: int = UPLOAD_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Parse, validate and insert the catalog file ``f`` (blocking; run it off the
+    event loop). ``progress`` is updated in place after every batch. Raises
+    UploadFormatError if the file itself can't be parsed; rows inserted
+    before that point are kept.
+    """
+    name = filename.lower()
+    f.seek(0, os.SEEK_END)
+    total_bytes = f.tell()
+    f.seek(0)
+    reader = _CountingReader(f)
+    if name.endswith(".json"):
+        rows = iter_json_array(reader)
+    elif name.endswith(".csv"):
+        rows = iter_csv_rows(reader)
+    else:
+        raise UploadFormatError("Unsupported file format (expected .json or .csv)")
+
+    progress = progress if progress is not None else {}
+    progress.update({"bytes_total": total_bytes, "bytes_read": 0, "rows": 0, "added": 0,
+                     "duplicates_in_file": 0, "already_in_catalog": 0, "error_count": 0})
+    errors: List[Dict[str, Any]] = []
+    seen = set()
+    start = time.perf_counter()
+
+    def flush(batch):
+        valid, bad = validate_batch(batch)
+        fresh = []
+        for product in valid:
+            if product["sku"] in seen:
+                progress["duplicates_in_file"] += 1
+            else:
+                seen.add(product["sku"])
+                fresh.append(product)
+        existing = catalog.existing_skus([p["sku"] for p in fresh])
+        new = [p for p in fresh if p["sku"] not in existing]
+        now = datetime.now().isoformat()
+        for product in new:
+            product["created_at"] = now
+            product["updated_at"] = now
+        progress["added"] += catalog.extend(new, record=False)
+        progress["already_in_catalog"] += len(existing)
+        progress["rows"] += len(batch)
+        progress["error_count"] += len(bad)
+        progress["bytes_read"] = reader.bytes_read
+        errors.extend(bad[:max(UPLOAD_MAX_ERRORS - len(errors), 0)])
+
+    batch: List[Tuple[int, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+            if progress["rows"] % (batch_size * 50) == 0:
+                logger.info(f"📥 Catalog upload {filename}: {progress['rows']:,} rows, "
+                            f"{progress['bytes_read'] / max(total_bytes, 1):.0%} read")
+    if batch:
+        flush(batch)
+    progress["bytes_read"] = total_bytes
+
+    seconds = round(time.perf_counter() - start, 2)
+    logger.info(f"📥 Catalog upload {filename}: {progress['added']:,} added from {progress['rows']:,} rows "
+                f"({progress['error_count']:,} errors) in {seconds}s")
+    return {**progress, "seconds": seconds, "errors": errors}
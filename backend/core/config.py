@@ -1,12 +1,13 @@
 import os
 from pathlib import Path
 
+from .session_store import SessionStore
+from .jobs import JobQueue
+
 # Data directories
 DATA_DIR = Path("data")
 REPORTS_DIR = DATA_DIR / "reports"
 
-# In-memory storage (replace with DB later)
-oem_catalog_db = []
-chat_sessions = {}
-test_pricing_db = {}
-rfps_db = []
+# Catalog, RFPs and test pricing: see storage.get_storage() (STORAGE_BACKEND=json|sqlite)
+chat_sessions = SessionStore.from_env(DATA_DIR)
+job_queue = JobQueue.from_env()
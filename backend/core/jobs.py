@@ -0,0 +1,344 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import logging
+import ipaddress
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, FrozenSet, Optional, Set
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = {SUCCEEDED, FAILED, CANCELLED}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class WebhookURLError(ValueError):
+    """The webhook URL points somewhere the server must not send requests to."""
+
+
+async def check_webhook_url(url: str, allowed_hosts: FrozenSet[str] = frozenset()) -> None:
+    """
+    Raise WebhookURLError unless ``url`` is http(s) and its host resolves only to
+    public addresses, so clients can't make the server call loopback, private,
+    link-local (cloud metadata) or other internal hosts. Hosts listed in
+    ``allowed_hosts`` skip the address check.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError("webhook_url must be an http(s) URL")
+    host = parts.hostname.lower()
+    if host in allowed_hosts:
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, ValueError) as e:
+        raise WebhookURLError(f"webhook host {host} can't be resolved: {e}")
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if getattr(address, "ipv4_mapped", None):
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise WebhookURLError(f"webhook host {host} resolves to a non-public address ({address})")
+
+
+class Job:
+    def __init__(self, kind: str, run: Callable[[], Awaitable[Any]], session_id: Optional[str], webhook_url: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.session_id = session_id
+        self.webhook_url = webhook_url
+        self.status = JobStatus.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        # Optional dict the job updates in place while it runs (e.g. rows imported so far)
+        self.progress: Optional[Dict[str, Any]] = None
+        self.webhook_status: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._run = run
+        self._task: Optional[asyncio.Task] = None
+        # Set by JobQueue.cancel, to tell a user cancel from the worker being cancelled at shutdown
+        self._cancel_requested = False
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        end = self.started_at or (self.finished_at if self.status == JobStatus.CANCELLED else None) or time.time()
+        return round(end - self.created_at, 3)
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        if not self.started_at:
+            return None
+        return round((self.finished_at or time.time()) - self.started_at, 3)
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "session_id": self.session_id,
+            "status": self.status,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "wait_seconds": self.wait_seconds,
+            "run_seconds": self.run_seconds,
+            "error": self.error,
+            "progress": self.progress,
+            "webhook_status": self.webhook_status,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 3)
+
+
+class JobQueue:
+    """
+    In-process background job queue for long graph runs.
+
+    A fixed pool of asyncio workers bounds how many jobs run at once. Jobs for the
+    same session run one at a time in submission order, since they share a
+    checkpoint thread; synchronous turns take the same per-session lock through
+    ``session()``. Finished jobs are kept for ``result_ttl`` seconds so clients
+    can poll for the result; an optional webhook is POSTed on completion from
+    its own task, so slow receivers never hold a worker. Webhook hosts must
+    resolve to public addresses unless listed in ``webhook_allowed_hosts``.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 1000, result_ttl: float = 3600,
+                 webhook_timeout: float = 10, webhook_retries: int = 3,
+                 webhook_allowed_hosts: FrozenSet[str] = frozenset()):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = webhook_retries
+        self.webhook_allowed_hosts = frozenset(h.lower() for h in webhook_allowed_hosts)
+
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        self._webhook_tasks: Set[asyncio.Task] = set()
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._session_refs: Dict[str, int] = {}
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self._runs: Deque[float] = deque(maxlen=1000)
+        self._counters = {"submitted": 0, "rejected": 0, **{s: 0 for s in JobStatus.FINISHED}}
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        return cls(
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            max_queued=int(os.getenv("JOB_QUEUE_MAX", "1000")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600")),
+            webhook_timeout=float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10")),
+            webhook_retries=int(os.getenv("JOB_WEBHOOK_RETRIES", "3")),
+            webhook_allowed_hosts=frozenset(
+                h.strip() for h in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()
+            ),
+        )
+
+    # ------------------------------------------------------------ lifecycle
+
+    async def start(self) -> None:
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"🧵 Job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        tasks = self._worker_tasks + list(self._webhook_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    # ------------------------------------------------------------ public API
+
+    async def submit(self, kind: str, run: Callable[[], Awaitable[Any]],
+                     session_id: Optional[str] = None, webhook_url: Optional[str] = None) -> Job:
+        await self.start()
+        self._purge_finished()
+        if self._queue.qsize() >= self.max_queued:
+            self._counters["rejected"] += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queued} queued)")
+
+        job = Job(kind, run, session_id, webhook_url)
+        self._jobs[job.id] = job
+        self._counters["submitted"] += 1
+        await self._queue.put(job)
+        return job
+
+    async def check_webhook(self, url: str) -> None:
+        """Raise WebhookURLError if the queue would refuse to call ``url``."""
+        await check_webhook_url(url, self.webhook_allowed_hosts)
+
+    @asynccontextmanager
+    async def session(self, session_id: Optional[str]) -> AsyncIterator[None]:
+        """Hold the per-session lock queued jobs take, so a turn never overlaps one for the same session."""
+        lock = self._session_lock(session_id)
+        if lock is None:
+            yield
+            return
+        try:
+            async with lock:
+                yield
+        finally:
+            self._release_session_lock(session_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status in JobStatus.FINISHED:
+            return job
+        if job.status == JobStatus.QUEUED:
+            # Workers skip cancelled jobs when they reach the front of the queue
+            self._finish(job, JobStatus.CANCELLED)
+        elif job._task is not None:
+            job._cancel_requested = True
+            job._task.cancel()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for j in self._jobs.values() if j.status == JobStatus.RUNNING)
+        queued = sum(1 for j in self._jobs.values() if j.status == JobStatus.QUEUED)
+        oldest = min((j.created_at for j in self._jobs.values() if j.status == JobStatus.QUEUED), default=None)
+        return {
+            "workers": self.workers,
+            "queue_depth": queued,
+            "running": running,
+            "oldest_queued_seconds": round(time.time() - oldest, 3) if oldest else None,
+            "tracked_jobs": len(self._jobs),
+            **self._counters,
+            "wait_seconds": {"p50": _percentile(self._waits, 50), "p95": _percentile(self._waits, 95),
+                             "max": max(self._waits) if self._waits else None},
+            "run_seconds": {"p50": _percentile(self._runs, 50), "p95": _percentile(self._runs, 95),
+                            "max": max(self._runs) if self._runs else None},
+        }
+
+    # ------------------------------------------------------------ internals
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobStatus.QUEUED:
+                    await self._run_job(job)
+            except Exception:
+                logger.exception(f"❌ Job worker {idx} crashed on {job.id}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: Job) -> None:
+        async with self.session(job.session_id):
+            if job.status != JobStatus.QUEUED:
+                return
+            job.started_at = time.time()
+            job.status = JobStatus.RUNNING
+            self._waits.append(job.started_at - job.created_at)
+            job._task = asyncio.create_task(job._run())
+            try:
+                job.result = await job._task
+                self._finish(job, JobStatus.SUCCEEDED)
+            except asyncio.CancelledError:
+                # Cancelling the worker (shutdown) cancels the awaited job task too,
+                # so only the flag set by cancel() marks a user cancel
+                self._finish(job, JobStatus.CANCELLED)
+                if not job._cancel_requested:
+                    job._task.cancel()
+                    raise
+            except Exception as e:
+                logger.exception(f"❌ Job {job.id} failed")
+                job.error = str(e)
+                self._finish(job, JobStatus.FAILED)
+            finally:
+                job._task = None
+
+        if job.webhook_url:
+            task = asyncio.create_task(self._notify(job))
+            self._webhook_tasks.add(task)
+            task.add_done_callback(self._webhook_tasks.discard)
+
+    def _session_lock(self, session_id: Optional[str]) -> Optional[asyncio.Lock]:
+        if not session_id:
+            return None
+        self._session_refs[session_id] = self._session_refs.get(session_id, 0) + 1
+        return self._session_locks.setdefault(session_id, asyncio.Lock())
+
+    def _release_session_lock(self, session_id: str) -> None:
+        # Drop the lock once no queued job for the session still needs it
+        self._session_refs[session_id] -= 1
+        if self._session_refs[session_id] == 0:
+            del self._session_refs[session_id]
+            del self._session_locks[session_id]
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        self._counters[status] += 1
+        if job.started_at:
+            self._runs.append(job.finished_at - job.started_at)
+
+    async def _notify(self, job: Job) -> None:
+        import requests
+
+        payload = job.to_dict(include_result=True)
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.webhook_retries + 1):
+            try:
+                # Checked again on every attempt, since DNS answers can change after submit
+                await self.check_webhook(job.webhook_url)
+            except WebhookURLError as e:
+                job.webhook_status = f"rejected: {e}"
+                logger.warning(f"⚠️ Webhook for job {job.id} not sent: {e}")
+                return
+            try:
+                # No redirects: a public URL must not bounce the request to an internal host
+                resp = await loop.run_in_executor(None, lambda: requests.post(
+                    job.webhook_url, json=payload, timeout=self.webhook_timeout, allow_redirects=False
+                ))
+                job.webhook_status = f"{resp.status_code}"
+                if resp.status_code < 500:
+                    return
+            except Exception as e:
+                job.webhook_status = f"error: {e}"
+            if attempt < self.webhook_retries:
+                await asyncio.sleep(min(2 ** attempt, 30))
+        logger.warning(f"⚠️ Webhook for job {job.id} failed after {self.webhook_retries} attempts: {job.webhook_status}")
+
+    def _purge_finished(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [jid for jid, j in self._jobs.items()
+                   if j.status in JobStatus.FINISHED and (j.finished_at or 0) < cutoff]
+        for jid in expired:
+            del self._jobs[jid]
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path: Path, data: Any, indent: Optional[int] = 2) -> int:
+    """Write ``data`` as JSON to a temp file, fsync it and rename it over ``path``; returns bytes written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    payload = json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(payload)
+
+
+class StorePersistence:
+    """
+    Write-behind persistence for one of the JSON-backed stores (catalog, RFPs,
+    test pricing).
+
+    Request handlers apply a mutation in memory and then ``record`` it, which
+    only appends to an in-memory batch. A background task appends each batch to
+    ``<name>.log`` (one JSON change per line) with a single fsync, and every
+    ``compact_every`` changes or ``compact_interval`` seconds writes the whole
+    store to ``<name>.json`` through a temp file + rename, then truncates the
+    log. File I/O runs off the event loop, so mutation latency no longer grows
+    with the size of the store.
+
+    Changes are idempotent upserts/deletes carrying the full value, so replaying
+    a change the snapshot already contains is harmless; that keeps a crash
+    between the snapshot rename and the log truncation safe. Always record
+    *after* applying the mutation, so a snapshot taken in between never misses
+    a change that is already in the log.
+    """
+
+    def __init__(self, name: str, snapshot_path: Path, snapshot: Callable[[], Any],
+                 flush_interval: float = 0.05, compact_every: int = 1000, compact_interval: float = 30.0):
+        self.name = name
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = self.snapshot_path.with_suffix(".log")
+        self.snapshot = snapshot
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+
+        self._pending: List[Dict[str, Any]] = []
+        # Sync handlers and agent tools record from worker threads
+        self._pending_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # flush and compact both touch the log; a batch appended while a
+        # snapshot is being written would be truncated away with the old log
+        self._io_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._log_entries = 0
+        self._dirty_since: Optional[float] = None
+        self._counters = {"recorded": 0, "flushes": 0, "fsyncs": 0, "snapshots": 0, "replayed": 0, "errors": 0}
+        self._last_snapshot_ms: Optional[float] = None
+        self._last_snapshot_bytes: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, name: str, snapshot_path: Path, snapshot: Callable[[], Any]) -> "StorePersistence":
+        return cls(
+            name, snapshot_path, snapshot,
+            flush_interval=float(os.getenv("STORE_FLUSH_INTERVAL_MS", "50")) / 1000,
+            compact_every=int(os.getenv("STORE_COMPACT_EVERY", "1000")),
+            compact_interval=float(os.getenv("STORE_COMPACT_INTERVAL_SECONDS", "30")),
+        )
+
+    # ------------------------------------------------------------ recording
+
+    def record(self, op: str, key: Any = None, value: Any = None) -> None:
+        """Queue one change (``put``/``delete``/``replace``) for the log; O(1), no I/O."""
+        with self._pending_lock:
+            self._pending.append({"op": op, "key": key, "value": value})
+            self._counters["recorded"] += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wake the writer task; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or self._wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wakeup.set()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def replay(self, apply: Callable[[str, Any, Any], None]) -> int:
+        """
+        Apply the changes logged since the last snapshot (call after loading the
+        snapshot, before serving). A torn last line from a crash mid-append is skipped.
+        """
+        if not self.log_path.exists():
+            return 0
+        applied = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines, 1):
+            try:
+                change = json.loads(line)
+            except json.JSONDecodeError:
+                level = logging.INFO if number == len(lines) else logging.WARNING
+                logger.log(level, f"⚠️ {self.log_path}: unreadable change on line {number}, stopping replay")
+                break
+            apply(change["op"], change.get("key"), change.get("value"))
+            applied += 1
+        self._log_entries = applied
+        self._counters["replayed"] += applied
+        if applied:
+            # Fold the replayed changes into a fresh snapshot soon
+            self._dirty_since = time.monotonic() - self.compact_interval
+            logger.info(f"🔁 Replayed {applied} logged {self.name} change(s)")
+        return applied
+
+    # ------------------------------------------------------------ background writer
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name=f"persist-{self.name}")
+
+    async def stop(self) -> None:
+        """Flush what's pending and write a final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._dirty_since is not None or self._log_entries:
+            await self.compact()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                timeout = self.compact_interval if self._dirty_since is None else max(
+                    self._dirty_since + self.compact_interval - time.monotonic(), 0)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    # Let a burst of mutations pile up into one write + fsync
+                    await asyncio.sleep(self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+                due = self._dirty_since is not None and time.monotonic() - self._dirty_since >= self.compact_interval
+                if self._log_entries >= self.compact_every or due:
+                    await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._counters["errors"] += 1
+                logger.exception(f"❌ Persisting {self.name} failed; retrying")
+                await asyncio.sleep(1)
+
+    async def flush(self) -> None:
+        """Append pending changes to the log with one fsync."""
+        async with self._io_lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        from agents.executors import run_blocking
+
+        with self._pending_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+        try:
+            await run_blocking(self._append, batch)
+        except Exception:
+            # Put the batch back in front so nothing is lost or reordered
+            with self._pending_lock:
+                self._pending[:0] = batch
+            raise
+        self._log_entries += len(batch)
+        self._counters["flushes"] += 1
+        self._counters["fsyncs"] += 1
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(change, ensure_ascii=False) + "\n" for change in batch)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def compact(self) -> None:
+        """Write the whole store to the snapshot file atomically, then truncate the log."""
+        from agents.executors import run_blocking
+
+        async with self._io_lock:
+            # Everything in the log now is already applied in memory, so the snapshot covers it
+            await self._flush()
+            self._dirty_since = None
+            start = time.perf_counter()
+            try:
+                self._last_snapshot_bytes = await run_blocking(self._write_snapshot)
+            except Exception:
+                self._dirty_since = time.monotonic()
+                raise
+            self._last_snapshot_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._log_entries = 0
+            self._counters["snapshots"] += 1
+
+    def _write_snapshot(self) -> int:
+        size = write_json_atomic(self.snapshot_path, self.snapshot())
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            os.fsync(f.fileno())
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "snapshot": str(self.snapshot_path),
+            "log": str(self.log_path),
+            "pending": len(self._pending),
+            "log_entries": self._log_entries,
+            "last_snapshot_ms": self._last_snapshot_ms,
+            "last_snapshot_bytes": self._last_snapshot_bytes,
+            **self._counters,
+        }
@@ -0,0 +1,308 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    session_id TEXT NOT NULL,
+    rfp_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    manifest_size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, rfp_id)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_hash ON reports (content_hash);
+CREATE TABLE IF NOT EXISTS rendered (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_rendered_last_access ON rendered (last_access_at);
+CREATE TABLE IF NOT EXISTS report_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def report_key(session_id: str, rfp_id: str) -> str:
+    """
+    File-name stem of a report: manifests are ``<key>.json`` in the reports
+    directory. Hashed so distinct (session, RFP) pairs never share a file
+    (joining them with "_" made ("a_b", "c") and ("a", "b_c") collide).
+    """
+    return hashlib.sha256(json.dumps([session_id, rfp_id]).encode("utf-8")).hexdigest()
+
+
+def _is_report_key(stem: str) -> bool:
+    return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+
+class ReportIndex:
+    """
+    SQLite index of stored reports and their rendered PDFs, shared by every
+    worker process.
+
+    ``reports`` holds one row per (session, RFP) manifest; ``rendered`` one row
+    per PDF under ``rendered/<content hash>.pdf`` with its size, creation time
+    and last download. Manifests and PDFs share the ``max_bytes`` budget. Over
+    it, the least recently downloaded PDFs are evicted first, since an evicted
+    report is simply rendered again on its next download. If the manifests
+    alone are still over budget, the oldest ones are deleted too, and those
+    reports are gone for good.
+    """
+
+    # Downloads of the same PDF within this many seconds update last access once
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path: Path, reports_dir: Path, max_bytes: int):
+        self.path = Path(path)
+        self.reports_dir = Path(reports_dir)
+        self.rendered_dir = self.reports_dir / "rendered"
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._touched: Dict[str, float] = {}
+        self.reconcile()
+
+    def _bump(self, **deltas: float) -> None:
+        self._conn.executemany(
+            "INSERT INTO report_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(deltas.items()),
+        )
+
+    def reconcile(self) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Bring the index in line with the files: index PDFs and manifests it
+        doesn't know (e.g. written before the index existed), forget rows whose
+        file is gone, then enforce the budget. Returns the evicted content
+        hashes and (session, RFP) reports.
+        """
+        on_disk = {}
+        if self.rendered_dir.is_dir():
+            for entry in os.scandir(self.rendered_dir):
+                if entry.name.endswith(".pdf") and entry.is_file():
+                    stat = entry.stat()
+                    on_disk[entry.name[:-4]] = (stat.st_size, stat.st_mtime)
+        manifests = {}
+        if self.reports_dir.is_dir():
+            for entry in os.scandir(self.reports_dir):
+                if entry.name.endswith(".json") and entry.is_file():
+                    manifests[entry.name[:-5]] = entry.path
+        for stem in [stem for stem in manifests if not _is_report_key(stem)]:
+            key = self._rename_legacy_manifest(manifests.pop(stem))
+            if key is not None:
+                manifests[key] = str(self.reports_dir / f"{key}.json")
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT content_hash FROM rendered")}
+            missing = [(digest,) for digest in known - on_disk.keys()]
+            self._conn.executemany("DELETE FROM rendered WHERE content_hash = ?", missing)
+            self._conn.executemany(
+                "INSERT INTO rendered (content_hash, size, created_at, last_access_at) VALUES (?, ?, ?, ?)",
+                [(digest, size, mtime, mtime) for digest, (size, mtime) in on_disk.items() if digest not in known],
+            )
+            known_reports = {report_key(s, r): (s, r) for s, r in self._conn.execute("SELECT session_id, rfp_id FROM reports")}
+            gone = [known_reports[key] for key in known_reports.keys() - manifests.keys()]
+            self._conn.executemany("DELETE FROM reports WHERE session_id = ? AND rfp_id = ?", gone)
+            found = [row for row in (_manifest_row(manifests[key]) for key in manifests.keys() - known_reports.keys()) if row]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reports (session_id, rfp_id, content_hash, manifest_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                found,
+            )
+            victims, expired = self._evict()
+        self._delete_files(victims, expired)
+        if missing or len(on_disk) > len(known) or gone or found or victims or expired:
+            logger.info(f"🗂️ Report index reconciled: {len(on_disk)} PDFs and {len(manifests)} manifests on disk, "
+                        f"{len(missing) + len(gone)} stale rows dropped, {len(victims) + len(expired)} evicted")
+        return victims, expired
+
+    def _rename_legacy_manifest(self, path: str) -> Optional[str]:
+        """Move a manifest saved under the old ``<session>_<rfp>`` name to its hashed key."""
+        row = _manifest_row(path)
+        if row is None:
+            return None
+        key = report_key(row[0], row[1])
+        target = self.reports_dir / f"{key}.json"
+        if target.exists():
+            # Saved again since the upgrade; the legacy copy is older
+            os.unlink(path)
+        else:
+            os.replace(path, target)
+        return key
+
+    def record_report(self, session_id: str, rfp_id: str, content_hash: str,
+                      manifest_size: int) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Index a saved manifest and evict down to the budget; returns what was evicted."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (session_id, rfp_id, content_hash, manifest_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, rfp_id, content_hash, manifest_size, time.time()),
+            )
+            victims, expired = self._evict(keep_report=(session_id, rfp_id))
+        self._delete_files(victims, expired)
+        return victims, expired
+
+    def record_render(self, content_hash: str, size: int) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Index a freshly rendered PDF and evict down to the budget; returns what was evicted."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rendered (content_hash, size, created_at, last_access_at, hits) "
+                "VALUES (?, ?, ?, ?, 0)",
+                (content_hash, size, now, now),
+            )
+            self._touched[content_hash] = time.monotonic()
+            victims, expired = self._evict(keep=content_hash)
+        self._delete_files(victims, expired)
+        return victims, expired
+
+    def touch_due(self, content_hash: str) -> bool:
+        """Whether a download of ``content_hash`` should be written to the index (cheap, no I/O)."""
+        return time.monotonic() - self._touched.get(content_hash, 0.0) >= self.TOUCH_INTERVAL
+
+    def touch(self, content_hash: str) -> None:
+        """Record a download for LRU eviction."""
+        self._touched[content_hash] = time.monotonic()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE rendered SET last_access_at = ?, hits = hits + 1 WHERE content_hash = ?",
+                (time.time(), content_hash),
+            )
+
+    def _evict(self, keep: Optional[str] = None,
+               keep_report: Optional[Tuple[str, str]] = None) -> Tuple[List[str], List[Tuple[str, str]]]:
+        if self.max_bytes <= 0:
+            return [], []
+        total = (self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM rendered").fetchone()[0]
+                 + self._conn.execute("SELECT COALESCE(SUM(manifest_size), 0) FROM reports").fetchone()[0])
+        if total <= self.max_bytes:
+            return [], []
+        # Least recently downloaded PDFs first: they can be rendered again
+        freed = 0
+        victims = []
+        for digest, size in self._conn.execute("SELECT content_hash, size FROM rendered ORDER BY last_access_at ASC"):
+            if total - freed <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            victims.append(digest)
+            freed += size
+        self._conn.executemany("DELETE FROM rendered WHERE content_hash = ?", [(d,) for d in victims])
+        for digest in victims:
+            self._touched.pop(digest, None)
+        pdf_bytes = freed
+        # Then the oldest manifests
+        expired = []
+        if total - freed > self.max_bytes:
+            rows = self._conn.execute("SELECT session_id, rfp_id, manifest_size FROM reports ORDER BY created_at ASC")
+            for session_id, rfp_id, size in rows:
+                if total - freed <= self.max_bytes:
+                    break
+                if (session_id, rfp_id) == keep_report:
+                    continue
+                expired.append((session_id, rfp_id))
+                freed += size
+            self._conn.executemany("DELETE FROM reports WHERE session_id = ? AND rfp_id = ?", expired)
+        if victims:
+            self._bump(evicted=len(victims), evicted_bytes=pdf_bytes)
+        if expired:
+            self._bump(evicted_reports=len(expired), evicted_report_bytes=freed - pdf_bytes)
+        return victims, expired
+
+    def _delete_files(self, digests: List[str], reports: List[Tuple[str, str]] = ()) -> None:
+        # Downloads already streaming an evicted file keep their open handle
+        paths = [self.rendered_dir / f"{digest}.pdf" for digest in digests]
+        paths += [self.reports_dir / f"{report_key(*report)}.json" for report in reports]
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        if paths:
+            logger.info(f"🧹 Evicted {len(digests)} rendered report(s) and {len(reports)} report manifest(s) "
+                        f"to stay under {self.max_bytes:,} bytes")
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM report_stats").fetchall())
+            reports, manifest_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(manifest_size), 0) FROM reports"
+            ).fetchone()
+            rendered, rendered_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM rendered"
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT r.session_id, r.rfp_id, r.content_hash, r.manifest_size, r.created_at, "
+                "x.size, x.last_access_at, x.hits "
+                "FROM reports r LEFT JOIN rendered x ON x.content_hash = r.content_hash "
+                "ORDER BY COALESCE(x.size, 0) DESC, r.created_at DESC LIMIT ?",
+                (top,),
+            ).fetchall()
+            sessions = self._conn.execute(
+                "SELECT r.session_id, COUNT(*), COALESCE(SUM(r.manifest_size), 0) + COALESCE(SUM(x.size), 0) AS bytes "
+                "FROM reports r LEFT JOIN rendered x ON x.content_hash = r.content_hash "
+                "GROUP BY r.session_id ORDER BY bytes DESC LIMIT ?",
+                (top,),
+            ).fetchall()
+        return {
+            "path": str(self.path),
+            "reports": reports,
+            "manifest_bytes": manifest_bytes,
+            "rendered": rendered,
+            "rendered_bytes": rendered_bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": int(counters.get("evicted", 0)),
+            "evicted_bytes": int(counters.get("evicted_bytes", 0)),
+            "evicted_reports": int(counters.get("evicted_reports", 0)),
+            "evicted_report_bytes": int(counters.get("evicted_report_bytes", 0)),
+            "largest_reports": [
+                {
+                    "session_id": session_id,
+                    "rfp_id": rfp_id,
+                    "content_hash": digest,
+                    "manifest_bytes": manifest_size,
+                    "created_at": created_at,
+                    "rendered_bytes": size,
+                    "last_access_at": last_access_at,
+                    "downloads": hits,
+                }
+                for session_id, rfp_id, digest, manifest_size, created_at, size, last_access_at, hits in rows
+            ],
+            "sessions": [
+                {"session_id": session_id, "reports": count, "bytes": size}
+                for session_id, count, size in sessions
+            ],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _manifest_row(path: str) -> Optional[Tuple]:
+    """``reports`` row for a manifest file the index doesn't know yet, or None if it can't be read."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = os.stat(path)
+        return (manifest["session_id"], manifest["rfp_id"], manifest["content_hash"], stat.st_size, stat.st_mtime)
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning(f"⚠️ Skipping unreadable report manifest {path}")
+        return None
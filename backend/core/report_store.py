@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .report_index import ReportIndex, report_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORTS_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "reports"
+
+# Bump when the PDF layout changes so cached renders of the same sections are redone
+RENDERER_VERSION = "3"
+
+
+def content_hash(title: str, sections: List[List[str]]) -> str:
+    payload = json.dumps([RENDERER_VERSION, title, sections], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render(output_path: str, title: str, sections: List[List[str]]) -> str:
+    """Worker-process entry point: render to a temp file, then move it into place."""
+    from backend.utils import generate_pdf_report
+
+    tmp = f"{output_path}.{os.getpid()}.tmp"
+    generate_pdf_report(tmp, title, [tuple(s) for s in sections])
+    os.replace(tmp, output_path)
+    return output_path
+
+
+class ReportStore:
+    """
+    Report sections written by the agents, rendered to PDF on first download.
+
+    The graph only saves a small JSON manifest per (session, RFP) holding the
+    title and sections. ``pdf_path`` renders it in a process pool, off the event
+    loop, to ``rendered/<content hash>.pdf``, so identical reports are rendered
+    once and later downloads are plain file reads. Concurrent requests for a
+    report that is still rendering wait on the same render.
+
+    ``report_meta`` keeps a small LRU of (content hash, rendered file stat) per
+    report, so repeat downloads and conditional requests touch no files at all.
+    Entries are revalidated against the manifest after ``meta_ttl`` seconds,
+    which covers manifests rewritten by another worker process.
+
+    Manifests and rendered PDFs are tracked in a ``ReportIndex`` that keeps
+    them under ``max_bytes``: the least recently downloaded PDFs go first (an
+    evicted PDF is rendered again from its manifest on the next download),
+    then, if the manifests alone are over budget, the oldest reports.
+    """
+
+    def __init__(self, reports_dir: Path, render_workers: int = 2,
+                 meta_cache_size: int = 1024, meta_ttl: float = 30.0,
+                 max_bytes: int = 1024 ** 3, index_path: Optional[Path] = None):
+        self.reports_dir = Path(reports_dir)
+        self.rendered_dir = self.reports_dir / "rendered"
+        self.render_workers = render_workers
+        self.max_bytes = max_bytes
+        self.index_path = Path(index_path) if index_path else self.reports_dir / "index.sqlite"
+        self._index: Optional[ReportIndex] = None
+        self.meta_cache_size = meta_cache_size
+        self.meta_ttl = meta_ttl
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._meta: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._counters = {"renders": 0, "cache_hits": 0, "joined": 0, "render_errors": 0,
+                          "meta_hits": 0, "meta_misses": 0, "pool_restarts": 0}
+
+    @classmethod
+    def from_env(cls) -> "ReportStore":
+        return cls(
+            reports_dir=Path(os.getenv("REPORTS_DIR", str(DEFAULT_REPORTS_DIR))),
+            render_workers=int(os.getenv("REPORT_RENDER_WORKERS", "2")),
+            meta_cache_size=int(os.getenv("REPORT_META_CACHE_SIZE", "1024")),
+            meta_ttl=float(os.getenv("REPORT_META_TTL_SECONDS", "30")),
+            max_bytes=int(os.getenv("REPORTS_MAX_BYTES", str(1024 ** 3))),
+            index_path=os.getenv("REPORTS_INDEX_PATH") or None,
+        )
+
+    @property
+    def index(self) -> ReportIndex:
+        # Opened on first use: it scans rendered/ once, so keep that off import
+        if self._index is None:
+            self._index = ReportIndex(self.index_path, self.reports_dir, self.max_bytes)
+        return self._index
+
+    def manifest_path(self, session_id: str, rfp_id: str) -> Path:
+        return self.reports_dir / f"{report_key(session_id, rfp_id)}.json"
+
+    def save(self, session_id: str, rfp_id: str, title: str, sections: List[tuple]) -> Dict[str, Any]:
+        """Store the sections for one report; nothing is rendered yet."""
+        sections = [[heading, body or ""] for heading, body in sections]
+        manifest = {
+            "session_id": session_id,
+            "rfp_id": rfp_id,
+            "title": title,
+            "sections": sections,
+            "content_hash": content_hash(title, sections),
+        }
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifest_path(session_id, rfp_id)
+        data = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+        _write_atomic(path, data)
+        self._meta.pop(report_key(session_id, rfp_id), None)
+        self._forget_evicted(*self.index.record_report(session_id, rfp_id, manifest["content_hash"], len(data)))
+        return {"manifest_path": str(path), "content_hash": manifest["content_hash"]}
+
+    def load(self, session_id: str, rfp_id: str) -> Optional[Dict[str, Any]]:
+        # Opening the index first moves manifests still under their pre-hash names
+        self.index
+        path = self.manifest_path(session_id, rfp_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def rendered_path(self, digest: str) -> Path:
+        return self.rendered_dir / f"{digest}.pdf"
+
+    async def pdf_path(self, manifest: Dict[str, Any]) -> Path:
+        """Path of the rendered PDF for ``manifest``, rendering it first if needed."""
+        digest = manifest["content_hash"]
+        path = self.rendered_path(digest)
+        if path.exists():
+            self._counters["cache_hits"] += 1
+            return path
+
+        task = self._inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._render(digest, manifest["title"], manifest["sections"]))
+            self._inflight[digest] = task
+            task.add_done_callback(lambda t: self._render_done(digest, t))
+        else:
+            self._counters["joined"] += 1
+        # shield: one client disconnecting must not cancel the render for the others
+        await asyncio.shield(task)
+        return path
+
+    async def report_meta(self, session_id: str, rfp_id: str) -> Optional[Dict[str, Any]]:
+        """
+        {"content_hash", "path", "stat"} for a report, or None if it doesn't
+        exist. ``path``/``stat`` stay None until ``rendered`` has produced the PDF.
+        """
+        from agents.executors import run_blocking
+
+        key = report_key(session_id, rfp_id)
+        entry = self._meta.get(key)
+        now = time.monotonic()
+        if entry is not None and entry["checked"] + self.meta_ttl > now:
+            self._meta.move_to_end(key)
+            self._counters["meta_hits"] += 1
+            return entry
+
+        self._counters["meta_misses"] += 1
+        manifest = await run_blocking(self.load, session_id, rfp_id)
+        if manifest is None:
+            self._meta.pop(key, None)
+            return None
+        if entry is None or entry["content_hash"] != manifest["content_hash"]:
+            # Rendered files are named by content hash, so a known stat stays valid while the hash does
+            entry = {"content_hash": manifest["content_hash"], "path": None, "stat": None}
+        elif entry["path"] is not None and not await run_blocking(entry["path"].exists):
+            # ...unless another worker evicted the PDF
+            entry["path"] = entry["stat"] = None
+        entry["checked"] = now
+        self._meta[key] = entry
+        self._meta.move_to_end(key)
+        while len(self._meta) > self.meta_cache_size:
+            self._meta.popitem(last=False)
+        return entry
+
+    async def rendered(self, session_id: str, rfp_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Make sure the PDF for ``entry`` exists and fill in its path and stat."""
+        from agents.executors import run_blocking
+
+        if entry["stat"] is None:
+            manifest = await run_blocking(self.load, session_id, rfp_id)
+            if manifest is None:
+                raise FileNotFoundError(f"Report manifest for {session_id}/{rfp_id} disappeared")
+            path = await self.pdf_path(manifest)
+            entry["content_hash"] = manifest["content_hash"]
+            entry["stat"] = await run_blocking(os.stat, path)
+            entry["path"] = path
+        if self.index.touch_due(entry["content_hash"]):
+            await run_blocking(self.index.touch, entry["content_hash"])
+        return entry
+
+    def _forget_evicted(self, digests: List[str], reports: List[tuple]) -> None:
+        """Drop cached stats of evicted PDFs (their next download renders again) and of deleted reports."""
+        for report in reports:
+            self._meta.pop(report_key(*report), None)
+        if not digests:
+            return
+        evicted = set(digests)
+        for entry in self._meta.values():
+            if entry["content_hash"] in evicted:
+                entry["path"] = entry["stat"] = None
+
+    def _render_done(self, digest: str, task: asyncio.Task) -> None:
+        self._inflight.pop(digest, None)
+        if task.cancelled() or task.exception() is not None:
+            self._counters["render_errors"] += 1
+        else:
+            self._counters["renders"] += 1
+
+    async def _render(self, digest: str, title: str, sections: List[List[str]]) -> None:
+        from agents.tracing import span
+        from agents.executors import run_blocking
+
+        self.rendered_dir.mkdir(parents=True, exist_ok=True)
+        output_path = str(self.rendered_path(digest))
+        loop = asyncio.get_running_loop()
+        with span("pdf", "rfp_report"):
+            if self.render_workers <= 0:
+                await run_blocking(_render, output_path, title, sections)
+            else:
+                pool = self._render_pool()
+                try:
+                    await loop.run_in_executor(pool, _render, output_path, title, sections)
+                except BrokenProcessPool:
+                    # A worker died (OOM, crash): the pool refuses all further work, so
+                    # replace it and retry this render once
+                    self._discard_pool(pool)
+                    await loop.run_in_executor(self._render_pool(), _render, output_path, title, sections)
+        size = await run_blocking(os.path.getsize, output_path)
+        self._forget_evicted(*await run_blocking(self.index.record_render, digest, size))
+
+    def _render_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs threads (executors, SQLite) isn't safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.render_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Concurrent renders see the same broken pool; only the first one replaces it
+        if self._pool is not pool:
+            return
+        logger.warning("⚠️ PDF render pool broke (a worker died); starting a new one")
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._counters["pool_restarts"] += 1
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "reports_dir": str(self.reports_dir),
+            "render_workers": self.render_workers,
+            "rendering": len(self._inflight),
+            "meta_cached": len(self._meta),
+            **self._counters,
+            "index": self.index.stats(top=top),
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+
+_store: Optional[ReportStore] = None
+
+
+def get_report_store() -> ReportStore:
+    global _store
+    if _store is None:
+        _store = ReportStore.from_env()
+    return _store
@@ -0,0 +1,381 @@
+import os
+import time
+import zlib
+import pickle
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Bounded in-memory store for per-session workflow state.
+
+    Entries are kept in LRU order and evicted when the store exceeds
+    ``max_entries`` or ``max_bytes``, or when a session has been idle longer than
+    ``idle_ttl``. If ``spill_dir`` is set, evicted sessions are written there
+    (pickled + zlib) and transparently reloaded on the next access instead of
+    being lost; spilled files older than ``spill_ttl`` are removed.
+
+    Writes only do in-memory work: sizes are estimated by walking the state
+    rather than serializing it, and spills, file removals and purges run in
+    order on one background writer thread (a session still being written is
+    served from memory). Reloading a spilled session reads a file, so async
+    callers use ``aget``, which does that in a thread; the file is read
+    without holding the store lock, so other sessions are never kept waiting
+    on disk.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl: float = 3600,
+        spill_dir: Optional[Path] = None,
+        spill_ttl: float = 7 * 24 * 3600,
+        sweep_interval: float = 60,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_ttl = spill_ttl
+        self.sweep_interval = sweep_interval
+
+        # session_id -> (state, size_bytes, last_access)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Evicted sessions queued for the spill writer, still readable until written
+        self._spilling: Dict[str, Any] = {}
+        self._writer: Optional[ThreadPoolExecutor] = None
+        # Spill file name -> size, kept by the writer thread so stats never list the directory
+        self._on_disk: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self._counters = {
+            "hits": 0, "misses": 0, "spill_hits": 0,
+            "evicted_lru": 0, "evicted_ttl": 0, "spilled": 0, "spill_errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls, data_dir: Path) -> "SessionStore":
+        spill = os.getenv("SESSION_SPILL_DIR", str(data_dir / "sessions"))
+        return cls(
+            max_entries=int(os.getenv("SESSION_MAX_ENTRIES", "1000")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024))),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600")),
+            spill_dir=Path(spill) if spill else None,
+            spill_ttl=float(os.getenv("SESSION_SPILL_TTL_SECONDS", str(7 * 24 * 3600))),
+        )
+
+    # ------------------------------------------------------------ mapping API
+
+    def get(self, session_id: str, default: Any = None) -> Any:
+        """State for ``session_id``; may read a spilled file, so async code should use ``aget``."""
+        with self._lock:
+            self._maybe_sweep()
+            state = self._get_held(session_id)
+            if state is not None:
+                return state
+
+        loaded = self._read_spilled(session_id)
+        with self._lock:
+            # Another caller may have reloaded or replaced it meanwhile; memory wins
+            state = self._get_held(session_id)
+            if state is not None:
+                return state
+            if loaded is None:
+                self._counters["misses"] += 1
+                return default
+            self._counters["spill_hits"] += 1
+            self._put(session_id, loaded)
+            path = self._spill_path(session_id)
+            if path.name not in self._on_disk:
+                # Left by an earlier run and not counted yet, so _put didn't queue its removal
+                self._submit(self._remove_spill, path)
+            return loaded
+
+    async def aget(self, session_id: str, default: Any = None) -> Any:
+        """``get`` that reloads spilled sessions in a thread instead of on the event loop."""
+        with self._lock:
+            self._maybe_sweep()
+            state = self._get_held(session_id)
+            if state is not None:
+                return state
+        if self.spill_dir is None:
+            return self.get(session_id, default)
+        return await asyncio.to_thread(self.get, session_id, default)
+
+    def __getitem__(self, session_id: str) -> Any:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        return state
+
+    def __setitem__(self, session_id: str, state: Any) -> None:
+        with self._lock:
+            self._maybe_sweep()
+            self._put(session_id, state)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._entries or session_id in self._spilling:
+                return True
+        path = self._spill_path(session_id)
+        return path is not None and path.exists()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        """Remove a session from memory and disk; reads the spilled file, so run it in a thread from async code."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            pending = self._spilling.pop(session_id, None)
+        if entry is not None:
+            state = entry[0]
+        elif pending is not None:
+            state = pending
+        else:
+            state = self._read_spilled(session_id)
+        if self.spill_dir:
+            with self._lock:
+                self._submit(self._remove_spill, self._spill_path(session_id))
+        return state if state is not None else default
+
+    # ------------------------------------------------------------ internals
+
+    def _get_held(self, session_id: str) -> Any:
+        """State held in memory (or waiting to be spilled), without touching disk; None if neither."""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            state, size, _ = entry
+            self._entries[session_id] = (state, size, time.monotonic())
+            self._entries.move_to_end(session_id)
+            self._counters["hits"] += 1
+            return state
+        state = self._spilling.pop(session_id, None)
+        if state is not None:
+            # Back in memory; the writer drops the file it is about to write
+            self._counters["spill_hits"] += 1
+            self._put(session_id, state)
+        return state
+
+    @staticmethod
+    def estimate_size(state: Any) -> int:
+        """
+        Rough bytes held by ``state``: text lengths plus a fixed cost per object,
+        found by walking it. Much cheaper than pickling on every write, and close
+        enough for an LRU byte budget.
+        """
+        total = 0
+        seen = set()
+        stack = [state]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, (str, bytes, bytearray)):
+                total += len(obj) + 40
+                continue
+            if obj is None or isinstance(obj, (bool, int, float)):
+                total += 8
+                continue
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            total += 56
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            elif hasattr(obj, "__dict__"):
+                stack.extend(vars(obj).values())
+        return total
+
+    def _put(self, session_id: str, state: Any) -> None:
+        old = self._entries.pop(session_id, None)
+        if old is not None:
+            self._bytes -= old[1]
+        # Memory is now authoritative: drop a pending spill, and a spilled copy
+        # (removed after any write already queued for it)
+        self._spilling.pop(session_id, None)
+        path = self._spill_path(session_id)
+        if path is not None and path.name in self._on_disk:
+            self._submit(self._remove_spill, path)
+        size = self.estimate_size(state)
+        self._entries[session_id] = (state, size, time.monotonic())
+        self._bytes += size
+        self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        # Always keep the most recently used session, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            session_id, (state, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._counters["evicted_lru"] += 1
+            self._spill(session_id, state)
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        self.expire_idle(now)
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """Move sessions idle longer than the TTL out of memory; returns how many moved."""
+        now = now if now is not None else time.monotonic()
+        expired = 0
+        with self._lock:
+            # LRU order means idle sessions sit at the front
+            while self._entries:
+                session_id, (state, size, last_access) = next(iter(self._entries.items()))
+                if now - last_access <= self.idle_ttl:
+                    break
+                self._entries.popitem(last=False)
+                self._bytes -= size
+                self._counters["evicted_ttl"] += 1
+                self._spill(session_id, state)
+                expired += 1
+        if self.spill_dir:
+            self._submit(self._purge_spilled)
+        return expired
+
+    def _spill_path(self, session_id: str) -> Optional[Path]:
+        if not self.spill_dir:
+            return None
+        # Hashed so distinct IDs never share a file (sanitising "a b" and "a_b" would)
+        return self.spill_dir / f"{hashlib.sha256(session_id.encode('utf-8')).hexdigest()}.session"
+
+    def _start_writer(self) -> ThreadPoolExecutor:
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-spill")
+            # Files left by an earlier run, counted once before anything else touches the directory
+            self._writer.submit(self._scan_spilled)
+        return self._writer
+
+    def _submit(self, fn, *args) -> None:
+        self._start_writer().submit(fn, *args)
+
+    def _spill(self, session_id: str, state: Any) -> None:
+        if not self.spill_dir:
+            return
+        self._spilling[session_id] = state
+        self._submit(self._write_spill, session_id, state)
+
+    def _write_spill(self, session_id: str, state: Any) -> None:
+        """Spill writer thread: pickle and write one evicted session."""
+        path = self._spill_path(session_id)
+        try:
+            data = zlib.compress(pickle.dumps((session_id, state), protocol=pickle.HIGHEST_PROTOCOL))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            with self._lock:
+                self._on_disk[path.name] = len(data)
+                self._counters["spilled"] += 1
+        except Exception:
+            with self._lock:
+                self._counters["spill_errors"] += 1
+            logger.exception(f"❌ Failed to spill session {session_id}")
+        with self._lock:
+            if self._spilling.get(session_id) is state:
+                del self._spilling[session_id]
+                return
+            stale = session_id not in self._spilling
+        if stale:
+            # Reloaded or removed while being written: memory is authoritative, the file is stale
+            self._remove_spill(path)
+
+    def _remove_spill(self, path: Path) -> None:
+        """Spill writer thread: delete one spill file."""
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self._on_disk.pop(path.name, None)
+
+    def _read_spilled(self, session_id: str) -> Any:
+        """Read a spilled session without taking the lock; None when there is none."""
+        path = self._spill_path(session_id)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            stored_id, state = pickle.loads(zlib.decompress(data))
+            if stored_id != session_id:
+                raise ValueError(f"spill file holds session {stored_id!r}")
+            return state
+        except Exception:
+            with self._lock:
+                self._counters["spill_errors"] += 1
+            logger.exception(f"❌ Failed to reload spilled session {session_id}")
+            return None
+
+    def _scan_spilled(self) -> None:
+        if not self.spill_dir or not self.spill_dir.exists():
+            return
+        found = {}
+        for path in self.spill_dir.glob("*.session"):
+            try:
+                found[path.name] = path.stat().st_size
+            except OSError:
+                pass
+        with self._lock:
+            self._on_disk.update(found)
+
+    def _purge_spilled(self) -> None:
+        if not self.spill_dir or not self.spill_dir.exists():
+            return
+        cutoff = time.time() - self.spill_ttl
+        for path in self.spill_dir.glob("*.session"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    with self._lock:
+                        self._on_disk.pop(path.name, None)
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------ stats
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            if self.spill_dir:
+                self._start_writer()
+            lookups = self._counters["hits"] + self._counters["misses"] + self._counters["spill_hits"]
+            return {
+                "entries": len(self._entries),
+                "spilling": len(self._spilling),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl,
+                "spill_dir": str(self.spill_dir) if self.spill_dir else None,
+                "spilled_sessions": len(self._on_disk),
+                "spilled_bytes": sum(self._on_disk.values()),
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                **self._counters,
+                "largest_sessions": self.session_sizes()[:top] if top else [],
+            }
+
+    def session_sizes(self) -> List[Dict[str, Any]]:
+        """Per-session size estimates for in-memory sessions, largest first."""
+        now = time.monotonic()
+        with self._lock:
+            sizes = [
+                {"session_id": sid, "bytes": size, "idle_seconds": round(now - last_access, 1)}
+                for sid, (_, size, last_access) in self._entries.items()
+            ]
+        return sorted(sizes, key=lambda s: s["bytes"], reverse=True)
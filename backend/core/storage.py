@@ -0,0 +1,279 @@
+"""
+Storage backends for the catalog, RFPs and test pricing.
+
+``get_storage()`` returns one ``Storage`` per process with three stores:
+
+- ``catalog``: ``CatalogRepository``-compatible (get/get_many/search/page/count/insert/update/delete)
+- ``rfps``: ``all``/``get``/``query(status, client, deadline_from, deadline_to)``/``put``/``delete``/``next_id``
+- ``test_pricing``: ``all``/``get``/``put``/``delete``/``replace``
+
+STORAGE_BACKEND picks the implementation:
+
+- ``json`` (default): the stores live in memory, loaded from ``data/*.json``
+  plus their write-behind change logs. Good for small deployments, but every
+  process holds a full copy.
+- ``sqlite``: the stores are indexed tables in one SQLite database
+  (STORAGE_SQLITE_PATH, default ``data/rfp_data.sqlite``) shared by every
+  process. Fill it from the JSON files with ``python -m backend.import_json``.
+
+Routers and agent tools only use the store methods, so both backends serve
+the same API.
+"""
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .catalog_repository import CatalogRepository
+from .persistence import StorePersistence
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DATA_DIR = ROOT / "data"
+
+
+def rfp_deadline(rfp: Dict[str, Any]) -> Optional[str]:
+    # Tender data uses submission_deadline, RFPs created through the API submission_date
+    return rfp.get("submission_deadline") or rfp.get("submission_date") or None
+
+
+def rfp_matches(rfp: Dict[str, Any], status: Optional[str] = None, client: Optional[str] = None,
+                deadline_from: Optional[str] = None, deadline_to: Optional[str] = None) -> bool:
+    """Filter used by the in-memory RFP store; deadlines are ISO dates, bounds inclusive."""
+    if status is not None and rfp.get("status") != status:
+        return False
+    if client is not None and rfp.get("client") != client:
+        return False
+    if deadline_from is not None or deadline_to is not None:
+        deadline = rfp_deadline(rfp)
+        if deadline is None:
+            return False
+        if deadline_from is not None and deadline < deadline_from:
+            return False
+        if deadline_to is not None and deadline > deadline_to:
+            return False
+    return True
+
+
+def next_rfp_id(existing_ids: Iterable[str], year: int) -> str:
+    """Next ID in the RFP-YYYY-NNNN sequence after the highest one in ``existing_ids``."""
+    max_num = 0
+    for rfp_id in existing_ids:
+        try:
+            max_num = max(max_num, int(rfp_id.split("-")[-1]))
+        except ValueError:
+            continue
+    return f"RFP-{year}-{max_num + 1:04d}"
+
+
+def _read_json(path: Path, default: Any) -> Any:
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RFPStore:
+    """In-memory RFPs keyed by ID, in insertion order; mutations are recorded to ``persistence`` when set."""
+
+    def __init__(self):
+        self._rfps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self.persistence: Optional[StorePersistence] = None
+
+    def __len__(self) -> int:
+        return len(self._rfps)
+
+    def __contains__(self, rfp_id: str) -> bool:
+        return rfp_id in self._rfps
+
+    def all(self) -> List[Dict[str, Any]]:
+        return list(self._rfps.values())
+
+    def get(self, rfp_id: str) -> Optional[Dict[str, Any]]:
+        return self._rfps.get(rfp_id)
+
+    def query(self, status: Optional[str] = None, client: Optional[str] = None,
+              deadline_from: Optional[str] = None, deadline_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """RFPs matching every given filter, ordered by deadline (RFPs without one last)."""
+        matches = [r for r in self._rfps.values() if rfp_matches(r, status, client, deadline_from, deadline_to)]
+        return sorted(matches, key=lambda r: (rfp_deadline(r) is None, rfp_deadline(r) or ""))
+
+    def next_id(self, year: int) -> str:
+        prefix = f"RFP-{year}-"
+        return next_rfp_id((i for i in self._rfps if i.startswith(prefix)), year)
+
+    def put(self, rfp: Dict[str, Any]) -> None:
+        """Insert or replace ``rfp`` under its ``id``; a replaced RFP keeps its position."""
+        with self._lock:
+            self._rfps[rfp["id"]] = rfp
+            self.version += 1
+            if self.persistence is not None:
+                self.persistence.record("put", rfp["id"], rfp)
+
+    def delete(self, rfp_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rfp = self._rfps.pop(rfp_id, None)
+            if rfp is not None:
+                self.version += 1
+                if self.persistence is not None:
+                    self.persistence.record("delete", rfp_id)
+            return rfp
+
+    def apply_change(self, op: str, key: Any, value: Any) -> None:
+        if op == "put":
+            self.put(value)
+        elif op == "delete":
+            self.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rfps": len(self._rfps), "version": self.version}
+
+
+class TestPricingStore:
+    """In-memory test name -> {price, duration_days}; mutations are recorded to ``persistence`` when set."""
+
+    def __init__(self):
+        self._tests: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self.persistence: Optional[StorePersistence] = None
+
+    def __len__(self) -> int:
+        return len(self._tests)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tests
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._tests)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._tests.get(name)
+
+    def put(self, name: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._tests[name] = entry
+            self.version += 1
+            if self.persistence is not None:
+                self.persistence.record("put", name, entry)
+
+    def delete(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._tests.pop(name, None)
+            if entry is not None:
+                self.version += 1
+                if self.persistence is not None:
+                    self.persistence.record("delete", name)
+            return entry
+
+    def replace(self, tests: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._tests = dict(tests)
+            self.version += 1
+            if self.persistence is not None:
+                self.persistence.record("replace", value=dict(tests))
+
+    def apply_change(self, op: str, key: Any, value: Any) -> None:
+        if op == "put":
+            self.put(key, value)
+        elif op == "delete":
+            self.delete(key)
+        elif op == "replace":
+            self.replace(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tests": len(self._tests), "version": self.version}
+
+
+class JsonStorage:
+    """
+    The three stores in memory, loaded from ``<data_dir>/{catalog,rfps,test_pricing}.json``
+    and their change logs, with write-behind persistence back to those files.
+    """
+
+    backend = "json"
+
+    def __init__(self, data_dir: Path = DEFAULT_DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self.catalog = CatalogRepository.from_env()
+        self.rfps = RFPStore()
+        self.test_pricing = TestPricingStore()
+        self.persistence: Dict[str, StorePersistence] = {}
+
+    def load(self) -> "JsonStorage":
+        """Load the snapshots, replay changes logged since, then start recording mutations."""
+        snapshots: Dict[str, Callable[[], Any]] = {
+            "catalog": lambda: list(self.catalog),
+            "rfps": self.rfps.all,
+            "test_pricing": self.test_pricing.all,
+        }
+        self.catalog.extend(_read_json(self.data_dir / "catalog.json", []))
+        for rfp in _read_json(self.data_dir / "rfps.json", []):
+            self.rfps.put(rfp)
+        self.test_pricing.replace(_read_json(self.data_dir / "test_pricing.json", {}))
+        for name, snapshot in snapshots.items():
+            store = getattr(self, name)
+            persistence = StorePersistence.from_env(name, self.data_dir / f"{name}.json", snapshot)
+            persistence.replay(store.apply_change)
+            store.persistence = persistence
+            self.persistence[name] = persistence
+        logger.info(f"📦 JSON storage loaded from {self.data_dir}: {len(self.catalog)} products, "
+                    f"{len(self.rfps)} RFPs, {len(self.test_pricing)} test prices")
+        return self
+
+    async def start(self) -> None:
+        for persistence in self.persistence.values():
+            await persistence.start()
+
+    async def stop(self) -> None:
+        for persistence in self.persistence.values():
+            await persistence.stop()
+
+    async def checkpoint(self, name: str) -> None:
+        """Snapshot store ``name`` now, e.g. after a bulk load applied with ``record=False``."""
+        await self.persistence[name].compact()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "data_dir": str(self.data_dir),
+            "catalog": self.catalog.stats(),
+            "rfps": self.rfps.stats(),
+            "test_pricing": self.test_pricing.stats(),
+            "persistence": {name: p.stats() for name, p in self.persistence.items()},
+        }
+
+
+def open_storage(backend: Optional[str] = None, data_dir: Optional[Path] = None,
+                 sqlite_path: Optional[Path] = None):
+    """Open a storage backend (``json`` or ``sqlite``, default STORAGE_BACKEND)."""
+    backend = (backend or os.getenv("STORAGE_BACKEND", "json")).lower()
+    data_dir = Path(data_dir or os.getenv("STORAGE_DATA_DIR", DEFAULT_DATA_DIR))
+    if backend == "sqlite":
+        from .sqlite_storage import SQLiteStorage
+
+        path = Path(sqlite_path or os.getenv("STORAGE_SQLITE_PATH", data_dir / "rfp_data.sqlite"))
+        return SQLiteStorage(path)
+    if backend != "json":
+        raise ValueError(f"Unknown STORAGE_BACKEND {backend!r} (expected 'json' or 'sqlite')")
+    return JsonStorage(data_dir).load()
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Process-wide storage, opened on first use."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = open_storage()
+                logger.info(f"🗄️ Storage backend: {_storage.backend}")
+    return _storage
@@ -0,0 +1,50 @@
+"""
+Import the JSON data files into the SQLite storage backend.
+
+Reads ``catalog.json``, ``rfps.json`` and ``test_pricing.json`` from the data
+directory (plus any write-behind changes still in their ``.log`` files) and
+copies them into the SQLite database used with STORAGE_BACKEND=sqlite:
+
+    python -m backend.import_json
+    python -m backend.import_json --data-dir data --db data/rfp_data.sqlite --replace
+
+Without ``--replace`` products already in the database are kept, and RFPs and
+test prices with the same key are overwritten. The JSON files are not changed.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def main():
+    from backend.core.storage import DEFAULT_DATA_DIR, JsonStorage
+    from backend.core.sqlite_storage import SQLiteStorage
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=Path(os.getenv("STORAGE_DATA_DIR", DEFAULT_DATA_DIR)),
+                        help="Directory holding the JSON files")
+    parser.add_argument("--db", type=Path, default=None,
+                        help="SQLite database (default STORAGE_SQLITE_PATH or <data-dir>/rfp_data.sqlite)")
+    parser.add_argument("--replace", action="store_true", help="Empty the tables before importing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+    db_path = args.db or Path(os.getenv("STORAGE_SQLITE_PATH", args.data_dir / "rfp_data.sqlite"))
+    source = JsonStorage(args.data_dir).load()
+    target = SQLiteStorage(db_path)
+    counts = target.import_from(source, replace=args.replace)
+    stats = target.stats()
+    target.db.close()
+    print(f"Imported {counts['products']} new products, {counts['rfps']} RFPs and "
+          f"{counts['test_pricing']} test prices into {db_path}")
+    print(f"Database now holds {stats['catalog']['products']} products, {stats['rfps']['rfps']} RFPs and "
+          f"{stats['test_pricing']['tests']} test prices ({stats['bytes'] / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,22 @@ Provides REST APIs for:
 - Dashboard Data
 """
 
+import os
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.loader import load_initial_data
-from .api import catalog, test_pricing, rfps, chat, reports, misc
+from .core.config import job_queue
+from .core.report_store import get_report_store
+from .core.storage import get_storage
+from .api import catalog, test_pricing, rfps, chat, reports, misc, admin, jobs, metrics
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,8 +47,19 @@ app.include_router(rfps.router)
 app.include_router(chat.router)
 app.include_router(reports.router)
 app.include_router(misc.router)
+app.include_router(admin.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     load_initial_data()
+    await get_storage().start()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.stop()
+    await get_storage().stop()
+    get_report_store().shutdown()
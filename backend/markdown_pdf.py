@@ -0,0 +1,279 @@
+"""
+Markdown to PDF rendering for RFP reports.
+
+The agents write their analyses as lightweight markdown: headings, paragraphs,
+bullet lists and pipe tables (the catalog match tables). ``parse_blocks`` turns
+a section into a stream of blocks in a single pass, and ``render_pdf`` maps
+them onto reportlab flowables:
+
+- consecutive text lines become one ``Paragraph`` rather than one flowable per line
+- pipe tables become real ``Table`` objects, split into fixed-size chunks with
+  the header repeated, so layout cost stays linear in the number of rows and
+  no single flowable has to be re-split page after page
+- styles and regexes are built once per process
+- flowables are generated as the document consumes them, so memory stays flat
+  for reports hundreds of pages long
+"""
+import os
+import re
+import logging
+import textwrap
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows per Table flowable; a chunk is laid out (and split across pages) on its own
+TABLE_CHUNK_ROWS = int(os.getenv("PDF_TABLE_CHUNK_ROWS", "60"))
+# Longest cell text (chars) kept in a table; longer cells are cut with an ellipsis
+MAX_CELL_CHARS = 300
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$")
+_HR = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)")
+_CODE = re.compile(r"`([^`]+)`")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_LINE = re.compile(r"^.*$", re.MULTILINE)
+
+
+# Blocks: ("heading", level, text) | ("paragraph", [lines]) | ("bullets", [items])
+#         ("table", header_cells, [row_cells]) | ("rule",)
+Block = Tuple
+
+
+def _split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def parse_blocks(text: str) -> Iterator[Block]:
+    """Single pass over ``text``; yields blocks as soon as each one is complete."""
+    paragraph: List[str] = []
+    bullets: List[str] = []
+    table: List[List[str]] = []
+
+    def flush():
+        if paragraph:
+            yield ("paragraph", paragraph[:])
+            paragraph.clear()
+        if bullets:
+            yield ("bullets", bullets[:])
+            bullets.clear()
+        if table:
+            header, *rows = table
+            yield ("table", header, rows)
+            table.clear()
+
+    # Lines are sliced off one at a time instead of materialising splitlines() for the whole section
+    for match in _LINE.finditer(text):
+        line = match.group().rstrip()
+        stripped = line.strip()
+
+        if stripped.startswith("|") and stripped.count("|") >= 2:
+            if not table:
+                yield from flush()
+            if not _TABLE_SEPARATOR.match(stripped):
+                table.append(_split_row(stripped))
+            continue
+        if table:
+            yield from flush()
+
+        if not stripped:
+            yield from flush()
+            continue
+        heading = _HEADING.match(stripped)
+        if heading:
+            yield from flush()
+            yield ("heading", len(heading.group(1)), heading.group(2))
+            continue
+        if _HR.match(stripped):
+            yield from flush()
+            yield ("rule",)
+            continue
+        bullet = _BULLET.match(line)
+        if bullet:
+            if paragraph:
+                yield from flush()
+            bullets.append(bullet.group(1))
+            continue
+        if bullets:
+            yield from flush()
+        paragraph.append(stripped)
+
+    yield from flush()
+
+
+def inline_markup(text: str) -> str:
+    """Markdown emphasis/code/links to reportlab paragraph markup, with XML escaped first."""
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    text = _LINK.sub(r"\1", text)
+    text = _BOLD.sub(r"<b>\1</b>", text)
+    text = _ITALIC.sub(r"<i>\1</i>", text)
+    return _CODE.sub(r'<font face="Courier">\1</font>', text)
+
+
+def plain_text(text: str) -> str:
+    text = _LINK.sub(r"\1", text)
+    text = _BOLD.sub(r"\1", text)
+    text = _ITALIC.sub(r"\1", text)
+    return _CODE.sub(r"\1", text)
+
+
+@lru_cache(maxsize=1)
+def _styles():
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    base = getSampleStyleSheet()
+    body = ParagraphStyle(
+        "ReportBody", parent=base["BodyText"], fontSize=9, leading=12,
+        textColor=colors.HexColor("#333333"), spaceAfter=6, fontName="Helvetica",
+    )
+    return {
+        "title": ParagraphStyle(
+            "ReportTitle", parent=base["Heading1"], fontSize=18, textColor=colors.HexColor("#1a1a1a"),
+            spaceAfter=30, alignment=TA_CENTER, fontName="Helvetica-Bold",
+        ),
+        "section": ParagraphStyle(
+            "ReportSection", parent=base["Heading2"], fontSize=14, textColor=colors.HexColor("#2c3e50"),
+            spaceAfter=12, spaceBefore=20, fontName="Helvetica-Bold",
+        ),
+        "heading": ParagraphStyle(
+            "ReportHeading", parent=base["Heading3"], fontSize=11, textColor=colors.HexColor("#2c3e50"),
+            spaceAfter=6, spaceBefore=10, fontName="Helvetica-Bold",
+        ),
+        "body": body,
+        "bullet": ParagraphStyle("ReportBullet", parent=body, leftIndent=12, bulletIndent=2, spaceAfter=2),
+        "table": TableStyle([
+            ("FONT", (0, 0), (-1, -1), "Helvetica", 7.5, 9),
+            ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 7.5, 9),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8edf2")),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#b0b8c0")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ]),
+    }
+
+
+def _column_widths(header: Sequence[str], rows: Sequence[Sequence[str]], available: float) -> List[float]:
+    """Share the frame width by (capped) content length; sampled so huge tables stay cheap."""
+    sample = rows[:200]
+    weights = []
+    for i, head in enumerate(header):
+        longest = max([len(head)] + [len(r[i]) for r in sample if i < len(r)])
+        weights.append(min(max(longest, 3), 60))
+    total = sum(weights)
+    return [available * w / total for w in weights]
+
+
+def _table_flowables(header: List[str], rows: List[List[str]], available: float) -> Iterator:
+    from reportlab.platypus import Spacer, Table
+
+    styles = _styles()
+    columns = len(header)
+    header = [plain_text(h) for h in header]
+    rows = [(r + [""] * columns)[:columns] for r in rows]
+    widths = _column_widths(header, rows, available)
+    # Roughly how many characters fit on one line of each column at the cell font size
+    capacity = [max(int(w / 3.9), 1) for w in widths]
+
+    def cell(text: str, col: int) -> str:
+        text = plain_text(text)
+        if len(text) > MAX_CELL_CHARS:
+            text = text[:MAX_CELL_CHARS - 1] + "…"
+        # Pre-wrapped plain strings: several times cheaper to lay out than a Paragraph per cell
+        if len(text) > capacity[col]:
+            return "\n".join(textwrap.wrap(text, capacity[col], break_long_words=True))
+        return text
+
+    for start in range(0, max(len(rows), 1), TABLE_CHUNK_ROWS):
+        chunk = [[cell(v, i) for i, v in enumerate(r)] for r in rows[start:start + TABLE_CHUNK_ROWS]]
+        table = Table([header] + chunk, colWidths=widths, repeatRows=1, style=styles["table"])
+        yield table
+    yield Spacer(1, 6)
+
+
+def section_flowables(text: str, available: float) -> Iterator:
+    """Flowables for one markdown section body."""
+    from reportlab.platypus import HRFlowable, Paragraph
+
+    styles = _styles()
+    for block in parse_blocks(text):
+        kind = block[0]
+        if kind == "heading":
+            yield Paragraph(inline_markup(block[2]), styles["heading"])
+        elif kind == "paragraph":
+            yield Paragraph("<br/>".join(inline_markup(line) for line in block[1]), styles["body"])
+        elif kind == "bullets":
+            for item in block[1]:
+                yield Paragraph(inline_markup(item), styles["bullet"], bulletText="•")
+        elif kind == "table":
+            yield from _table_flowables(block[1], block[2], available)
+        elif kind == "rule":
+            yield HRFlowable(width="100%", thickness=0.5, color="#b0b8c0", spaceBefore=4, spaceAfter=4)
+
+
+class _LazyStory(list):
+    """
+    Story list that pulls flowables from a generator as reportlab consumes them.
+
+    ``doc.build`` only looks at the front of the list and deletes flowables once
+    they are drawn, so keeping a small buffer filled is enough; peak memory no
+    longer grows with the length of the report.
+    """
+
+    def __init__(self, source: Iterable, buffer: int = 64):
+        super().__init__()
+        self._source = iter(source)
+        self._buffer = buffer
+        self._fill()
+
+    def _fill(self) -> None:
+        while self._source is not None and len(self) < self._buffer:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self._fill()
+
+
+def render_pdf(output_path: str, title: str, sections: Iterable[Tuple[str, str]]) -> None:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    doc = SimpleDocTemplate(
+        output_path, pagesize=letter,
+        rightMargin=inch, leftMargin=inch, topMargin=inch, bottomMargin=inch,
+        title=title,
+        # No timestamp or random document ID, so the same sections always give the
+        # same bytes and the content-hash ETag stays a valid strong validator
+        invariant=1,
+    )
+    styles = _styles()
+
+    def story():
+        yield Paragraph(inline_markup(title), styles["title"])
+        yield Spacer(1, 0.3 * inch)
+        for heading, body in sections:
+            yield Paragraph(inline_markup(heading), styles["section"])
+            if body:
+                yield from section_flowables(body, doc.width)
+            yield Spacer(1, 0.2 * inch)
+
+    doc.build(_LazyStory(story()))
+    logger.info(f"📄 PDF report generated: {output_path}")
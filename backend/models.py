@@ -1,7 +1,7 @@
 # ============================================================
 # DATA MODELS (Pydantic)
 # ============================================================
-from pydantic import BaseModel
+from pydantic import BaseModel, HttpUrl
 from typing import List, Optional, Dict, Any
 
 class OEMProduct(BaseModel):
@@ -16,12 +16,17 @@ class OEMProduct(BaseModel):
 class ChatMessage(BaseModel):
     message: str
     session_id: Optional[str] = "default"
+    async_mode: Optional[bool] = False
+    webhook_url: Optional[HttpUrl] = None
+    no_cache: Optional[bool] = False
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
     timestamp: str
     workflow_state: Optional[Dict] = None
+    job_id: Optional[str] = None
+    trace_id: Optional[str] = None
 
 class RFPScanRequest(BaseModel):
     keywords: List[str]
@@ -0,0 +1,122 @@
+"""
+Catalog mutation benchmark: the previous list-scan catalog vs. the indexed
+``CatalogRepository`` behind /api/catalog.
+
+Loads ``--skus`` synthetic products, then times ``--ops`` lookups, updates,
+deletes and inserts against each, plus a deep page and a category page.
+Persistence (``save_catalog``) is left out so only the in-memory structure is
+measured:
+
+    python -m benchmarks.catalog_ops --skus 100000 --ops 2000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CATEGORIES = ["Power Cables", "Control Cables", "Instrumentation Cables", "Fibre Optic", "Accessories"]
+
+
+def synthetic_products(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "sku": f"SKU-{i:07d}",
+            "product_name": f"Cable {i}",
+            "specifications": {"cores": rng.choice([2, 3, 4, 12, 24]), "size_sqmm": rng.choice([1.5, 2.5, 16, 240])},
+            "price_per_km": rng.randint(50_000, 900_000),
+            "category": rng.choice(CATEGORIES),
+        }
+        for i in range(count)
+    ]
+
+
+class ListCatalog:
+    """The route logic before the repository: a plain list and linear scans."""
+
+    def __init__(self, products):
+        self.items = list(products)
+
+    def get(self, sku):
+        return next((p for p in self.items if p["sku"] == sku), None)
+
+    def insert(self, product):
+        if any(p["sku"] == product["sku"] for p in self.items):
+            return False
+        self.items.append(product)
+        return True
+
+    def update(self, sku, product):
+        for i, p in enumerate(self.items):
+            if p["sku"] == sku:
+                self.items[i] = product
+                return p
+        return None
+
+    def delete(self, sku):
+        for i, p in enumerate(self.items):
+            if p["sku"] == sku:
+                return self.items.pop(i)
+        return None
+
+    def page(self, offset, limit, category=None):
+        filtered = self.items
+        if category:
+            filtered = [p for p in self.items if p.get("category", "").lower() == category.lower()]
+        return filtered[offset:offset + limit], len(filtered)
+
+
+def run(catalog, products: list, ops: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    skus = [p["sku"] for p in products]
+    timings = {}
+
+    def timed(name, fn, count):
+        start = time.perf_counter()
+        fn()
+        timings[name] = (time.perf_counter() - start) * 1e6 / count
+
+    targets = rng.sample(skus, ops)
+    timed("get", lambda: [catalog.get(s) for s in targets], ops)
+    timed("update", lambda: [catalog.update(s, {**catalog.get(s), "price_per_km": 1}) for s in targets], ops)
+    doomed = rng.sample(skus, ops)
+    timed("delete", lambda: [catalog.delete(s) for s in doomed], ops)
+    fresh = [{**products[0], "sku": f"NEW-{i:07d}"} for i in range(ops)]
+    timed("insert", lambda: [catalog.insert(p) for p in fresh], ops)
+    deep = len(products) // 2
+    timed("page (deep)", lambda: [catalog.page(deep, 20) for _ in range(20)], 20)
+    timed("page (category)", lambda: [catalog.page(1000, 20, category="fibre optic") for _ in range(20)], 20)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from backend.core.catalog_repository import CatalogRepository
+
+    products = synthetic_products(args.skus, args.seed)
+    repo = CatalogRepository()
+    start = time.perf_counter()
+    repo.extend(dict(p) for p in products)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    before = run(ListCatalog(dict(p) for p in products), products, args.ops, args.seed)
+    after = run(repo, products, args.ops, args.seed)
+
+    print(f"{args.skus:,} SKUs, {args.ops:,} ops each (repository load {load_ms:.0f}ms)")
+    print(f"{'operation':<18} {'list µs/op':>12} {'repo µs/op':>12} {'speedup':>9}")
+    for name in before:
+        print(f"{name:<18} {before[name]:>12.1f} {after[name]:>12.1f} {before[name] / after[name]:>8.1f}x")
+    print(repo.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Concurrent chat load test against a running backend.
+
+Opens N chat sessions at once (scan → select) and keeps polling /health while
+they run, so a blocked event loop shows up as /health latency spikes.
+
+    uvicorn backend.main:app --port 8000
+    python -m benchmarks.chat_load --sessions 50 --base-url http://localhost:8000
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, payload: dict = None, timeout: float = 300) -> float:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def run_session(base_url: str, idx: int, messages: list) -> float:
+    session_id = f"load_{idx}_{int(time.time())}"
+    total = 0.0
+    for message in messages:
+        total += _request(f"{base_url}/api/chat", {"message": message, "session_id": session_id})
+    return total
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", nargs="+", default=["Scan for cable RFPs", "Analyze 1"])
+    args = parser.parse_args()
+
+    health_latencies = []
+    done = threading.Event()
+
+    def poll_health():
+        while not done.is_set():
+            health_latencies.append(_request(f"{args.base_url}/health", timeout=30))
+            time.sleep(0.05)
+
+    poller = threading.Thread(target=poll_health, daemon=True)
+    poller.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        session_times = list(pool.map(lambda i: run_session(args.base_url, i, args.messages), range(args.sessions)))
+    wall = time.perf_counter() - start
+    done.set()
+    poller.join()
+
+    print(f"Sessions: {args.sessions} x {len(args.messages)} turns in {wall:.2f}s")
+    print(f"Session time  p50={percentile(session_times, 50):.2f}s  p95={percentile(session_times, 95):.2f}s  "
+          f"max={max(session_times):.2f}s  mean={statistics.mean(session_times):.2f}s")
+    print(f"/health ({len(health_latencies)} polls)  p50={percentile(health_latencies, 50) * 1000:.1f}ms  "
+          f"p95={percentile(health_latencies, 95) * 1000:.1f}ms  max={max(health_latencies) * 1000:.1f}ms")
+    # If sessions serialized, wall time would approach the sum of session times
+    print(f"Concurrency factor: {sum(session_times) / wall:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
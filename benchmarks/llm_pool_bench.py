@@ -0,0 +1,96 @@
+"""
+LLM endpoint pool benchmark against two local stand-in servers.
+
+Starts a fast endpoint and a slower endpoint with a heavy tail (see
+``benchmarks.stub_llm_server``), then sends the same sequence of calls through
+single-endpoint, EWMA-routed and routed+hedged pools and prints the latency
+distribution of each:
+
+    python -m benchmarks.llm_pool_bench --calls 200 --concurrency 8
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.stub_llm_server import serve
+from benchmarks.workflow_replay import distribution
+
+
+async def run_calls(llm, calls: int, concurrency: int) -> list:
+    from langchain_core.messages import HumanMessage
+
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            start = time.perf_counter()
+            await llm.ainvoke([HumanMessage(content=f"benchmark prompt {i}")])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies
+
+
+async def run_scenarios(scenarios: list, args) -> None:
+    from agents.llm_pool import create_pooled_llm
+
+    for label, configs, hedge in scenarios:
+        os.environ["LLM_HEDGE"] = hedge
+        pool = create_pooled_llm(configs)
+        d = distribution(await run_calls(pool, args.calls, args.concurrency))
+        stats = pool.stats()
+        split = " ".join(f"{e['name']}={e['calls']}" for e in stats["endpoints"])
+        print(f"{label:<32} {d['p50_ms']:>9} {d['p95_ms']:>9} {d['p99_ms']:>9} {d['max_ms']:>9}  "
+              f"{stats['hedges_sent']:>6}  ({split})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fast-ms", type=float, default=150, help="Latency of the fast endpoint")
+    parser.add_argument("--slow-ms", type=float, default=300, help="Latency of the slow endpoint")
+    parser.add_argument("--tail-fraction", type=float, default=0.03, help="Share of very slow responses on both")
+    parser.add_argument("--tail-ms", type=float, default=2000)
+    parser.add_argument("--port", type=int, default=9101)
+    args = parser.parse_args()
+
+    # Cache and scheduler stay out of this comparison
+    os.environ["LLM_CACHE"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    import logging
+    logging.basicConfig(level=os.environ["LOG_LEVEL"])
+
+    stubs = []
+    for i, latency in enumerate((args.fast_ms, args.slow_ms)):
+        stub_args = SimpleNamespace(host="127.0.0.1", port=args.port + i, latency_ms=latency, jitter_ms=latency * 0.2,
+                                    slow_fraction=args.tail_fraction, slow_ms=args.tail_ms, seed=i, verbose=False)
+        stubs.append(serve(stub_args, name=f"stub{i}"))
+    endpoints = [{"name": f"stub{i}", "base_url": f"http://127.0.0.1:{args.port + i}/v1",
+                  "model": "stub", "api_key": "stub"} for i in range(2)]
+
+    scenarios = [
+        ("single (fast endpoint only)", endpoints[:1], "0"),
+        ("pool, EWMA routing", endpoints, "0"),
+        ("pool, EWMA routing + hedging", endpoints, "1"),
+    ]
+    print(f"{args.calls} calls at concurrency {args.concurrency}; endpoints {args.fast_ms}/{args.slow_ms}ms, "
+          f"{args.tail_fraction:.0%} tail at {args.tail_ms}ms")
+    print(f"{'scenario':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  hedges")
+    # One event loop for every scenario: the OpenAI client shares its HTTP pool per loop
+    asyncio.run(run_scenarios(scenarios, args))
+
+    for stub in stubs:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Report PDF render benchmark.
+
+Builds a synthetic report shaped like the agents' output (a catalog match table
+per requirement plus a bill-of-materials table with one row per line item) and
+times rendering it with the markdown renderer, optionally against the previous
+line-by-line ``Preformatted`` renderer:
+
+    python -m benchmarks.pdf_render --lines 1000
+    python -m benchmarks.pdf_render --lines 1000 --legacy
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def synthetic_sections(lines: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    technical = ["# Technical Analysis for RFP: RFP-BENCH", "", "**Project:** Synthetic tender", "",
+                 "## Product Matching Results", ""]
+    bom = ["| # | SKU | Requirement | Qty (m) | Unit ₹/m | Extended ₹ |", "|---|-----|-------------|---------|----------|------------|"]
+    for i in range(lines):
+        cores, size = rng.choice([3, 4, 12, 24]), rng.choice([1.5, 16, 120, 240])
+        requirement = f"{cores} core {size} sqmm XLPE armoured copper cable, feeder {i + 1}"
+        qty, price = rng.choice([250, 1000, 5000]), rng.randint(150, 1500)
+        technical += [
+            f"### Requirement: {requirement} (Qty: {qty} m)", "",
+            "| Rank | SKU | Product Name | Spec Match | Price/m | Match Details |",
+            "|------|-----|--------------|------------|---------|---------------|",
+        ]
+        for rank in range(1, 4):
+            technical.append(f"| {rank} | PWR-XLPE-{cores}C{size}-{rank} | XLPE Power Cable {cores}C x {size} sqmm | "
+                             f"{100 - rank * 12}% | ₹{price} | Voltage ok, Insulation ok, Cores ok, Size ok, Armour check |")
+        technical.append("")
+        bom.append(f"| {i + 1} | PWR-XLPE-{cores}C{size} | {requirement} | {qty:,} | {price:,} | {qty * price:,} |")
+    pricing = "\n".join(["## Pricing Summary", "", "**Bill of materials**", ""] + bom + [
+        "", "- Overhead (5%) and contingency (3%) applied to the subtotal",
+        "- Prices valid for 30 days", "", "**Next steps:** confirm quantities.",
+    ])
+    summary = "The RFP is technically covered by catalog products. **Recommendation:** proceed."
+    return [("Executive Summary", summary), ("Technical Analysis", "\n".join(technical)), ("Pricing Summary", pricing)]
+
+
+def legacy_render(output_path: str, title: str, sections: list) -> None:
+    """The renderer this replaced: one Preformatted flowable per markdown line."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
+
+    doc = SimpleDocTemplate(output_path, pagesize=letter, rightMargin=inch, leftMargin=inch,
+                            topMargin=inch, bottomMargin=inch)
+    styles = getSampleStyleSheet()
+    body_style = ParagraphStyle("CustomBody", parent=styles["BodyText"], fontSize=9, leading=12, fontName="Helvetica")
+    story = [Paragraph(title, styles["Heading1"]), Spacer(1, 0.3 * inch)]
+    for heading, body in sections:
+        story.append(Paragraph(heading, styles["Heading2"]))
+        text = re.sub(r"\*\*(.+?)\*\*", r"\1", body)
+        text = re.sub(r"#+\s+", "", text)
+        text = re.sub(r"[|]", " | ", text)
+        for line in text.split("\n"):
+            if line.strip():
+                safe = line.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                story.append(Preformatted(safe, body_style, maxLineLength=80))
+    doc.build(story)
+
+
+def measure(render, sections: list) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="rfp-pdf-bench-"), "report.pdf")
+    # Time and memory in separate passes: tracemalloc slows allocation-heavy code several-fold
+    start = time.perf_counter()
+    render(path, "RFP Response Report - RFP-BENCH", sections)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    render(path, "RFP Response Report - RFP-BENCH", sections)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with open(path, "rb") as f:
+        data = f.read()
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "pages": len(re.findall(rb"/Type /Page\b", data)),
+        "size_kb": round(len(data) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1000, help="Requirements / BOM line items")
+    parser.add_argument("--legacy", action="store_true", help="Also time the previous per-line renderer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from backend.markdown_pdf import render_pdf
+
+    sections = synthetic_sections(args.lines, args.seed)
+    chars = sum(len(body) for _, body in sections)
+    print(f"{args.lines} line items, {chars / 1024:.0f} KB of markdown")
+    print(f"{'renderer':<12} {'seconds':>9} {'peak MB':>9} {'pages':>7} {'size KB':>9}")
+    runs = [("markdown", render_pdf)] + ([("legacy", legacy_render)] if args.legacy else [])
+    for label, render in runs:
+        r = measure(render, sections)
+        print(f"{label:<12} {r['seconds']:>9} {r['peak_mb']:>9} {r['pages']:>7} {r['size_kb']:>9}")
+
+
+if __name__ == "__main__":
+    main()
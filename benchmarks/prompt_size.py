@@ -0,0 +1,140 @@
+"""
+Pricing prompt size benchmark: pretty-printed JSON line items vs. the budgeted
+per-SKU table built by ``agents.prompts.PromptBuilder``.
+
+Builds a synthetic RFP with ``--lines`` line items drawn from the OEM catalog
+and prints the token count of both prompts. With ``--base-url`` it also sends
+each prompt ``--repeat`` times to an OpenAI-compatible endpoint and reports
+the LLM latency (prompt processing time grows with prompt length):
+
+    python -m benchmarks.prompt_size --lines 500
+    python -m benchmarks.prompt_size --lines 500 --base-url https://api.cerebras.ai/v1 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "agents"))
+
+
+def synthetic_line_items(lines: int, seed: int) -> list:
+    from pricing_agent.tools import calculate_material_cost
+    from backend.core.storage import get_storage
+
+    products = list(get_storage().catalog)
+    rng = random.Random(seed)
+    items = []
+    for i in range(lines):
+        product = rng.choice(products)
+        qty = rng.choice([250, 500, 1000, 2500, 5000, 12000])
+        items.append({
+            "sku": product["sku"],
+            "quantity": qty,
+            "requirement": f"Line {i + 1}: {product.get('name', product['sku'])} for feeder section {rng.randint(1, 80)}",
+            "cost": calculate_material_cost(product["sku"], qty),
+        })
+    return items
+
+
+def pretty_json_prompt(items: list) -> str:
+    """The prompt shape pricing_agent_node used before the prompt builder."""
+    products = [{k: v for k, v in item.items() if k != "cost"} for item in items]
+    material = sum(item["cost"] for item in items)
+    return f"""
+Selected RFP: RFP-BENCH - Synthetic {len(items)}-line tender
+Value: ₹N/A
+
+Recommended Products (from Technical Agent):
+{json.dumps(products, indent=2, default=str)}
+
+Pricing Breakdown:
+- Material Cost: ₹{material:,.2f}
+
+Provide a concise pricing summary with key assumptions and next steps.
+"""
+
+
+def compact_prompt(items: list):
+    from agents.prompts import PromptBuilder
+    from pricing_agent.node import aggregate_line_items, summarize_line_items
+
+    material = sum(item["cost"] for item in items)
+    prompt = PromptBuilder("pricing_agent")
+    prompt.add(f"Selected RFP: RFP-BENCH - Synthetic {len(items)}-line tender\nValue: ₹N/A")
+    prompt.add_table(
+        f"Recommended Products (from Technical Agent; {len(items)} line items, largest first):",
+        ["SKU", "Qty (m)", "Lines", "Avg ₹/m", "Extended ₹", "Requirement"],
+        aggregate_line_items(items),
+        summarize_tail=summarize_line_items,
+    )
+    prompt.add(f"Pricing Breakdown:\n- Material Cost: ₹{material:,.2f}\n\n"
+               "Provide a concise pricing summary with key assumptions and next steps.")
+    return prompt
+
+
+async def time_calls(base_url: str, model: str, prompt: str, repeat: int) -> list:
+    from langchain_openai import ChatOpenAI
+    from langchain_core.messages import HumanMessage
+
+    llm = ChatOpenAI(base_url=base_url, model=model, api_key=os.getenv("CEREBRAS_API_KEY", "not-needed"),
+                     temperature=0, max_tokens=200, max_retries=0)
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        # Vary the prompt slightly so provider-side prompt caches don't hide the cost
+        await llm.ainvoke([HumanMessage(content=f"[run {i}] {prompt}")])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=int, help="Token budget (default: PROMPT_TOKEN_BUDGET[_PRICING_AGENT] or 2000)")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint to time real calls against")
+    parser.add_argument("--model", default=os.getenv("CEREBRAS_MODEL", "gpt-oss-120b"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.budget:
+        os.environ["PROMPT_TOKEN_BUDGET_PRICING_AGENT"] = str(args.budget)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import logging
+    logging.basicConfig(level=os.environ["LOG_LEVEL"])
+
+    from agents.prompts import count_tokens
+    from benchmarks.workflow_replay import distribution
+
+    items = synthetic_line_items(args.lines, args.seed)
+    old = pretty_json_prompt(items)
+    builder = compact_prompt(items)
+    start = time.perf_counter()
+    new = builder.build()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.lines} line items, {len({i['sku'] for i in items})} distinct SKUs")
+    print(f"{'prompt':<22} {'chars':>8} {'tokens':>8}")
+    print(f"{'pretty JSON':<22} {len(old):>8} {count_tokens(old):>8}")
+    print(f"{'budgeted table':<22} {len(new):>8} {count_tokens(new):>8}   "
+          f"({builder.rows_kept}/{builder.rows_total} SKU rows, built in {build_ms:.1f}ms, budget {builder.budget})")
+
+    if args.base_url:
+        async def run_both():
+            for label, prompt in (("pretty JSON", old), ("budgeted table", new)):
+                d = distribution(await time_calls(args.base_url, args.model, prompt, args.repeat))
+                print(f"{label:<22} LLM latency p50={d['p50_ms']}ms  max={d['max_ms']}ms  (n={d['count']})")
+
+        # One event loop: the OpenAI client shares its HTTP pool per loop
+        asyncio.run(run_both())
+
+
+if __name__ == "__main__":
+    main()
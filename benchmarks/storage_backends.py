@@ -0,0 +1,171 @@
+"""
+Storage backend benchmark: JSON (in memory, per process) vs. SQLite (shared,
+indexed) for the catalog, RFPs and test pricing.
+
+Writes ``--skus`` synthetic products and ``--rfps`` synthetic tenders as JSON
+files to a temp directory, imports them into SQLite with the same code path
+as ``python -m backend.import_json``, then reports for each backend the time
+and Python heap needed to open it (what every worker process pays) and the
+per-call latency of the store methods the routers and agent tools use:
+
+    python -m benchmarks.storage_backends --skus 100000 --rfps 20000 --ops 1000
+"""
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.catalog_ops import CATEGORIES
+
+VOLTAGES = ["1.1 kV", "11 kV", "450/750 V", "300/500 V"]
+INSULATIONS = ["XLPE", "PVC", "FR-LSH", "Rubber"]
+CLIENTS = [f"Utility {i}" for i in range(200)]
+STATUSES = ["pending", "in_review", "submitted", "won", "lost"]
+SPEC_FILTERS = {"voltage_grade": ["11 kV"], "insulation": ["XLPE"], "cores": (3, 4)}
+PRICE_FILTERS = {"category": ["Power Cables"], "price_per_meter": (100, 120)}
+
+
+def synthetic_catalog(count: int, rng: random.Random) -> list:
+    products = []
+    for i in range(count):
+        cores, size = rng.choice([1, 2, 3, 4, 12, 24]), rng.choice([1.5, 2.5, 16, 120, 240])
+        insulation = rng.choice(INSULATIONS)
+        products.append({
+            "sku": f"SKU-{i:07d}",
+            "name": f"{insulation} Cable {cores}C x {size} sqmm #{i}",
+            "category": rng.choice(CATEGORIES),
+            "specs": {
+                "voltage_grade": rng.choice(VOLTAGES),
+                "cores": cores,
+                "conductor_size_sqmm": size,
+                "insulation": insulation,
+                "conductor_material": rng.choice(["Copper", "Aluminium"]),
+                "standards": ["IS 7098", "IEC 60502"],
+            },
+            "base_price_per_meter": rng.randint(50, 1500),
+        })
+    return products
+
+
+def synthetic_rfps(count: int, rng: random.Random) -> list:
+    start = date(2026, 1, 1)
+    return [
+        {
+            "id": f"TOT-BENCH-{i:06d}",
+            "title": f"Supply of cables for project {i}",
+            "client": rng.choice(CLIENTS),
+            "status": rng.choice(STATUSES),
+            "submission_deadline": (start + timedelta(days=rng.randint(0, 730))).isoformat(),
+            "estimated_value": f"₹{rng.randint(1, 90)} Cr",
+            "scope_of_supply": [{"item": f"Cable item {j}", "quantity": "1000 m"} for j in range(3)],
+            "testing_requirements": ["Routine Test", "Type Test"],
+        }
+        for i in range(count)
+    ]
+
+
+def open_measured(open_fn) -> tuple:
+    """(storage, seconds to open, MB of Python heap it holds)."""
+    start = time.perf_counter()
+    storage = open_fn()
+    elapsed = time.perf_counter() - start
+    # Heap in a separate pass: tracemalloc slows allocation-heavy loading several-fold
+    tracemalloc.start()
+    other = open_fn()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del other
+    return storage, elapsed, held / 1024 / 1024
+
+
+def run(storage, skus: list, rfp_ids: list, ops: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    catalog, rfps, tests = storage.catalog, storage.rfps, storage.test_pricing
+    timings = {}
+
+    def timed(name, fn, count):
+        start = time.perf_counter()
+        fn()
+        timings[name] = (time.perf_counter() - start) * 1e6 / count
+
+    targets = rng.sample(skus, ops)
+    timed("catalog.get", lambda: [catalog.get(s) for s in targets], ops)
+    timed("catalog.get_many(3)", lambda: [catalog.get_many(targets[i:i + 3]) for i in range(0, ops, 3)], len(range(0, ops, 3)))
+    timed("catalog.search", lambda: [catalog.search(q) for q in ("aluminium", "fr-lsh", "#4242")], 3)
+    timed("catalog.page (deep)", lambda: [catalog.page(len(skus) // 2, 20) for _ in range(20)], 20)
+    timed("catalog.page (category)", lambda: [catalog.page(1000, 20, category="fibre optic") for _ in range(20)], 20)
+    middle = len(skus) // 2  # seqs follow load order in both backends
+    timed("catalog.find (deep cursor)", lambda: [catalog.find({}, after=middle, limit=20) for _ in range(20)], 20)
+    timed("catalog.find (spec filters)", lambda: [catalog.find(SPEC_FILTERS, limit=20) for _ in range(20)], 20)
+    timed("catalog.find (filters, deep)", lambda: [catalog.find(SPEC_FILTERS, after=middle, limit=20) for _ in range(20)], 20)
+    timed("catalog.find (price range)", lambda: [catalog.find(PRICE_FILTERS, after=middle, limit=20) for _ in range(20)], 20)
+    timed("catalog iterate (agent scoring)", lambda: sum(1 for _ in catalog), 1)
+    timed("catalog.update", lambda: [catalog.update(s, {**catalog.get(s), "base_price_per_meter": 1}) for s in targets[:ops // 4]], ops // 4)
+    doomed = targets[ops // 4:ops // 2]
+    timed("catalog.delete", lambda: [catalog.delete(s) for s in doomed], len(doomed))
+    fresh = [{"sku": f"NEW-{i:07d}", "name": "New cable", "category": CATEGORIES[0], "specs": {}, "base_price_per_meter": 1}
+             for i in range(ops // 4)]
+    timed("catalog.insert", lambda: [catalog.insert(p) for p in fresh], len(fresh))
+    rfp_targets = rng.sample(rfp_ids, min(ops, len(rfp_ids)))
+    timed("rfps.get", lambda: [rfps.get(r) for r in rfp_targets], len(rfp_targets))
+    timed("rfps.query (90-day window)", lambda: [rfps.query(deadline_from="2026-03-01", deadline_to="2026-05-30") for _ in range(5)], 5)
+    timed("rfps.query (status+client)", lambda: [rfps.query(status="pending", client=c) for c in CLIENTS[:20]], 20)
+    timed("test_pricing.all", lambda: [tests.all() for _ in range(100)], 100)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--rfps", type=int, default=20_000)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from backend.core.storage import JsonStorage
+    from backend.core.sqlite_storage import SQLiteStorage
+
+    rng = random.Random(args.seed)
+    products = synthetic_catalog(args.skus, rng)
+    tenders = synthetic_rfps(args.rfps, rng)
+    data_dir = Path(tempfile.mkdtemp(prefix="rfp-storage-bench-"))
+    for name, data in (("catalog", products), ("rfps", tenders),
+                       ("test_pricing", {"Routine Test": {"price": 25000, "duration_days": 3}})):
+        with open(data_dir / f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    skus, rfp_ids = [p["sku"] for p in products], [r["id"] for r in tenders]
+    del products, tenders
+
+    start = time.perf_counter()
+    SQLiteStorage(data_dir / "bench.sqlite").import_from(JsonStorage(data_dir).load())
+    import_s = time.perf_counter() - start
+
+    # SQLite first: with the JSON stores loaded, the garbage collector's full passes
+    # over their objects would be charged to whatever runs next in the process
+    gc.collect()
+    sqlite_storage, sqlite_open, sqlite_mb = open_measured(lambda: SQLiteStorage(data_dir / "bench.sqlite"))
+    db_mb = sqlite_storage.stats()["bytes"] / 1024 / 1024
+    results = {"sqlite": run(sqlite_storage, skus, rfp_ids, args.ops, args.seed)}
+    json_storage, json_open, json_mb = open_measured(lambda: JsonStorage(data_dir).load())
+    results["json"] = run(json_storage, skus, rfp_ids, args.ops, args.seed)
+
+    print(f"{args.skus:,} SKUs, {args.rfps:,} RFPs; SQLite import {import_s:.1f}s, database {db_mb:.0f} MB on disk")
+    print(f"{'open (per process)':<32} {'json':>12} {'sqlite':>12}")
+    print(f"{'  seconds':<32} {json_open:>12.2f} {sqlite_open:>12.3f}")
+    print(f"{'  Python heap MB':<32} {json_mb:>12.1f} {sqlite_mb:>12.1f}")
+    print(f"{'operation (µs/call)':<32} {'json':>12} {'sqlite':>12}")
+    for name in results["sqlite"]:
+        print(f"{name:<32} {results['json'][name]:>12.1f} {results['sqlite'][name]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Stand-in OpenAI-compatible chat completions server with injected latency.
+
+Answers POST /v1/chat/completions (plain and ``stream: true``) with canned
+text after ``--latency-ms`` plus uniform ``--jitter-ms``; a ``--slow-fraction``
+of requests take ``--slow-ms`` instead, to model a provider's tail. Used to
+exercise the LLM endpoint pool locally:
+
+    python -m benchmarks.stub_llm_server --port 9001 --latency-ms 200
+    python -m benchmarks.stub_llm_server --port 9002 --latency-ms 400 --slow-fraction 0.1 --slow-ms 3000
+    LLM_ENDPOINTS='[{"name":"a","base_url":"http://localhost:9001/v1"},
+                    {"name":"b","base_url":"http://localhost:9002/v1"}]' uvicorn backend.main:app
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(args, name: str):
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def _delay(self) -> float:
+            with lock:
+                slow = rng.random() < args.slow_fraction
+                jitter = rng.uniform(0, args.jitter_ms)
+            return (args.slow_ms if slow else args.latency_ms + jitter) / 1000
+
+        def do_POST(self):
+            try:
+                self._respond()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up, e.g. a hedged request that lost the race
+                pass
+
+        def _respond(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(self._delay())
+            prompt = str((body.get("messages") or [{}])[-1].get("content", ""))
+            content = f"[{name}] Acknowledged: {prompt[:60]}"
+            model = body.get("model", "stub")
+            created = int(time.time())
+
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for token in content.split(" "):
+                    chunk = {"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"role": "assistant", "content": token + " "},
+                                          "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                done = {"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+                self.close_connection = True
+                return
+
+            payload = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                          "total_tokens": len(prompt.split()) + len(content.split())},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def serve(args, name: str = None) -> ThreadingHTTPServer:
+    """Start a server in a daemon thread and return it (``server.shutdown()`` stops it)."""
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, name or f"stub:{args.port}"))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="Share of requests that take --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, f"stub:{args.port}"))
+    print(f"Stub LLM on http://{args.host}:{args.port}/v1  latency={args.latency_ms}ms "
+          f"jitter={args.jitter_ms}ms slow={args.slow_fraction:.0%}@{args.slow_ms}ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
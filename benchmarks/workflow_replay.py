@@ -0,0 +1,208 @@
+"""
+Offline end-to-end workflow benchmark.
+
+Replays conversation scripts (scan → select → report) against ``rfp_workflow``
+in-process at N concurrent sessions, using the fake/replay LLM provider so no
+provider is called. Reports throughput and per-node / per-span latency
+distributions, and can diff the run against a saved baseline:
+
+    python -m benchmarks.workflow_replay --sessions 20 --output bench.json
+    python -m benchmarks.workflow_replay --sessions 20 --baseline bench.json
+
+Replaying recorded responses: run the backend once with
+LLM_RECORD_PATH=recordings.jsonl against the real provider, then pass
+``--replay recordings.jsonl`` (add ``--recorded-latency`` to reproduce the
+provider's latencies instead of ``--llm-latency-ms``/``--llm-jitter-ms``).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def distribution(values: list) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.mean(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def configure_env(args) -> None:
+    """Everything that must be set before the agents package is imported."""
+    os.environ["LLM_PROVIDER"] = "replay" if args.replay else "fake"
+    os.environ["LLM_REPLAY_PATH"] = args.replay or ""
+    os.environ["LLM_FAKE_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["LLM_FAKE_JITTER_MS"] = str(args.llm_jitter_ms)
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    os.environ["LLM_REPLAY_RECORDED_LATENCY"] = "1" if args.recorded_latency else "0"
+    # Pin "today" so deadline-based qualification doesn't drift between runs
+    os.environ.setdefault("RFP_REFERENCE_DATE", args.reference_date)
+    # Identical prompts across sessions would otherwise all be cache hits
+    os.environ["LLM_CACHE"] = "1" if args.llm_cache else "0"
+    os.environ.setdefault("LLM_CACHE_PATH", str(Path(tempfile.mkdtemp(prefix="rfp-bench-")) / "llm_cache.sqlite"))
+    # ... and would share one upstream call when in flight together
+    os.environ["LLM_COALESCE"] = "1" if args.llm_coalesce else "0"
+    os.environ["CHECKPOINTER"] = args.checkpointer
+    os.environ.setdefault("CHECKPOINT_DB_PATH", str(Path(tempfile.mkdtemp(prefix="rfp-bench-")) / "checkpoints.sqlite"))
+    os.environ["TRACE_BUFFER_SIZE"] = str(max(500, args.sessions * 20))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+
+def load_script(name_or_path: str) -> dict:
+    path = Path(name_or_path)
+    if not path.exists():
+        path = SCRIPTS_DIR / f"{name_or_path}.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def run_session(run_turn, registry, session_id: str, turns: list, turn_latencies: list, spans: dict) -> None:
+    for message in turns:
+        start = time.perf_counter()
+        result = await run_turn(session_id, message)
+        turn_latencies.append((time.perf_counter() - start) * 1000)
+        for s in registry.trace(result["trace_id"]) or []:
+            spans[f"{s['kind']}:{s['name']}"].append(s["duration_ms"])
+
+
+async def run_benchmark(args, script: dict) -> dict:
+    import logging
+    logging.basicConfig(level=os.environ["LOG_LEVEL"])
+
+    from backend.api.chat import _run_turn
+    from agents.tracing import registry
+
+    # Warm-up: imports, catalog indexes and first-call costs stay out of the numbers
+    await run_session(_run_turn, registry, "bench_warmup", script["turns"], [], defaultdict(list))
+    registry.reset()
+
+    turn_latencies, spans = [], defaultdict(list)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(_run_turn, registry, f"bench_{i}", script["turns"], turn_latencies, spans)
+        for i in range(args.sessions)
+    ))
+    wall = time.perf_counter() - start
+
+    return {
+        "script": script["name"],
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "sessions": args.sessions, "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms, "seed": args.seed,
+            "replay": bool(args.replay), "checkpointer": args.checkpointer, "llm_cache": args.llm_cache,
+            "llm_coalesce": args.llm_coalesce,
+        },
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(args.sessions / wall, 2),
+        "turns_per_s": round(len(turn_latencies) / wall, 2),
+        "turn": distribution(turn_latencies),
+        "spans": {name: distribution(values) for name, values in sorted(spans.items())},
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def print_report(result: dict, baseline: dict = None, threshold: float = 10.0, min_ms: float = 1.0) -> int:
+    """
+    Print the run (and deltas vs. baseline); returns how many spans regressed by
+    more than ``threshold`` % and ``min_ms`` (so sub-millisecond noise isn't flagged).
+    """
+
+    def delta(cur, base):
+        if not base:
+            return ""
+        pct = (cur - base) / base * 100
+        flag = "  ⚠️" if pct > threshold and cur - base > min_ms else ""
+        return f"  ({pct:+.1f}%){flag}"
+
+    base_spans = (baseline or {}).get("spans", {})
+    if baseline and baseline.get("script") != result["script"]:
+        print(f"⚠️ Baseline is for script {baseline.get('script')!r}, not {result['script']!r}")
+    print(f"Script: {result['script']}  commit: {result['git_commit'] or '-'}  sessions: {result['config']['sessions']}")
+    print(f"Wall: {result['wall_s']}s  sessions/s: {result['sessions_per_s']}  turns/s: {result['turns_per_s']}"
+          + delta(1 / result["turns_per_s"], 1 / baseline["turns_per_s"] if baseline else None))
+    print(f"Turn latency  p50={result['turn']['p50_ms']}ms  p95={result['turn']['p95_ms']}ms  "
+          f"p99={result['turn']['p99_ms']}ms" + delta(result["turn"]["p95_ms"], (baseline or {}).get("turn", {}).get("p95_ms")))
+    print()
+    print(f"{'span':<50} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    regressions = 0
+    for name, d in result["spans"].items():
+        base_p95 = base_spans.get(name, {}).get("p95_ms")
+        line = delta(d["p95_ms"], base_p95)
+        regressions += "⚠️" in line
+        print(f"{name:<50} {d['count']:>6} {d['p50_ms']:>9} {d['p95_ms']:>9} {d['p99_ms']:>9}{line}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default="scan_select_report",
+                        help="Script name under benchmarks/scripts or a path to a script JSON")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="JSONL file recorded with LLM_RECORD_PATH")
+    parser.add_argument("--recorded-latency", action="store_true", help="Replay the recorded provider latencies")
+    parser.add_argument("--llm-cache", action="store_true", help="Enable the LLM response cache (off by default)")
+    parser.add_argument("--llm-coalesce", action="store_true",
+                        help="Let identical in-flight LLM calls share one upstream call (off by default)")
+    parser.add_argument("--checkpointer", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--reference-date", default="2026-01-01", help="Pinned 'today' for RFP qualification")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95 regression (%%) that gets flagged")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="Ignore p95 regressions smaller than this")
+    args = parser.parse_args()
+
+    configure_env(args)
+    script = load_script(args.script)
+    result = asyncio.run(run_benchmark(args, script))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = print_report(result, baseline, args.threshold, args.min_ms)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if baseline and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
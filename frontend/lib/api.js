@@ -98,8 +98,75 @@ export const settingsAPI = {
   updateWebUrls: (urls) => fetchAPI("/api/settings/web-urls", { method: "PUT", body: JSON.stringify({ urls }) }),
 };
 
+// Chat Endpoints
+// stream() reads the Server-Sent Events from POST /api/chat/stream and calls
+// onEvent(name, data) for each one: start, node_start, node_end, token, final, error.
+async function streamChat(message, sessionId, onEvent) {
+  const token = getAuthToken();
+  const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...(token && { Authorization: `Bearer ${token}` }),
+    },
+    body: JSON.stringify({ message, session_id: sessionId }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`API Error: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let finalEvent = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let name = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) name = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      const parsed = data ? JSON.parse(data) : {};
+      if (name === "final") finalEvent = parsed;
+      onEvent?.(name, parsed);
+    }
+  }
+  return finalEvent;
+}
+
+export const chatAPI = {
+  send: (message, sessionId) =>
+    fetchAPI("/api/chat", { method: "POST", body: JSON.stringify({ message, session_id: sessionId }) }),
+  stream: streamChat,
+  sendAsync: (message, sessionId, webhookUrl) =>
+    fetchAPI("/api/chat", {
+      method: "POST",
+      body: JSON.stringify({ message, session_id: sessionId, async_mode: true, webhook_url: webhookUrl }),
+    }),
+};
+
+// Background chat jobs (see chatAPI.sendAsync)
+export const jobsAPI = {
+  get: (jobId) => fetchAPI(`/api/jobs/${jobId}`),
+  result: (jobId) => fetchAPI(`/api/jobs/${jobId}/result`),
+  cancel: (jobId) => fetchAPI(`/api/jobs/${jobId}`, { method: "DELETE" }),
+  stats: () => fetchAPI("/api/jobs/stats"),
+};
+
 export default {
   auth: authAPI,
+  chat: chatAPI,
+  jobs: jobsAPI,
   rfp: rfpAPI,
   agent: agentAPI,
   workflow: workflowAPI,
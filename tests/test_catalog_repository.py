@@ -0,0 +1,168 @@
+"""
+Catalog repositories (backend.core.catalog_repository and the SQLite one in
+backend.core.sqlite_storage): ``find`` and ``page`` must return exactly what a
+brute-force filter over the catalog would, in catalog order, while products
+are inserted, updated and deleted. Also covers the cursor encoding in the
+catalog API.
+
+    python -m pytest tests/test_catalog_repository.py
+"""
+import json
+import base64
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.catalog import _decode_cursor, _encode_cursor
+from backend.core.catalog_repository import CatalogRepository, matches_filters, normalize_filters
+from backend.core.sqlite_storage import SQLiteStorage
+
+CATEGORIES = ["LT Power Cable", "HT Power Cable", "Control Cable", "Flexible Cable"]
+VOLTAGES = ["1.1 kV", "11 kV", "450/750 V"]
+INSULATIONS = ["XLPE", "PVC", "xlpe"]
+ARMOURS = ["Unarmoured", "Steel Wire", "Steel Strip"]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def catalog(request, tmp_path):
+    if request.param == "memory":
+        # Compact often so the tombstone and stale-index paths get exercised
+        yield CatalogRepository(compact_min=16)
+        return
+    storage = SQLiteStorage(tmp_path / "catalog.sqlite")
+    yield storage.catalog
+    storage.db.close()
+
+
+def _product(rng, sku):
+    specs = {
+        "voltage_grade": rng.choice(VOLTAGES),
+        "insulation": rng.choice(INSULATIONS),
+        "armour": rng.choice(ARMOURS),
+        "cores": rng.choice([1, 2, 3, 3.5, 4, 16]),
+        "conductor_size_sqmm": rng.choice([1.5, 4, 16, 95, 120, 240]),
+    }
+    # Some products leave a spec out, which must never match a filter on it
+    if rng.random() < 0.2:
+        specs.pop(rng.choice(list(specs)))
+    return {"sku": sku, "name": f"Cable {sku}", "category": rng.choice(CATEGORIES),
+            "base_price_per_meter": round(rng.uniform(20, 2000), 2), "specs": specs}
+
+
+def _random_filters(rng):
+    filters = {}
+    if rng.random() < 0.5:
+        filters["category"] = rng.sample(CATEGORIES, rng.randint(1, 2))
+    if rng.random() < 0.4:
+        filters["voltage_grade"] = [rng.choice(VOLTAGES).upper()]
+    if rng.random() < 0.3:
+        filters["insulation"] = ["XLPE"]
+    if rng.random() < 0.3:
+        filters["armour"] = rng.sample(ARMOURS, 2)
+    if rng.random() < 0.4:
+        filters["cores"] = (rng.choice([None, 2, 3]), rng.choice([None, 4, 16]))
+    if rng.random() < 0.3:
+        filters["conductor_size_sqmm"] = (16, None)
+    if rng.random() < 0.3:
+        filters["price_per_meter"] = (rng.choice([None, 100]), rng.choice([None, 900, 1500]))
+    return filters
+
+
+def _find_all(catalog, filters, limit, after=0):
+    """Every product ``find`` returns for ``filters`` past ``after``, following its cursors."""
+    items = []
+    while True:
+        page, after = catalog.find(filters, after=after, limit=limit)
+        assert len(page) <= limit
+        items.extend(page)
+        if after is None:
+            return items
+        assert len(page) == limit
+
+
+def _check(catalog, expected, rng):
+    """``expected`` is the catalog in order, as a list of products."""
+    assert len(catalog) == len(expected)
+    assert [p["sku"] for p in catalog] == [p["sku"] for p in expected]
+    for _ in range(10):
+        filters = _random_filters(rng)
+        wanted = [p for p in expected if matches_filters(p, normalize_filters(filters))]
+        assert _find_all(catalog, filters, rng.randint(1, 9)) == wanted, filters
+
+    offset, limit = rng.randint(0, len(expected)), rng.randint(1, 15)
+    assert catalog.page(offset, limit) == (expected[offset:offset + limit], len(expected))
+    category = rng.choice(CATEGORIES)
+    in_category = [p for p in expected if p["category"] == category]
+    assert catalog.page(offset // 4, limit, category=category.upper()) == (
+        in_category[offset // 4:offset // 4 + limit], len(in_category))
+
+
+def test_find_and_page_match_a_brute_force_filter(catalog):
+    rng = random.Random(7)
+    expected = {}  # sku -> product; dicts keep insertion order, updates keep their place
+    next_sku = 0
+
+    for step in range(600):
+        roll = rng.random()
+        if roll < 0.5 or len(expected) < 5:
+            sku = f"SKU-{next_sku:04d}"
+            next_sku += 1
+            product = _product(rng, sku)
+            assert catalog.insert(product)
+            expected[sku] = product
+        elif roll < 0.75:
+            sku = rng.choice(list(expected))
+            product = _product(rng, sku)
+            assert catalog.update(sku, product) == expected[sku]
+            expected[sku] = product
+        else:
+            sku = rng.choice(list(expected))
+            assert catalog.delete(sku) == expected.pop(sku)
+        if step % 100 == 99:
+            _check(catalog, list(expected.values()), rng)
+
+    assert not catalog.insert(dict(next(iter(expected.values()))))
+    assert catalog.delete("SKU-missing") is None
+    assert catalog.update("SKU-missing", _product(rng, "SKU-missing")) is None
+    if isinstance(catalog, CatalogRepository):
+        assert catalog.stats()["compactions"] > 0
+
+
+def test_cursor_does_not_move_when_earlier_products_change(catalog):
+    rng = random.Random(3)
+    for i in range(10):
+        catalog.insert({**_product(rng, f"SKU-{i}"), "category": "LT Power Cable"})
+    filters = {"category": ["lt power cable"]}
+    first, after = catalog.find(filters, limit=4)
+    catalog.delete(first[0]["sku"])
+    catalog.insert({**_product(rng, "SKU-new"), "category": "LT Power Cable"})
+    rest = _find_all(catalog, filters, 3, after)
+    assert [p["sku"] for p in rest] == [f"SKU-{i}" for i in range(4, 10)] + ["SKU-new"]
+
+
+def test_cursor_round_trips():
+    filters = normalize_filters({"category": ["LT Power Cable"], "cores": (3, None)})
+    assert _decode_cursor(_encode_cursor(42, filters), filters) == 42
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(json.dumps({"after": "x", "filters": ""}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps({"after": 3}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([1, 2]).encode()).decode(),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor(cursor, {})
+    assert e.value.status_code == 400
+    assert e.value.detail == "Invalid cursor"
+
+
+def test_cursor_for_other_filters_is_rejected():
+    cursor = _encode_cursor(10, normalize_filters({"category": ["LT Power Cable"]}))
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor(cursor, normalize_filters({"category": ["Control Cable"]}))
+    assert e.value.status_code == 400
+    assert e.value.detail == "Cursor was issued for different filters"
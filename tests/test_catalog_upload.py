@@ -0,0 +1,98 @@
+"""
+Catalog upload parsing and validation (backend.core.catalog_upload): bad rows
+are reported and skipped, good rows land in the catalog in the shape the agent
+tools read.
+
+    python -m pytest tests/test_catalog_upload.py
+"""
+import io
+import json
+
+import pytest
+
+from backend.core.catalog_repository import CatalogRepository
+from backend.core.catalog_upload import UploadFormatError, import_catalog
+
+GOOD = {"sku": "CAB-1", "name": "1.1 kV XLPE 3C x 120", "category": "LT Power Cable",
+        "base_price_per_meter": 850, "specs": {"voltage_grade": "1.1 kV", "cores": 3}}
+
+
+def _upload(data, filename: str, catalog=None):
+    catalog = catalog if catalog is not None else CatalogRepository()
+    raw = data.encode() if isinstance(data, str) else data
+    result = import_catalog(io.BytesIO(raw), filename, catalog, batch_size=2)
+    return result, catalog
+
+
+def _errors(result):
+    return {e["sku"] or e["row"]: e["error"] for e in result["errors"]}
+
+
+def test_json_upload_adds_valid_rows_and_reports_bad_ones():
+    rows = [
+        GOOD,
+        {**GOOD, "sku": "CAB-1"},
+        {**GOOD, "sku": ""},
+        {**GOOD, "sku": "NO-NAME", "name": None},
+        {k: v for k, v in {**GOOD, "sku": "NO-SPECS"}.items() if k != "specs"},
+        {**GOOD, "sku": "NO-CAT", "category": None},
+        {k: v for k, v in {**GOOD, "sku": "NO-PRICE"}.items() if k != "base_price_per_meter"},
+        {**GOOD, "sku": "NEG", "base_price_per_meter": -1},
+        "not an object",
+    ]
+    result, catalog = _upload(json.dumps(rows), "catalog.json")
+
+    assert result["added"] == 1
+    assert result["duplicates_in_file"] == 1
+    assert result["error_count"] == 7
+    errors = _errors(result)
+    assert errors["NO-NAME"] == "missing name"
+    assert errors["NO-SPECS"] == "missing specs"
+    assert errors["NO-CAT"] == "missing category"
+    assert errors["NO-PRICE"] == "missing base_price_per_meter"
+    assert errors["NEG"] == "base_price_per_meter is negative"
+    assert catalog.get("CAB-1")["specs"] == GOOD["specs"]
+
+
+def test_non_finite_prices_and_specs_are_rejected():
+    raw = ('[{"sku": "NAN", "name": "n", "category": "c", "specs": {}, "base_price_per_meter": NaN},'
+           ' {"sku": "INF", "name": "n", "category": "c", "specs": {"cores": Infinity}, "base_price_per_meter": 1}]')
+    result, catalog = _upload(raw, "catalog.json")
+    assert result["added"] == 0
+    assert _errors(result) == {"NAN": "base_price_per_meter is not a finite number",
+                               "INF": "specs contain NaN or Infinity"}
+
+    csv_text = "sku,name,category,base_price_per_meter,cores\nNAN-CSV,n,c,nan,3\nINF-SPEC,n,c,10,inf\n"
+    result, catalog = _upload(csv_text, "catalog.csv")
+    assert _errors(result) == {"NAN-CSV": "base_price_per_meter is not a number"}
+    # A non-numeric spec stays text, so the product can still be written as JSON
+    assert catalog.get("INF-SPEC")["specs"]["cores"] == "inf"
+    json.dumps(list(catalog), allow_nan=False)
+
+
+def test_csv_rows_fill_the_fields_the_agent_tools_read():
+    csv_text = (
+        "sku,product_name,category,price_per_km,specs.voltage_grade,insulation\n"
+        "CSV-1,3C x 95 Armoured,LT Power Cable,640000,1.1 kV,XLPE\n"
+        "CSV-2,Extra column,LT Power Cable,10,1.1 kV,XLPE,oops\n"
+        "CSV-3,No price,LT Power Cable,,1.1 kV,XLPE\n"
+    )
+    result, catalog = _upload(csv_text, "catalog.csv")
+
+    assert result["added"] == 1
+    product = catalog.get("CSV-1")
+    assert product["name"] == "3C x 95 Armoured"
+    assert product["base_price_per_meter"] == 640
+    assert product["specs"] == {"voltage_grade": "1.1 kV", "insulation": "XLPE"}
+    errors = {e["row"]: e["error"] for e in result["errors"]}
+    assert errors == {3: "more values than header columns", 4: "missing base_price_per_meter"}
+
+
+@pytest.mark.parametrize("raw, filename", [
+    ('{"sku": "not-an-array"}', "catalog.json"),
+    ('[{"sku": "A"}, {"sku": ', "catalog.json"),
+    ("sku,name\n", "catalog.xlsx"),
+])
+def test_unparseable_files_raise(raw, filename):
+    with pytest.raises(UploadFormatError):
+        _upload(raw, filename)
@@ -0,0 +1,75 @@
+"""
+Regression test for chat history growth: once CHAT_HISTORY_WINDOW is
+reached, the checkpointed message list and the checkpoint itself must stay
+flat however many turns a session runs.
+
+Runs real graph turns with the fake LLM and the in-memory checkpointer:
+
+    python -m pytest tests/test_chat_history.py
+"""
+import os
+import asyncio
+import tempfile
+
+import pytest
+
+WINDOW = 6
+SUMMARY_LINES = 8
+TURNS = 30
+
+_tmp = tempfile.mkdtemp(prefix="rfp-history-test-")
+# Read when the graph and stores are first imported, so set before anything loads them
+os.environ.update({
+    "CHECKPOINTER": "memory",
+    "LLM_PROVIDER": "fake",
+    "CHAT_HISTORY_WINDOW": str(WINDOW),
+    "CHAT_HISTORY_SUMMARY_MAX_LINES": str(SUMMARY_LINES),
+    "RFP_REFERENCE_DATE": "2026-02-01",
+    "LLM_CACHE_PATH": os.path.join(_tmp, "llm_cache.sqlite"),
+    "REPORTS_DIR": os.path.join(_tmp, "reports"),
+    "SESSION_SPILL_DIR": os.path.join(_tmp, "sessions"),
+})
+
+
+def _checkpoint_size(workflow, values) -> int:
+    return len(workflow.checkpointer.serde.dumps_typed(values)[1])
+
+
+async def _run_session(session_id: str):
+    from backend.api.chat import _run_turn
+    from agents.graph import rfp_workflow
+
+    config = {"configurable": {"thread_id": session_id}}
+    messages = ["Scan for cable RFPs", "Analyze 1"]
+    messages += [f"What else can you tell me? ({i})" for i in range(TURNS - len(messages))]
+    history = []
+    for text in messages:
+        await _run_turn(session_id, text)
+        values = (await rfp_workflow.aget_state(config)).values
+        history.append((len(values["messages"]), _checkpoint_size(rfp_workflow, values), len(values["node_timings"])))
+    return history
+
+
+@pytest.fixture(scope="module")
+def history():
+    return asyncio.run(_run_session("history-growth"))
+
+
+def test_message_count_is_capped(history):
+    counts = [count for count, _, _ in history]
+    # The window plus the summary message standing in for folded turns
+    assert max(counts) <= WINDOW + 1
+    assert counts[-1] == WINDOW + 1
+
+
+def test_checkpoint_size_stays_flat(history):
+    # Once the window and the summary are both full, later turns only replace content
+    settled = [size for _, size, _ in history[WINDOW + SUMMARY_LINES:]]
+    assert settled, "not enough turns to fill the window and the summary"
+    assert max(settled) <= min(settled) * 1.02
+    assert history[-1][1] <= max(size for _, size, _ in history[:WINDOW + SUMMARY_LINES]) * 1.1
+
+
+def test_node_timings_reset_each_turn(history):
+    # Each turn records only its own node runs
+    assert max(timings for _, _, timings in history) <= 10
@@ -0,0 +1,103 @@
+"""
+Background job queue (backend.core.jobs): webhook URL checks, webhooks sent
+off the worker, and the per-session lock shared with synchronous turns.
+
+    python -m pytest tests/test_jobs.py
+"""
+import asyncio
+
+import pytest
+
+from backend.core.jobs import JobQueue, JobStatus, WebhookURLError, check_webhook_url
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.10/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "ftp://93.184.216.34/hook",
+])
+def test_internal_webhook_urls_are_rejected(url):
+    with pytest.raises(WebhookURLError):
+        asyncio.run(check_webhook_url(url))
+
+
+def test_public_and_allowed_webhook_urls_pass():
+    asyncio.run(check_webhook_url("https://93.184.216.34/hook"))
+    asyncio.run(check_webhook_url("http://localhost:9000/hook", frozenset({"localhost"})))
+
+
+async def _wait_for(job, statuses=JobStatus.FINISHED, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while job.status not in statuses:
+        assert asyncio.get_running_loop().time() < deadline, f"job stuck in {job.status}"
+        await asyncio.sleep(0.01)
+
+
+def test_slow_webhook_does_not_hold_a_worker():
+    async def run():
+        queue = JobQueue(workers=1, webhook_allowed_hosts=frozenset({"hooks.internal"}))
+        sent = asyncio.Event()
+
+        async def slow_notify(job):
+            await asyncio.sleep(30)
+            sent.set()
+
+        queue._notify = slow_notify
+
+        async def work():
+            return "done"
+
+        first = await queue.submit("test", work, webhook_url="http://hooks.internal/a")
+        second = await queue.submit("test", work)
+        await _wait_for(second)
+        assert first.status == second.status == JobStatus.SUCCEEDED
+        await queue.stop()
+        assert not sent.is_set()
+
+    asyncio.run(run())
+
+
+def test_rejected_webhook_is_not_sent():
+    async def run():
+        queue = JobQueue(workers=1)
+
+        async def work():
+            return "done"
+
+        job = await queue.submit("test", work, webhook_url="http://127.0.0.1/hook")
+        await _wait_for(job)
+        while queue._webhook_tasks:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.webhook_status.startswith("rejected:")
+
+
+def test_sync_turn_and_queued_job_for_a_session_do_not_overlap():
+    async def run():
+        queue = JobQueue(workers=2)
+        order = []
+
+        async def job_work():
+            order.append("job")
+
+        async with queue.session("s1"):
+            job = await queue.submit("chat", job_work, session_id="s1")
+            other = await queue.submit("chat", job_work, session_id="s2")
+            await _wait_for(other)
+            await asyncio.sleep(0.05)
+            assert job.status == JobStatus.QUEUED
+            order.append("turn")
+        await _wait_for(job)
+        await queue.stop()
+        assert queue._session_locks == {}
+        return order
+
+    assert asyncio.run(run()) == ["job", "turn", "job"]
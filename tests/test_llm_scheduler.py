@@ -0,0 +1,121 @@
+"""
+LLM admission control (agents.llm_scheduler): retries, request coalescing and
+the priority semaphore.
+
+    python -m pytest tests/test_llm_scheduler.py
+"""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents import llm_scheduler
+from agents.llm_scheduler import LLMScheduler, PrioritySemaphore
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScriptedLLM:
+    """Fails with the given errors first, then answers after ``delay`` seconds."""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(content=f"answer {self.calls}")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_scheduler.random, "random", lambda: -0.5)
+
+
+PROMPT = [HumanMessage(content="Summarise TOT-2026-001")]
+
+
+@pytest.mark.parametrize("error", [StatusError(503), StatusError(408), TimeoutError(), ConnectionError()])
+def test_transient_errors_are_retried(error):
+    scheduler = LLMScheduler(max_retries=2)
+    llm = ScriptedLLM(errors=[error])
+    result = asyncio.run(scheduler.run(llm, PROMPT))
+    assert result.content == "answer 2"
+    assert scheduler.stats()["transient_errors"] == 1
+
+
+def test_client_errors_are_not_retried():
+    scheduler = LLMScheduler(max_retries=2)
+    llm = ScriptedLLM(errors=[StatusError(400)])
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.run(llm, PROMPT))
+    assert llm.calls == 1
+
+
+def test_retries_stop_at_max_retries():
+    scheduler = LLMScheduler(max_retries=2)
+    llm = ScriptedLLM(errors=[StatusError(500)] * 5)
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.run(llm, PROMPT))
+    assert llm.calls == 3
+
+
+def test_identical_calls_share_one_upstream_call():
+    async def run(scheduler, llm):
+        return await asyncio.gather(*(scheduler.run(llm, PROMPT) for _ in range(3)))
+
+    llm = ScriptedLLM(delay=0.05)
+    results = asyncio.run(run(LLMScheduler(), llm))
+    assert {r.content for r in results} == {"answer 1"}
+    assert llm.calls == 1
+
+    llm = ScriptedLLM(delay=0.05)
+    asyncio.run(run(LLMScheduler(coalesce=False), llm))
+    assert llm.calls == 3
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def run():
+        scheduler = LLMScheduler()
+        llm = ScriptedLLM(delay=0.05)
+        leader = asyncio.create_task(scheduler.run(llm, PROMPT))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(scheduler.run(llm, PROMPT)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return scheduler, llm, results
+
+    scheduler, llm, results = asyncio.run(run())
+    # One follower made the call again and the other shared it
+    assert [r.content for r in results] == ["answer 2", "answer 2"]
+    assert llm.calls == 2
+    assert scheduler.stats()["takeovers"] == 1
+
+
+def test_cancelled_waiter_already_released_is_ignored():
+    async def run():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire(0)
+        waiter = asyncio.create_task(semaphore.acquire(0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        # release() runs before the waiter handles its cancellation and pops its entry
+        semaphore.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return semaphore
+
+    semaphore = asyncio.run(run())
+    assert semaphore.in_use == 0
+    assert semaphore.waiting() == {"interactive": 0, "batch": 0}
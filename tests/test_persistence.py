@@ -0,0 +1,93 @@
+"""
+Write-behind persistence for the JSON stores (backend.core.persistence): a
+snapshot plus a change log must always rebuild the store, after an unclean stop
+and whatever order the background flush and a compaction run in.
+
+    python -m pytest tests/test_persistence.py
+"""
+import json
+import asyncio
+import threading
+
+from backend.core.persistence import StorePersistence
+from backend.core.storage import JsonStorage
+
+
+def _recover(path):
+    """What a restart would load: the snapshot with the log replayed on top."""
+    state = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def apply(op, key, value):
+        if op == "put":
+            state[key] = value
+        elif op == "delete":
+            state.pop(key, None)
+
+    StorePersistence("test", path, dict).replay(apply)
+    return state
+
+
+def test_flush_during_compact_is_not_truncated_away(tmp_path):
+    state = {}
+    snapshot_read, release = threading.Event(), threading.Event()
+
+    def snapshot():
+        data = dict(state)
+        snapshot_read.set()
+        release.wait(5)
+        return data
+
+    persistence = StorePersistence("test", tmp_path / "test.json", snapshot)
+
+    async def run():
+        state["a"] = 1
+        persistence.record("put", "a", 1)
+        compact = asyncio.create_task(persistence.compact())
+        assert await asyncio.to_thread(snapshot_read.wait, 5)
+
+        # Applied after the snapshot was read, so only the log can carry it
+        state["b"] = 2
+        persistence.record("put", "b", 2)
+        flush = asyncio.create_task(persistence.flush())
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(compact, flush)
+
+    asyncio.run(run())
+    assert _recover(tmp_path / "test.json") == {"a": 1, "b": 2}
+
+
+def test_changes_survive_an_unclean_stop(tmp_path):
+    storage = JsonStorage(tmp_path).load()
+    product = {"sku": "CAB-1", "name": "3C x 120", "category": "LT Power Cable",
+               "base_price_per_meter": 850, "specs": {"cores": 3}}
+
+    async def run():
+        await storage.start()
+        storage.catalog.insert(product)
+        storage.catalog.insert({**product, "sku": "CAB-2"})
+        storage.catalog.update("CAB-1", {**product, "base_price_per_meter": 900})
+        storage.catalog.delete("CAB-2")
+        storage.rfps.put({"id": "TOT-2026-001", "title": "Metro cables"})
+        storage.test_pricing.put("Routine Test", {"price": 5000, "duration_days": 2})
+        for persistence in storage.persistence.values():
+            await persistence.flush()
+        # No stop(): the process dies with everything in the logs and no snapshot
+
+    asyncio.run(run())
+    assert not (tmp_path / "catalog.json").exists()
+    # A crash in the middle of an append leaves a torn last line
+    with open(tmp_path / "catalog.log", "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "key": "CAB-3", "val')
+
+    reopened = JsonStorage(tmp_path).load()
+    assert [p["sku"] for p in reopened.catalog] == ["CAB-1"]
+    assert reopened.catalog.get("CAB-1")["base_price_per_meter"] == 900
+    assert reopened.rfps.get("TOT-2026-001")["title"] == "Metro cables"
+    assert reopened.test_pricing.get("Routine Test") == {"price": 5000, "duration_days": 2}
+    assert reopened.persistence["catalog"].stats()["replayed"] == 4
+
+    # The next snapshot folds the log in and truncates it
+    asyncio.run(reopened.stop())
+    assert (tmp_path / "catalog.log").read_text(encoding="utf-8") == ""
+    assert [p["sku"] for p in JsonStorage(tmp_path).load().catalog] == ["CAB-1"]
@@ -0,0 +1,60 @@
+"""
+Report storage (backend.core.report_store): each (session, RFP) report has
+its own manifest, and a render worker dying must not break later downloads.
+
+    python -m pytest tests/test_report_store.py
+"""
+import os
+import json
+import signal
+import asyncio
+
+from backend.core.report_store import ReportStore
+
+
+def test_render_pool_recovers_after_a_worker_dies(tmp_path):
+    store = ReportStore(reports_dir=tmp_path, render_workers=1)
+
+    async def run():
+        store.save("session", "rfp-1", "First", [["Scope", "11 kV XLPE cable"]])
+        await store.pdf_path(store.load("session", "rfp-1"))
+        for pid in list(store._pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        await asyncio.sleep(0.5)
+
+        store.save("session", "rfp-2", "Second", [["Scope", "1.1 kV control cable"]])
+        path = await store.pdf_path(store.load("session", "rfp-2"))
+        assert os.path.getsize(path) > 0
+        assert store.stats()["pool_restarts"] == 1
+        assert store.stats()["render_errors"] == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.shutdown()
+
+
+def test_reports_whose_ids_join_the_same_way_stay_separate(tmp_path):
+    store = ReportStore(reports_dir=tmp_path, render_workers=0)
+    try:
+        store.save("a_b", "c", "Session one", [["Scope", "one"]])
+        store.save("a", "b_c", "Session two", [["Scope", "two"]])
+        assert store.load("a_b", "c")["title"] == "Session one"
+        assert store.load("a", "b_c")["title"] == "Session two"
+        assert store.index.stats()["reports"] == 2
+    finally:
+        store.shutdown()
+
+
+def test_manifests_saved_under_the_old_names_are_moved(tmp_path):
+    manifest = {"session_id": "s1", "rfp_id": "TOT-2026-001", "title": "Legacy",
+                "sections": [["Scope", "x"]], "content_hash": "0" * 64}
+    (tmp_path / "s1_TOT-2026-001.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    store = ReportStore(reports_dir=tmp_path, render_workers=0)
+    try:
+        assert store.load("s1", "TOT-2026-001")["title"] == "Legacy"
+        assert not (tmp_path / "s1_TOT-2026-001.json").exists()
+        assert store.index.stats()["reports"] == 1
+    finally:
+        store.shutdown()
@@ -0,0 +1,71 @@
+"""
+Canonical RFP lookups: a tender listed on several portals is merged into one
+canonical RFP, and every listing ID still resolves to it.
+
+    python -m pytest tests/test_rfp_dedup.py
+"""
+import os
+import sys
+import copy
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "agents"))
+os.environ.setdefault("RFP_REFERENCE_DATE", "2026-02-01")
+
+from backend.core import storage  # noqa: E402
+from sales_agent import tools  # noqa: E402
+from sales_agent.dedup import deduplicate_rfps  # noqa: E402
+
+
+@pytest.fixture
+def rfps(monkeypatch):
+    store = storage.RFPStore()
+    for rfp in json.loads((ROOT / "data" / "rfps.json").read_text(encoding="utf-8")):
+        store.put(rfp)
+    monkeypatch.setattr(tools, "get_storage", lambda: SimpleNamespace(rfps=store, test_pricing=storage.TestPricingStore()))
+    monkeypatch.setitem(tools._canonical, "store", None)
+    return store
+
+
+def _portal_copy(store, rfp_id, new_id, **changes):
+    rfp = copy.deepcopy(store.get(rfp_id))
+    rfp.update(id=new_id, url=f"https://portal2.example/{new_id}", **changes)
+    store.put(rfp)
+
+
+def test_duplicate_listing_id_resolves_to_canonical(rfps):
+    _portal_copy(rfps, "TOT-2026-001", "PORTAL2-XYZ")
+
+    assert tools.find_rfp("PORTAL2-XYZ")["id"] == "TOT-2026-001"
+    assert "PORTAL2-XYZ" in tools.find_rfp("TOT-2026-001")["duplicate_ids"]
+    assert "# RFP Details: TOT-2026-001" in tools.get_rfp_details.invoke("PORTAL2-XYZ")
+    assert "not found" not in tools.extract_rfp_summary_for_technical.invoke("PORTAL2-XYZ")
+    assert "not found" not in tools.extract_rfp_summary_for_pricing.invoke("PORTAL2-XYZ")
+
+
+def test_incremental_pool_matches_full_dedup(rfps):
+    tools.canonical_rfps()
+    _portal_copy(rfps, "TOT-2026-002", "PORTAL2-002")
+    _portal_copy(rfps, "TOT-2026-003", "PORTAL2-003")
+    expected = [r["id"] for r in deduplicate_rfps(rfps.all())]
+    assert [r["id"] for r in tools.canonical_rfps()] == expected
+
+    rfps.delete("TOT-2026-002")
+    expected = [r["id"] for r in deduplicate_rfps(rfps.all())]
+    assert [r["id"] for r in tools.canonical_rfps()] == expected
+    assert tools.find_rfp("PORTAL2-002")["id"] == "PORTAL2-002"
+
+
+def test_scan_lists_the_same_canonical_ids(rfps):
+    # The later listing sorts first by deadline, but the pool keeps the first one stored
+    deadline = rfps.get("TOT-2026-001")["submission_deadline"]
+    earlier = f"{deadline[:8]}{int(deadline[8:10]) - 1:02d}"
+    _portal_copy(rfps, "TOT-2026-001", "PORTAL2-XYZ", submission_deadline=earlier)
+    listing = tools.scan_rfp_websites.invoke("all")
+    assert "**TOT-2026-001**" in listing
+    assert "PORTAL2-XYZ" not in listing
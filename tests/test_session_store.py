@@ -0,0 +1,100 @@
+"""
+Session store spill-to-disk (backend.core.session_store): evicted sessions
+come back from disk, disk reads don't hold the store lock, and memory always
+wins over an older spilled copy.
+
+    python -m pytest tests/test_session_store.py
+"""
+import time
+import threading
+
+from backend.core.session_store import SessionStore
+
+
+def _drain(store):
+    """Wait for everything queued on the spill writer."""
+    store._start_writer().submit(lambda: None).result(timeout=5)
+
+
+def _store(tmp_path, **kwargs):
+    return SessionStore(max_entries=1, spill_dir=tmp_path, **kwargs)
+
+
+def test_evicted_sessions_reload_from_disk(tmp_path):
+    store = _store(tmp_path)
+    store["a"] = {"messages": ["first"]}
+    store["b"] = {"messages": ["second"]}
+    _drain(store)
+
+    assert store.stats()["spilled_sessions"] == 1
+    assert store.get("a") == {"messages": ["first"]}
+    _drain(store)
+    # "a" is back in memory and "b" was spilled in its place
+    assert store.stats()["spilled_sessions"] == 1
+    assert store.pop("b") == {"messages": ["second"]}
+    _drain(store)
+    assert store.stats()["spilled_sessions"] == 0
+    assert list(tmp_path.glob("*.session")) == []
+
+
+def test_spilled_files_from_an_earlier_run_are_counted(tmp_path):
+    first = _store(tmp_path)
+    first["a"] = {"n": 1}
+    first["b"] = {"n": 2}
+    _drain(first)
+
+    second = _store(tmp_path)
+    second.stats()
+    _drain(second)
+    assert second.stats()["spilled_sessions"] == 1
+    assert second.get("a") == {"n": 1}
+    _drain(second)
+    assert list(tmp_path.glob("*.session")) == []
+
+
+def test_reading_a_spill_file_does_not_block_other_sessions(tmp_path, monkeypatch):
+    store = _store(tmp_path, sweep_interval=3600)
+    store["slow"] = {"n": 1}
+    store["other"] = {"n": 2}
+    _drain(store)
+
+    reading, release = threading.Event(), threading.Event()
+    read = store._read_spilled
+
+    def slow_read(session_id):
+        reading.set()
+        release.wait(5)
+        return read(session_id)
+
+    monkeypatch.setattr(store, "_read_spilled", slow_read)
+    loader = threading.Thread(target=store.get, args=("slow",))
+    loader.start()
+    assert reading.wait(5)
+
+    start = time.perf_counter()
+    store["third"] = {"n": 3}
+    store.stats()
+    elapsed = time.perf_counter() - start
+    release.set()
+    loader.join(5)
+
+    assert elapsed < 0.5
+    assert store.get("slow") == {"n": 1}
+
+
+def test_newer_state_replaces_a_pending_spill(tmp_path):
+    store = _store(tmp_path)
+    gate = threading.Event()
+    # Hold the writer so "a" is still waiting to be spilled when it is replaced
+    store._start_writer().submit(gate.wait, 5)
+    store["a"] = {"v": "old"}
+    store["b"] = {"v": "b"}
+    store["a"] = {"v": "new"}
+    gate.set()
+    _drain(store)
+
+    assert store.stats()["spilling"] == 0
+    # Only "b" is on disk; the old copy of "a" was dropped after being written
+    assert store.stats()["spilled_sessions"] == 1
+    assert len(list(tmp_path.glob("*.session"))) == 1
+    assert store.get("a") == {"v": "new"}